@@ -1,11 +1,31 @@
-"""Init module for SDP Master Leaf Node"""
+"""Init module for SDP Master Leaf Node
 
-from ska_tmc_sdpmasterleafnode.commands.disable_command import Disable
-from ska_tmc_sdpmasterleafnode.commands.off_command import Off
-from ska_tmc_sdpmasterleafnode.commands.on_command import On
-from ska_tmc_sdpmasterleafnode.commands.set_controller_admin_mode import (
-    SetAdminMode,
-)
-from ska_tmc_sdpmasterleafnode.commands.standby_command import Standby
+The command classes are imported on first use, so that importing the package
+does not load every command module.
+"""
+import importlib
+from typing import Any
+
+_COMMAND_MODULES = {
+    "Disable": "disable_command",
+    "Off": "off_command",
+    "On": "on_command",
+    "Standby": "standby_command",
+    "SetAdminMode": "set_controller_admin_mode",
+}
 
 __all__ = ["Disable", "Off", "On", "Standby", "SetAdminMode"]
+
+
+def __getattr__(name: str) -> Any:
+    """Imports the command class on first access."""
+    if name not in _COMMAND_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f"{__name__}.{_COMMAND_MODULES[name]}")
+    command_class = getattr(module, name)
+    globals()[name] = command_class
+    return command_class
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -42,7 +42,7 @@ class Disable(SdpMLNCommand):
 
         task_callback(status=TaskStatus.IN_PROGRESS)
         exception = ""
-        result_code, message = self.do()
+        result_code, message = self.do_with_fan_out("Disable")
 
         logger.info(
             "Disable command invoked on: %s: Result: %s, %s",
@@ -42,7 +42,7 @@ class On(SdpMLNCommand):
         """
         task_callback(status=TaskStatus.IN_PROGRESS)
         exception = ""
-        result_code, message = self.do()
+        result_code, message = self.do_with_fan_out("On")
         logger.info(
             "On command invoked on: %s: Result: %s, %s",
             self.sdp_master_adapter.dev_name,
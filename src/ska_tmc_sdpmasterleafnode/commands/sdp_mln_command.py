@@ -1,22 +1,42 @@
 """SDP Master Leaf Node Base Command Class for SDP Master Leaf Node"""
 from __future__ import annotations
 
+import functools
+import json
 import logging
 import time
-from typing import TYPE_CHECKING, Any, Optional, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Optional,
+    Tuple,
+)
 
-from ska_ser_logging import configure_logging
 from ska_tango_base.commands import ResultCode
 from ska_tmc_common.adapters import AdapterType
 from ska_tmc_common.tmc_command import TmcLeafNodeCommand
 from tango import ConnectionFailed, DevFailed
 
-configure_logging()
 LOGGER = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
     from ..manager.component_manager import SdpMLNComponentManager
 
+SDP_MASTER = "SdpMaster"
+SDP_SUBARRAY = "SdpSubarray"
+
+# Device classes the power commands are sent to in fan-out mode. SDP
+# Subarray implements On and Off only.
+FAN_OUT_TARGET_CLASSES: Dict[str, FrozenSet[str]] = {
+    "On": frozenset({SDP_MASTER, SDP_SUBARRAY}),
+    "Off": frozenset({SDP_MASTER, SDP_SUBARRAY}),
+    "Standby": frozenset({SDP_MASTER}),
+    "Disable": frozenset({SDP_MASTER}),
+}
+
 
 class SdpMLNCommand(TmcLeafNodeCommand):
     """Abstract command class for all SdpMasterLeafNode"""
@@ -38,6 +58,12 @@ class SdpMLNCommand(TmcLeafNodeCommand):
     def init_adapter(self) -> Tuple[ResultCode, str]:
         dev_name: str = self.component_manager.sdp_master_device_name
         adapter_timeout: int = self.component_manager.adapter_timeout
+        if (
+            self.sdp_master_adapter is not None
+            and self.sdp_master_adapter.dev_name != dev_name
+        ):
+            # The SDP Master FQDN has been changed at runtime
+            self.sdp_master_adapter = None
         elapsed_time = 0
         start_time = time.time()
         while (
@@ -74,6 +100,114 @@ class SdpMLNCommand(TmcLeafNodeCommand):
 
         return (ResultCode.OK, "")
 
+    def invoke_on_sdp_subarray(
+        self, dev_name: str, command_name: str
+    ) -> Tuple[ResultCode, str]:
+        """Invokes the given command on a SDP Subarray of the fan-out.
+
+        :param dev_name: FQDN of the SDP Subarray
+        :param command_name: name of the command to be invoked
+        :return: result code and message
+        """
+        try:
+            adapter = self.adapter_factory.get_or_create_adapter(
+                dev_name, AdapterType.BASE
+            )
+            adapter.proxy.command_inout(command_name)
+        except Exception as exception:
+            message = (
+                f"{command_name} Command invocation failed on device: "
+                f"{dev_name}. with exception: {exception}"
+            )
+            self.logger.exception(message)
+            return (ResultCode.FAILED, message)
+        return (ResultCode.OK, "Command Completed")
+
+    def do_with_fan_out(self, command_name: str) -> Tuple[ResultCode, str]:
+        """Invokes the command on the SDP Master and, when SDP Subarray
+        FQDNs are configured, concurrently on the SDP Subarrays if they
+        implement the command.
+
+        In fan-out mode the message is a Json String with the result and
+        the duration of the invocation on every target, and the targets
+        skipped because they do not implement the command, so that the
+        power transition takes as long as the slowest device.
+
+        :param command_name: name of the command to be invoked
+        :return: aggregated result code and message
+        """
+        sdp_subarray_dev_names = self.component_manager.sdp_subarray_dev_names
+        if not sdp_subarray_dev_names:
+            return self.do()
+
+        targets: Dict[str, Callable[[], Tuple[ResultCode, str]]] = {
+            self.component_manager.sdp_master_device_name: self.do
+        }
+        skipped: Dict[str, str] = {}
+        target_classes = FAN_OUT_TARGET_CLASSES.get(
+            command_name, frozenset({SDP_MASTER})
+        )
+        for dev_name in sdp_subarray_dev_names:
+            if SDP_SUBARRAY in target_classes:
+                targets[dev_name] = functools.partial(
+                    self.invoke_on_sdp_subarray, dev_name, command_name
+                )
+            else:
+                skipped[
+                    dev_name
+                ] = f"{command_name} is not implemented by {SDP_SUBARRAY}"
+
+        start_time = time.time()
+        executor = self.component_manager.get_fan_out_executor()
+        pending_results = {
+            dev_name: executor.submit(self._timed_call, invoke)
+            for dev_name, invoke in targets.items()
+        }
+        results = {
+            dev_name: pending_result.result()
+            for dev_name, pending_result in pending_results.items()
+        }
+
+        result_code = (
+            ResultCode.FAILED
+            if any(
+                target_result["result_code"] == ResultCode.FAILED
+                for target_result in results.values()
+            )
+            else ResultCode.OK
+        )
+        message = json.dumps(
+            {
+                "command": command_name,
+                "duration": time.time() - start_time,
+                "targets": results,
+                "skipped": skipped,
+            }
+        )
+        self.logger.info(
+            "%s command fan-out completed with result %s: %s",
+            command_name,
+            result_code,
+            message,
+        )
+        return result_code, message
+
+    def _timed_call(
+        self, invoke: Callable[[], Tuple[ResultCode, str]]
+    ) -> Dict[str, Any]:
+        """Calls the invoke method and returns its result with its
+        duration."""
+        start_time = time.time()
+        try:
+            result_code, message = invoke()
+        except Exception as exception:
+            result_code, message = ResultCode.FAILED, str(exception)
+        return {
+            "result_code": int(result_code),
+            "message": message,
+            "duration": time.time() - start_time,
+        }
+
     def do_mid(self, argin: Optional[Any] = None):
         """Abstract Method from TmcLeafNodeCommand is
             defined here but not utilized by this Class.
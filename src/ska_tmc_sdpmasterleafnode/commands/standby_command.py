@@ -40,7 +40,7 @@ class Standby(SdpMLNCommand):
 
         task_callback(status=TaskStatus.IN_PROGRESS)
         exception = ""
-        result_code, message = self.do()
+        result_code, message = self.do_with_fan_out("Standby")
 
         logger.info(
             "Standby command invoked on: %s: Result: %s, %s",
@@ -1,6 +1,36 @@
-"""Init module for SDP Master Leaf Node Component Manager"""
-from ska_tmc_sdpmasterleafnode.manager.component_manager import (
-    SdpMLNComponentManager,
-)
+"""Init module for SDP Master Leaf Node Component Manager
 
-__all__ = ["SdpMLNComponentManager"]
+The manager classes are imported on first use, so that importing the package
+does not load every manager module. The classes shared with the SDP Subarray
+Leaf Node are imported from its package.
+"""
+import importlib
+from typing import Any
+
+_SHARED_MANAGER = "ska_tmc_sdpsubarrayleafnode.manager"
+
+_MANAGER_MODULES = {
+    "ExecutorMetrics": f"{_SHARED_MANAGER}.executor_metrics",
+    "SamplingProfiler": f"{_SHARED_MANAGER}.sampling_profiler",
+    "SdpMLNComponentManager": f"{__name__}.component_manager",
+    "SdpMLNEventReceiver": f"{__name__}.event_receiver",
+    "SdpSubarrayHealthAggregator": (
+        f"{__name__}.sdp_subarray_health_aggregator"
+    ),
+}
+
+__all__ = sorted(_MANAGER_MODULES)
+
+
+def __getattr__(name: str) -> Any:
+    """Imports the manager class on first access."""
+    if name not in _MANAGER_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(_MANAGER_MODULES[name])
+    manager_class = getattr(module, name)
+    globals()[name] = manager_class
+    return manager_class
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
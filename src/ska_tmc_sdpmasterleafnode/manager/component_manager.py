@@ -4,24 +4,36 @@ This module implements ComponentManager class for the Sdp Master Leaf Node.
 """
 import logging
 import threading
+import time
+from concurrent import futures
 from logging import Logger
-from typing import Callable, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from ska_control_model import AdminMode
-from ska_ser_logging import configure_logging
+from ska_control_model import AdminMode, HealthState
 from ska_tango_base.base import TaskCallbackType
 from ska_tango_base.base.base_component_manager import BaseComponentManager
 from ska_tango_base.executor import TaskStatus
+from ska_tmc_common.dev_factory import DevFactory
 from ska_tmc_common.device_info import DeviceInfo
 from ska_tmc_common.enum import LivelinessProbeType
 from ska_tmc_common.exceptions import CommandNotAllowed, DeviceUnresponsive
-from ska_tmc_common.v1.event_receiver import EventReceiver
 from ska_tmc_common.v1.tmc_component_manager import TmcLeafNodeComponentManager
 from tango import DevState
 
-from ska_tmc_sdpmasterleafnode.commands import Disable, Off, On, Standby
+from ska_tmc_sdpmasterleafnode import commands
+from ska_tmc_sdpmasterleafnode.manager.event_receiver import (
+    SdpMLNEventReceiver,
+)
+from ska_tmc_sdpmasterleafnode.manager.sdp_subarray_health_aggregator import (
+    SdpSubarrayHealthAggregator,
+)
+from ska_tmc_sdpsubarrayleafnode.manager.executor_metrics import (
+    ExecutorMetrics,
+)
+from ska_tmc_sdpsubarrayleafnode.manager.thread_inventory import (
+    ThreadInventory,
+)
 
-configure_logging()
 LOGGER = logging.getLogger(__name__)
 
 
@@ -51,6 +63,11 @@ class SdpMLNComponentManager(TmcLeafNodeComponentManager):
         event_subscription_check_period: int = 1,
         liveliness_check_period: int = 1,
         adapter_timeout: int = 30,
+        sdp_subarray_dev_names: Optional[List[str]] = None,
+        sdp_aggregate_health_dev_names: Optional[List[str]] = None,
+        _update_sdp_aggregate_health_callback: Optional[Callable] = None,
+        executor_metrics_file: str = "",
+        executor_metrics_labels: Optional[Dict[str, str]] = None,
     ):
         """
         Initialise a new ComponentManager instance.
@@ -67,6 +84,20 @@ class SdpMLNComponentManager(TmcLeafNodeComponentManager):
         responses. Default 500 milliseconds
         :param adapter_timeout: Time period to wait for adapter creation
         :param sleep_time: Optional. Sleep time between reties. Default 1 Sec
+        :param sdp_subarray_dev_names: Optional. FQDNs of the SDP Subarrays
+            to which the On, Off, Standby and Disable commands are sent
+            concurrently with the SDP Master
+        :param sdp_aggregate_health_dev_names: Optional. FQDNs of the SDP
+            Subarrays whose healthState and obsState are aggregated, not
+            aggregated if empty
+        :param _update_sdp_aggregate_health_callback: Optional. Called with
+            the aggregate health state and the state counts of the SDP
+            Subarrays
+        :param executor_metrics_file: Optional. Path of the file where the
+            task executor metrics are written in the Prometheus text format,
+            not written if empty
+        :param executor_metrics_labels: Optional. Labels of the task executor
+            metrics
 
         """
 
@@ -80,19 +111,29 @@ class SdpMLNComponentManager(TmcLeafNodeComponentManager):
             liveliness_check_period=liveliness_check_period,
         )
         self._device: DeviceInfo = DeviceInfo(sdp_master_device_name)
+        self._state_transitions: Dict[str, Dict[str, Any]] = {}
         self._is_admin_mode_enabled: bool = sdp_master_admin_mode_enabled
         self.adapter_timeout = adapter_timeout
+        self.sdp_subarray_dev_names: List[str] = list(
+            sdp_subarray_dev_names or []
+        )
         self.update_availablity_callback = _update_availablity_callback
         self.update_admin_mode_callback = _update_admin_mode_callback
-        self.on_command = On(self, logger)
-        self.off_command = Off(self, logger)
-        self.standby_command = Standby(self, logger)
-        self.disable_command = Disable(self, logger)
+        self._command_objects: Dict[str, Any] = {}
         self.rlock = threading.RLock()
+        self._fan_out_executor: Optional[futures.ThreadPoolExecutor] = None
+        self._fan_out_workers: int = 0
+        self._dev_factory = DevFactory()
+        self.thread_inventory = ThreadInventory()
+        self.executor_metrics = ExecutorMetrics(
+            executor_metrics_file, executor_metrics_labels, logger=logger
+        )
+        self.executor_metrics.start()
 
+        self._event_receiver: Optional[SdpMLNEventReceiver] = None
         if _event_receiver:
             evet_subscribe_check_period = event_subscription_check_period
-            self._event_receiver = EventReceiver(
+            self._event_receiver = SdpMLNEventReceiver(
                 self,
                 logger,
                 proxy_timeout=proxy_timeout,
@@ -104,12 +145,32 @@ class SdpMLNComponentManager(TmcLeafNodeComponentManager):
         if _liveliness_probe:
             self.start_liveliness_probe(_liveliness_probe)
 
-        self.event_processing_methods = self.get_attribute_dict()
+        self.sdp_subarray_health_aggregator: Optional[
+            SdpSubarrayHealthAggregator
+        ] = None
+        if sdp_aggregate_health_dev_names:
+            self.sdp_subarray_health_aggregator = SdpSubarrayHealthAggregator(
+                list(sdp_aggregate_health_dev_names),
+                logger,
+                update_callback=_update_sdp_aggregate_health_callback,
+                event_subscription_check_period=(
+                    event_subscription_check_period
+                ),
+            )
+            self.sdp_subarray_health_aggregator.start()
+
+        # The adminMode events are processed even if the admin mode is
+        # disabled, so that it can be enabled at runtime without restart.
+        self.event_processing_methods = self.get_attribute_dict(
+            include_admin_mode=True
+        )
         self.start_event_processing_threads()
 
-    def get_attribute_dict(self) -> dict:
+    def get_attribute_dict(self, include_admin_mode: bool = False) -> dict:
         """Returns the common attribute dictionary for all component types.
 
+        :param include_admin_mode: include adminMode even if the admin mode
+            functionality is disabled
         :return: Dictionary of common attributes to be handled by
          the EventReceiver.
 
@@ -119,7 +180,7 @@ class SdpMLNComponentManager(TmcLeafNodeComponentManager):
             "state": self.update_device_state,
             "healthState": self.update_device_health_state,
         }
-        if self.is_admin_mode_enabled:
+        if self.is_admin_mode_enabled or include_admin_mode:
             attributes["adminMode"] = self.update_device_admin_mode
 
         return {**attributes}
@@ -144,9 +205,99 @@ class SdpMLNComponentManager(TmcLeafNodeComponentManager):
 
         self._sdp_master_device_name = device_name
 
+    @property
+    def is_admin_mode_enabled(self) -> bool:
+        """Returns whether the admin mode functionality is enabled."""
+        return self._is_admin_mode_enabled
+
+    @is_admin_mode_enabled.setter
+    def is_admin_mode_enabled(self, value: bool) -> None:
+        """Enables or disables the admin mode functionality. The adminMode
+        event subscription is added or dropped accordingly.
+
+        :param value: True to enable the admin mode functionality
+
+        """
+        previous_value = getattr(self, "_is_admin_mode_enabled", value)
+        self._is_admin_mode_enabled = value
+        if value != previous_value:
+            self.reconfigure_monitoring()
+
+    def update_sdp_master_dev_name(self, dev_name: str) -> None:
+        """Switches the leaf node to another SDP Master device at runtime.
+        The device info is rebuilt, all the event subscriptions are moved to
+        the new device and its state is read again.
+
+        :param dev_name: FQDN of the new SDP Master device
+
+        """
+        with self.rlock:
+            if dev_name == self.sdp_master_device_name:
+                return
+            self.sdp_master_device_name = dev_name
+            self._device = DeviceInfo(dev_name)
+            self._state_transitions = {}
+        self.reconfigure_monitoring(device_changed=True)
+
+    def reconfigure_monitoring(self, device_changed: bool = False) -> None:
+        """Incrementally updates the monitoring of the SDP Master after a
+        change of the attributes to be monitored or of the device FQDN. Only
+        the obsolete subscriptions are dropped and only the missing ones are
+        created. The command adapters are swapped on their next use.
+
+        :param device_changed: True if the SDP Master FQDN has changed, in
+            that case all the subscriptions are moved to the new device
+
+        """
+        start_time = time.time()
+        if self._event_receiver is not None:
+            self._event_receiver.update_subscriptions(
+                self.get_device(),
+                list(self.get_attribute_dict().keys()),
+                resubscribe_all=device_changed,
+            )
+        self.resync_device_state()
+        self.logger.info(
+            "Monitoring of %s reconfigured in %.3f seconds",
+            self.sdp_master_device_name,
+            time.time() - start_time,
+        )
+
+    def resync_device_state(self) -> bool:
+        """Reads the monitored attributes of the SDP Master with a single
+        read_attributes call and updates the device info with them.
+
+        :return: True if the state was read successfully
+
+        """
+        attribute_dict = self.get_attribute_dict()
+        attribute_names = list(attribute_dict.keys())
+        try:
+            sdp_master_proxy = self._dev_factory.get_device(
+                self.sdp_master_device_name
+            )
+            attribute_values = sdp_master_proxy.read_attributes(
+                attribute_names
+            )
+        except Exception as exception:
+            self.logger.warning(
+                "Unable to read the state of %s: %s",
+                self.sdp_master_device_name,
+                exception,
+            )
+            return False
+        with self.rlock:
+            for attribute_name, attribute_value in zip(
+                attribute_names, attribute_values
+            ):
+                if not attribute_value.has_failed:
+                    attribute_dict[attribute_name](attribute_value.value)
+        return True
+
     def get_device(self) -> DeviceInfo:
         """Return the device info our of the monitoring loop
-        with name dev_name
+        with name dev_name. The same device info is updated in place by the
+        events and the liveliness probe.
 
         :param None:
         :return: a device info
@@ -154,7 +305,92 @@ class SdpMLNComponentManager(TmcLeafNodeComponentManager):
 
         """
 
-        return DeviceInfo(self.sdp_master_device_name)
+        return self._device
+
+    def get_resource_inventory(self) -> Dict[str, Any]:
+        """
+        Returns the threads of the device server with their purpose, CPU
+        time and last active time, with the number of device proxies and
+        event subscriptions held by the leaf node.
+
+        :return: dictionary with the resource inventory
+        """
+        inventory = self.thread_inventory.get_inventory()
+        inventory["proxies"] = len(
+            getattr(self._dev_factory, "dev_proxys", {})
+        )
+        inventory["subscriptions"] = {
+            "sdp_master": (
+                self._event_receiver.subscription_count
+                if self._event_receiver is not None
+                else 0
+            ),
+            "sdp_subarrays": (
+                self.sdp_subarray_health_aggregator.subscription_count
+                if self.sdp_subarray_health_aggregator is not None
+                else 0
+            ),
+        }
+        return inventory
+
+    def get_state_transitions(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the last transition of each monitored value of the SDP
+        Master, with its previous value and the time of the transition.
+
+        :return: dictionary of transitions per monitored value
+
+        """
+        with self.rlock:
+            return {
+                key: dict(transition)
+                for key, transition in self._state_transitions.items()
+            }
+
+    def _record_state_transition(self, key: str, value: Any) -> None:
+        """Records the transition of a monitored value if it has changed.
+
+        :param key: name of the monitored value
+        :param value: new value
+
+        """
+        value_name = getattr(value, "name", str(value))
+        with self.rlock:
+            transition = self._state_transitions.get(key)
+            if transition is not None and transition["value"] == value_name:
+                return
+            self._state_transitions[key] = {
+                "value": value_name,
+                "previous_value": (
+                    transition["value"] if transition is not None else None
+                ),
+                "timestamp": time.time(),
+            }
+
+    def update_device_state(self, state: DevState) -> None:
+        """Update the state of the SDP Master device info and record the
+        state transition.
+
+        :param state: state of the SDP Master
+        :type state: DevState
+
+        """
+        with self.rlock:
+            self._record_state_transition("state", state)
+            super().update_device_state(state)
+
+    def update_device_health_state(self, health_state: HealthState) -> None:
+        """Update the health state of the SDP Master device info and record
+        the health state transition.
+
+        :param health_state: health state of the SDP Master
+        :type health_state: HealthState
+
+        """
+        with self.rlock:
+            self._record_state_transition(
+                "healthState", HealthState(health_state)
+            )
+            super().update_device_health_state(health_state)
 
     def _check_if_sdp_master_is_responsive(self) -> None:
         """Checks if SDP Master device is responsive."""
@@ -195,6 +431,52 @@ class SdpMLNComponentManager(TmcLeafNodeComponentManager):
             return True
         return False
 
+    # pylint: disable=arguments-differ
+    def submit_task(
+        self,
+        func: Callable,
+        args: Optional[Any] = None,
+        kwargs: Optional[Dict[str, Any]] = None,
+        is_cmd_allowed: Optional[Callable] = None,
+        task_callback: Optional[Callable] = None,
+    ) -> Tuple[TaskStatus, str]:
+        """
+        Submits a task to the task executor, recording its queue wait and
+        execution in the executor metrics.
+
+        :return: the task status and response
+        """
+        command = getattr(func, "__self__", None)
+        task_id, func, task_callback = self.executor_metrics.track(
+            type(command).__name__ if command is not None else func.__name__,
+            func,
+            task_callback,
+        )
+        task_status, response = super().submit_task(
+            func,
+            args=args,
+            kwargs=kwargs,
+            is_cmd_allowed=is_cmd_allowed,
+            task_callback=task_callback,
+        )
+        self.executor_metrics.submitted(task_id, task_status)
+        return task_status, response
+
+    def get_command_object(self, command_name: str) -> Any:
+        """
+        Returns the command object of the given command. The command objects
+        are created on first use, so that the command modules are imported
+        on first use, and reused for every invocation.
+
+        :param command_name: name of the command class, e.g. Standby
+        :return: the command object
+        """
+        command_object = self._command_objects.get(command_name)
+        if command_object is None:
+            command_object = getattr(commands, command_name)(self, self.logger)
+            self._command_objects[command_name] = command_object
+        return command_object
+
     def on(
         self, task_callback: Optional[TaskCallbackType] = None
     ) -> Tuple[TaskStatus, str]:
@@ -205,7 +487,7 @@ class SdpMLNComponentManager(TmcLeafNodeComponentManager):
         """
 
         task_status, response = self.submit_task(
-            self.on_command.on,
+            self.get_command_object("On").on,
             args=[self.logger],
             is_cmd_allowed=self._check_if_sdp_master_is_responsive(),
             task_callback=task_callback,
@@ -227,7 +509,7 @@ class SdpMLNComponentManager(TmcLeafNodeComponentManager):
         """
 
         task_status, response = self.submit_task(
-            self.off_command.off,
+            self.get_command_object("Off").off,
             args=[self.logger],
             is_cmd_allowed=self._check_if_sdp_master_is_responsive(),
             task_callback=task_callback,
@@ -249,7 +531,7 @@ class SdpMLNComponentManager(TmcLeafNodeComponentManager):
         """
 
         task_status, response = self.submit_task(
-            self.standby_command.standby,
+            self.get_command_object("Standby").standby,
             args=[self.logger],
             is_cmd_allowed=self._check_if_sdp_master_is_responsive(),
             task_callback=task_callback,
@@ -267,7 +549,7 @@ class SdpMLNComponentManager(TmcLeafNodeComponentManager):
         """
 
         task_status, response = self.submit_task(
-            self.disable_command.disable,
+            self.get_command_object("Disable").disable,
             args=[self.logger],
             is_cmd_allowed=self._check_if_sdp_master_is_responsive(),
             task_callback=task_callback,
@@ -300,9 +582,37 @@ class SdpMLNComponentManager(TmcLeafNodeComponentManager):
 
     def stop(self) -> None:
         """Stops the event processing"""
-        self._event_receiver.stop()
+        if self._event_receiver is not None:
+            self._event_receiver.stop()
+        if self.sdp_subarray_health_aggregator is not None:
+            self.sdp_subarray_health_aggregator.stop()
+        self.executor_metrics.stop()
+        with self.rlock:
+            if self._fan_out_executor is not None:
+                self._fan_out_executor.shutdown(wait=False)
+                self._fan_out_executor = None
+                self._fan_out_workers = 0
         self._stop_thread = True
 
+    def get_fan_out_executor(self) -> futures.ThreadPoolExecutor:
+        """
+        Returns the thread pool of the power command fan-out, shared by the
+        commands, with a worker per target. The pool is replaced when SDP
+        Subarrays are added.
+
+        :return: the thread pool
+        """
+        workers = len(self.sdp_subarray_dev_names) + 1
+        with self.rlock:
+            if self._fan_out_workers < workers:
+                if self._fan_out_executor is not None:
+                    self._fan_out_executor.shutdown(wait=False)
+                self._fan_out_executor = futures.ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="sdpmln_fan_out"
+                )
+                self._fan_out_workers = workers
+            return self._fan_out_executor
+
     def update_exception_for_unresponsiveness(
         self, device_info: DeviceInfo, exception: str
     ) -> None:
@@ -317,6 +627,7 @@ class SdpMLNComponentManager(TmcLeafNodeComponentManager):
 
         with self.rlock:
             device_info.update_unresponsive(True, exception)
+            self._record_state_transition("unresponsive", True)
             if self.update_availablity_callback is not None:
                 self.update_availablity_callback(False)
 
@@ -330,6 +641,7 @@ class SdpMLNComponentManager(TmcLeafNodeComponentManager):
         """
         with self.rlock:
             self.get_device().update_unresponsive(False, "")
+            self._record_state_transition("unresponsive", False)
             if self.update_availablity_callback is not None:
                 self.update_availablity_callback(True)
 
@@ -345,7 +657,11 @@ class SdpMLNComponentManager(TmcLeafNodeComponentManager):
         """
 
         if self.is_admin_mode_enabled is True:
-            super().update_device_admin_mode(admin_mode)
+            with self.rlock:
+                self._record_state_transition(
+                    "adminMode", AdminMode(admin_mode)
+                )
+                super().update_device_admin_mode(admin_mode)
             self.logger.info(
                 "Admin Mode value updated to :%s", AdminMode(admin_mode).name
             )
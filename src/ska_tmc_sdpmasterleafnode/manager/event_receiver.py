@@ -0,0 +1,50 @@
+"""Event Receiver for SDP Master Leaf Node Manager"""
+import logging
+import time
+from typing import List, Optional
+
+from ska_tmc_common.v1.event_receiver import EventReceiver
+
+from ska_tmc_sdpsubarrayleafnode.manager.event_subscriptions import (
+    EventSubscriptionMixin,
+)
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+
+class SdpMLNEventReceiver(EventSubscriptionMixin, EventReceiver):
+    """
+    The SdpMLNEventReceiver class has the responsibility to receive events
+    from the SDP Master device managed by the Sdp Master Leaf Node.
+
+    The event subscription ids are kept per attribute by the
+    EventSubscriptionMixin, so that the subscriptions can be updated at
+    runtime when the SDP Master FQDN or the attributes to be monitored
+    change.
+    """
+
+    def __init__(
+        self,
+        component_manager,
+        logger: logging.Logger = LOGGER,
+        attribute_list: Optional[List[str]] = None,
+        max_workers: int = 1,
+        proxy_timeout: int = 500,
+        event_subscription_check_period: int = 1,
+    ):
+        super().__init__(
+            component_manager=component_manager,
+            logger=logger,
+            attribute_list=attribute_list,
+            max_workers=max_workers,
+            proxy_timeout=proxy_timeout,
+            event_subscription_check_period=event_subscription_check_period,
+        )
+        self._event_subscription_check_period = event_subscription_check_period
+        self._stop = False
+        self._component_manager = component_manager
+        self._init_subscriptions()
+
+    def run(self):
+        self._start_time = time.time()
+        self.retry_subscriptions()
@@ -0,0 +1,238 @@
+"""Aggregation of the SDP Subarray health for the SDP Master Leaf Node"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ska_control_model import HealthState, ObsState
+from ska_tmc_common.dev_factory import DevFactory
+
+from ska_tmc_sdpsubarrayleafnode.manager.event_subscriptions import (
+    EventSubscriptionMixin,
+)
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+# Health states from the worst to the best one
+HEALTH_STATE_SEVERITY: Tuple[HealthState, ...] = (
+    HealthState.FAILED,
+    HealthState.UNKNOWN,
+    HealthState.DEGRADED,
+    HealthState.OK,
+)
+
+
+class SdpSubarrayHealthAggregator(EventSubscriptionMixin):
+    """
+    The SdpSubarrayHealthAggregator subscribes to the healthState and
+    obsState attributes of the SDP Subarrays and keeps, for the SDP as a
+    whole, the number of subarrays in every health state and obsState and
+    the worst health state.
+
+    The counts are updated incrementally on every event, hence an event
+    costs the same whatever the number of SDP Subarrays. A SDP Subarray
+    which has not reported its health state yet is counted as UNKNOWN.
+
+    The subscribed attributes are (FQDN, attribute name) pairs, subscribed
+    and retried one at a time by the EventSubscriptionMixin.
+    """
+
+    ATTRIBUTES: Tuple[str, ...] = ("healthState", "obsState")
+
+    def __init__(
+        self,
+        sdp_subarray_dev_names: List[str],
+        logger: logging.Logger = LOGGER,
+        update_callback: Optional[
+            Callable[[HealthState, List[int], List[int]], None]
+        ] = None,
+        event_subscription_check_period: float = 1,
+    ) -> None:
+        """
+        Initialise a new SdpSubarrayHealthAggregator instance.
+
+        :param sdp_subarray_dev_names: FQDNs of the SDP Subarrays
+        :param logger: a logger for this aggregator
+        :param update_callback: called with the aggregate health state, the
+            health state counts and the obsState counts when they change
+        :param event_subscription_check_period: period in seconds to retry
+            the failed event subscriptions
+        """
+        self._sdp_subarray_dev_names = list(sdp_subarray_dev_names)
+        self._logger = logger
+        self._update_callback = update_callback
+        self._event_subscription_check_period = event_subscription_check_period
+        self._dev_factory = DevFactory()
+        self._lock = threading.RLock()
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+        self.attribute_tobe_subscribed: List[Tuple[str, str]] = [
+            (dev_name, attribute)
+            for dev_name in self._sdp_subarray_dev_names
+            for attribute in self.ATTRIBUTES
+        ]
+        self._init_subscriptions()
+        self._health_states: Dict[str, HealthState] = {
+            dev_name: HealthState.UNKNOWN
+            for dev_name in self._sdp_subarray_dev_names
+        }
+        self._obs_states: Dict[str, ObsState] = {}
+        self._health_state_counts: List[int] = [0] * (
+            max(HealthState).value + 1
+        )
+        self._health_state_counts[HealthState.UNKNOWN] = len(
+            self._health_states
+        )
+        self._obs_state_counts: List[int] = [0] * (max(ObsState).value + 1)
+        self._aggregate_health_state: HealthState = self._worst_health_state()
+
+    @property
+    def aggregate_health_state(self) -> HealthState:
+        """Returns the worst health state of the SDP Subarrays."""
+        with self._lock:
+            return self._aggregate_health_state
+
+    @property
+    def health_state_counts(self) -> List[int]:
+        """Returns the number of SDP Subarrays per health state, indexed by
+        the HealthState value."""
+        with self._lock:
+            return list(self._health_state_counts)
+
+    @property
+    def obs_state_counts(self) -> List[int]:
+        """Returns the number of SDP Subarrays per obsState, indexed by the
+        ObsState value."""
+        with self._lock:
+            return list(self._obs_state_counts)
+
+    def start(self) -> None:
+        """Starts the event subscription thread."""
+        self._stop = False
+        self._start_time = time.time()
+        self._thread = threading.Thread(
+            target=self.retry_subscriptions,
+            name="sdp_subarray_health_aggregator",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the event subscription thread and drops the event
+        subscriptions."""
+        self._stop = True
+        self.unsubscribe_attributes(self.attribute_tobe_subscribed)
+
+    def update_health_state(
+        self, dev_name: str, health_state: HealthState
+    ) -> None:
+        """
+        Updates the health state of a SDP Subarray and the aggregate.
+
+        :param dev_name: FQDN of the SDP Subarray
+        :param health_state: new health state of the SDP Subarray
+        """
+        health_state = HealthState(health_state)
+        with self._lock:
+            previous_health_state = self._health_states.get(dev_name)
+            if previous_health_state == health_state:
+                return
+            if previous_health_state is not None:
+                self._health_state_counts[previous_health_state] -= 1
+            self._health_state_counts[health_state] += 1
+            self._health_states[dev_name] = health_state
+            self._aggregate_health_state = self._worst_health_state()
+            aggregate = self._snapshot()
+        self._notify(*aggregate)
+
+    def update_obs_state(self, dev_name: str, obs_state: ObsState) -> None:
+        """
+        Updates the obsState of a SDP Subarray and the obsState counts.
+
+        :param dev_name: FQDN of the SDP Subarray
+        :param obs_state: new obsState of the SDP Subarray
+        """
+        obs_state = ObsState(obs_state)
+        with self._lock:
+            previous_obs_state = self._obs_states.get(dev_name)
+            if previous_obs_state == obs_state:
+                return
+            if previous_obs_state is not None:
+                self._obs_state_counts[previous_obs_state] -= 1
+            self._obs_state_counts[obs_state] += 1
+            self._obs_states[dev_name] = obs_state
+            aggregate = self._snapshot()
+        self._notify(*aggregate)
+
+    def _worst_health_state(self) -> HealthState:
+        """Returns the worst health state with a non zero count."""
+        for health_state in HEALTH_STATE_SEVERITY:
+            if self._health_state_counts[health_state]:
+                return health_state
+        return HealthState.UNKNOWN
+
+    def _snapshot(self) -> Tuple[HealthState, List[int], List[int]]:
+        """Returns a copy of the aggregate, to be called with the lock
+        held."""
+        return (
+            self._aggregate_health_state,
+            list(self._health_state_counts),
+            list(self._obs_state_counts),
+        )
+
+    def _notify(
+        self,
+        aggregate_health_state: HealthState,
+        health_state_counts: List[int],
+        obs_state_counts: List[int],
+    ) -> None:
+        """Calls the update callback with a snapshot of the aggregate. It is
+        called without the lock held, so that the callback can not block
+        the event handling of the other SDP Subarrays."""
+        if self._update_callback is None:
+            return
+        try:
+            self._update_callback(
+                aggregate_health_state, health_state_counts, obs_state_counts
+            )
+        except Exception as exception:
+            self._logger.exception(
+                "Exception occured in the SDP aggregate health callback: %s",
+                exception,
+            )
+
+    def _handle_event(self, dev_name: str, attribute: str, event) -> None:
+        """
+        Handles the healthState and obsState change events of the SDP
+        Subarrays.
+
+        :param dev_name: FQDN of the SDP Subarray
+        :param attribute: name of the attribute
+        :param event: the change event
+        """
+        if event.err:
+            self._logger.error(
+                "Received error event for %s of %s: %s",
+                attribute,
+                dev_name,
+                event.errors,
+            )
+            return
+        if attribute == "healthState":
+            self.update_health_state(dev_name, event.attr_value.value)
+        else:
+            self.update_obs_state(dev_name, event.attr_value.value)
+
+    def _get_attribute_device(self, attribute: Tuple[str, str]) -> str:
+        """Returns the FQDN of the SDP Subarray of the attribute."""
+        return attribute[0]
+
+    def _get_attribute_name(self, attribute: Tuple[str, str]) -> str:
+        """Returns the Tango name of the attribute."""
+        return attribute[1]
+
+    def _handle_subscribed_event(
+        self, attribute: Tuple[str, str], event
+    ) -> None:
+        """Forwards the event of the attribute to _handle_event."""
+        self._handle_event(attribute[0], attribute[1], event)
@@ -2,9 +2,11 @@
 SDP Master Leaf node acts as a SDP contact point for the Master Node and also
 monitors and issues commands to the SDP Master.
 """
-from typing import Union
+import json
+import time
+from typing import List, Union
 
-from ska_control_model import AdminMode, HealthState
+from ska_control_model import AdminMode, HealthState, ObsState
 from ska_tango_base.commands import ResultCode, SubmittedSlowCommand
 from ska_tmc_common.enum import LivelinessProbeType
 from ska_tmc_common.exceptions import CommandNotAllowed, DeviceUnresponsive
@@ -12,10 +14,11 @@ from ska_tmc_common.v1.tmc_base_leaf_device import TMCBaseLeafDevice
 from tango import AttrWriteType, DebugIt
 from tango.server import attribute, command, device_property, run
 
-from ska_tmc_sdpmasterleafnode.commands.set_controller_admin_mode import (
-    SetAdminMode,
+from ska_tmc_sdpmasterleafnode import IMPORT_START_TIME, commands
+from ska_tmc_sdpmasterleafnode.manager import (
+    SamplingProfiler,
+    SdpMLNComponentManager,
 )
-from ska_tmc_sdpmasterleafnode.manager import SdpMLNComponentManager
 from ska_tmc_sdpmasterleafnode.release import description, name, version
 
 __all__ = ["TmcLeafNodeSdp", "main"]
@@ -42,6 +45,33 @@ class TmcLeafNodeSdp(TMCBaseLeafDevice):
         default_value=True,
     )
 
+    SdpSubarrayFQDNs = device_property(
+        dtype=("str",),
+        doc="FQDNs of the SDP Subarrays to which the On and Off commands "
+        + "are sent concurrently with the SDP Master.",
+        default_value=[],
+    )
+
+    SdpAggregateHealthFQDNs = device_property(
+        dtype=("str",),
+        doc="FQDNs of the SDP Subarrays whose healthState and obsState are "
+        + "aggregated.",
+        default_value=[],
+    )
+
+    ProfilingOutputDirectory = device_property(
+        dtype="str",
+        doc="Directory of the files written by the StartProfiling command.",
+        default_value="/tmp",
+    )
+
+    ExecutorMetricsFile = device_property(
+        dtype="str",
+        doc="""Path of the file where the task executor metrics are written
+        in the Prometheus text exposition format. Not written if empty.""",
+        default_value="",
+    )
+
     # -----------------
     # Attributes
     # -----------------
@@ -56,14 +86,83 @@ class TmcLeafNodeSdp(TMCBaseLeafDevice):
         access=AttrWriteType.READ_WRITE,
     )
 
+    sdpControllerStateTransitions = attribute(
+        dtype="DevString",
+        access=AttrWriteType.READ,
+        doc="""Json String representing the last transition of state,
+        healthState, adminMode and responsiveness of the SDP controller with
+        their timestamps.""",
+    )
+
+    sdpAggregateHealth = attribute(
+        dtype=HealthState,
+        access=AttrWriteType.READ,
+        doc="Worst health state of the SDP Subarrays.",
+    )
+
+    sdpSubarrayHealthStateCounts = attribute(
+        dtype=("DevLong",),
+        max_dim_x=len(HealthState),
+        access=AttrWriteType.READ,
+        doc="Number of SDP Subarrays per health state, indexed by the "
+        + "HealthState value.",
+    )
+
+    sdpSubarrayObsStateCounts = attribute(
+        dtype=("DevLong",),
+        max_dim_x=len(ObsState),
+        access=AttrWriteType.READ,
+        doc="Number of SDP Subarrays per obsState, indexed by the ObsState "
+        + "value.",
+    )
+
+    resourceInventory = attribute(
+        dtype="DevString",
+        access=AttrWriteType.READ,
+        doc="""Json String representing the threads of the device server with
+        their purpose, CPU time and last active time, and the number of device
+        proxies and event subscriptions.""",
+    )
+
+    executorMetrics = attribute(
+        dtype="DevString",
+        access=AttrWriteType.READ,
+        doc="""Json String representing the queued and running tasks, the
+        submitted and rejected tasks and the queue wait time per command, and
+        the busy ratio of the task executor.""",
+    )
+
+    startupTiming = attribute(
+        dtype="DevString",
+        access=AttrWriteType.READ,
+        doc="""Json String representing the time in seconds of every startup
+        phase: imports, init, event subscription and first event. The event
+        subscription and first event times are measured from the start of the
+        event receiver.""",
+    )
+
     # ---------------
     # General methods
     # ---------------
 
     def __init__(self, *args, **kwargs):
         self._issubsystemavailable: bool = False
+        self._init_duration = None
+        self._sdp_aggregate_health: HealthState = HealthState.UNKNOWN
+        self._sdp_subarray_health_state_counts: List[int] = []
+        self._sdp_subarray_obs_state_counts: List[int] = []
         super().__init__(*args, **kwargs)
 
+    def init_device(self):
+        init_start_time = time.time()
+        super().init_device()
+        self.profiler = SamplingProfiler(
+            self.ProfilingOutputDirectory,
+            file_prefix=self.get_name().replace("/", "_"),
+            logger=self.logger,
+        )
+        self._init_duration = time.time() - init_start_time
+
     class InitCommand(TMCBaseLeafDevice.InitCommand):
         """
         A class for the TMC SdpMasterLeafNode's init_device() method.
@@ -97,6 +196,9 @@ class TmcLeafNodeSdp(TMCBaseLeafDevice):
                 "isSubsystemAvailable",
                 "sdpControllerAdminMode",
                 "isAdminModeEnabled",
+                "sdpAggregateHealth",
+                "sdpSubarrayHealthStateCounts",
+                "sdpSubarrayObsStateCounts",
             ]:
                 device.set_change_event(attribute_name, True, False)
                 device.set_archive_event(attribute_name, True)
@@ -138,18 +240,76 @@ class TmcLeafNodeSdp(TMCBaseLeafDevice):
                 exception,
             )
 
+    def update_sdp_aggregate_health_callback(
+        self,
+        aggregate_health: HealthState,
+        health_state_counts: List[int],
+        obs_state_counts: List[int],
+    ) -> None:
+        """Change event callback for the SDP aggregate health attributes"""
+        self._sdp_aggregate_health = aggregate_health
+        self._sdp_subarray_health_state_counts = health_state_counts
+        self._sdp_subarray_obs_state_counts = obs_state_counts
+        for attribute_name, value in [
+            ("sdpAggregateHealth", aggregate_health),
+            ("sdpSubarrayHealthStateCounts", health_state_counts),
+            ("sdpSubarrayObsStateCounts", obs_state_counts),
+        ]:
+            self.push_change_archive_events(attribute_name, value)
+
+    def read_sdpAggregateHealth(self) -> HealthState:
+        """Return the worst health state of the SDP Subarrays."""
+        return self._sdp_aggregate_health
+
+    def read_sdpSubarrayHealthStateCounts(self) -> List[int]:
+        """Return the number of SDP Subarrays per health state."""
+        return self._sdp_subarray_health_state_counts
+
+    def read_sdpSubarrayObsStateCounts(self) -> List[int]:
+        """Return the number of SDP Subarrays per obsState."""
+        return self._sdp_subarray_obs_state_counts
+
     def read_isSubsystemAvailable(self) -> bool:
         """Returns the TMC Sdp MasterLeafNode
         isSubsystemAvailable attribute."""
         return self._issubsystemavailable
 
+    def read_resourceInventory(self) -> str:
+        """Return the thread and resource inventory"""
+        return json.dumps(self.component_manager.get_resource_inventory())
+
+    def read_executorMetrics(self) -> str:
+        """Return the task executor metrics"""
+        return json.dumps(
+            self.component_manager.executor_metrics.get_metrics()
+        )
+
+    def read_startupTiming(self) -> str:
+        """Return the startup time of every phase in seconds"""
+        startup_timing = {
+            "imports": IMPORTS_DURATION,
+            "init": self._init_duration,
+            "subscription": None,
+            "first_event": None,
+        }
+        event_receiver = getattr(
+            self.component_manager, "_event_receiver", None
+        )
+        if event_receiver is not None:
+            startup_timing.update(event_receiver.startup_timing)
+        return json.dumps(startup_timing)
+
+    def read_sdpControllerStateTransitions(self) -> str:
+        """Return the last state transitions of the SDP controller."""
+        return json.dumps(self.component_manager.get_state_transitions())
+
     def read_sdpMasterDevName(self) -> str:
         """Return the sdpmasterdevname attribute."""
         return self.component_manager.sdp_master_device_name
 
     def write_sdpMasterDevName(self, value: str) -> None:
         """Set the sdpmasterdevname attribute."""
-        self.component_manager.sdp_master_device_name = value
+        self.component_manager.update_sdp_master_dev_name(value)
 
     @attribute(
         dtype=AdminMode,
@@ -192,6 +352,40 @@ class TmcLeafNodeSdp(TMCBaseLeafDevice):
         """
         return self.component_manager.is_command_allowed("Off")
 
+    @command(
+        dtype_in="DevVarDoubleArray",
+        doc_in="Profiling duration and sampling interval in seconds",
+        dtype_out="DevVarLongStringArray",
+    )
+    @DebugIt()
+    def StartProfiling(self, argin: List[float]):
+        """
+        This command starts sampling the stacks of all the threads of the
+        device server. The collapsed stacks and pstats files are written in
+        ProfilingOutputDirectory at the end of the duration or on
+        StopProfiling.
+        """
+        try:
+            self.profiler.start(*argin)
+        except (TypeError, ValueError, RuntimeError) as exception:
+            return [ResultCode.REJECTED], [str(exception)]
+        return [ResultCode.OK], ["Profiling started"]
+
+    @command(dtype_out="DevVarLongStringArray")
+    @DebugIt()
+    def StopProfiling(self):
+        """
+        This command stops the profiling in progress and returns the paths
+        of the collapsed stacks and pstats files.
+        """
+        try:
+            collapsed_path, pstats_path = self.profiler.stop()
+        except RuntimeError as exception:
+            return [ResultCode.REJECTED], [str(exception)]
+        return [ResultCode.OK], [
+            json.dumps({"collapsed": collapsed_path, "pstats": pstats_path})
+        ]
+
     @command(
         dtype_in=AdminMode,
         doc_in="The adminMode in enum format",
@@ -305,6 +499,15 @@ class TmcLeafNodeSdp(TMCBaseLeafDevice):
             liveliness_check_period=self.LivelinessCheckPeriod,
             adapter_timeout=self.AdapterTimeOut,
             _update_availablity_callback=self.update_availablity_callback,
+            sdp_subarray_dev_names=list(self.SdpSubarrayFQDNs or []),
+            sdp_aggregate_health_dev_names=list(
+                self.SdpAggregateHealthFQDNs or []
+            ),
+            _update_sdp_aggregate_health_callback=(
+                self.update_sdp_aggregate_health_callback
+            ),
+            executor_metrics_file=self.ExecutorMetricsFile,
+            executor_metrics_labels={"device": self.get_name()},
         )
         component_manager.sdp_master_device_name = self.SdpMasterFQDN or ""
         return component_manager
@@ -333,7 +536,7 @@ class TmcLeafNodeSdp(TMCBaseLeafDevice):
 
             self.register_command_object(
                 "SetAdminMode",
-                SetAdminMode(self.logger, self.component_manager),
+                commands.SetAdminMode(self.logger, self.component_manager),
             )
 
 
@@ -342,6 +545,10 @@ class TmcLeafNodeSdp(TMCBaseLeafDevice):
 # ----------
 
 
+# Time taken to import the device server modules
+IMPORTS_DURATION: float = time.time() - IMPORT_START_TIME
+
+
 def main(args=None, **kwargs):
     """
     Runs the TmcLeafNodeSdp.
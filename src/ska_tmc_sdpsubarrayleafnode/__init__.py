@@ -10,3 +10,14 @@
 """
 SdpSubarrayLeafNode
 """
+import time
+
+# Start of the package import, used for the startup timing breakdown. It is
+# taken before any third-party package is imported.
+IMPORT_START_TIME: float = time.time()
+
+from ska_ser_logging import configure_logging  # noqa: E402
+
+# Logging is configured once for the whole package, instead of at the import
+# of every module
+configure_logging()
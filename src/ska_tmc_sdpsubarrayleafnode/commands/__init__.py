@@ -1,29 +1,41 @@
 """
 Init module for SDP Subarray Leaf Node.
+
+The command classes are imported on first use, so that importing the package
+does not load every command module.
 """
+import importlib
+from typing import Any
+
+_COMMAND_MODULES = {
+    "On": "on_command",
+    "Off": "off_command",
+    "AssignResources": "assign_resources_command",
+    "Configure": "configure_command",
+    "Scan": "scan_command",
+    "EndScan": "end_scan_command",
+    "End": "end_command",
+    "ReleaseAllResources": "release_resources_command",
+    "Abort": "abort_command",
+    "Restart": "restart_command",
+    "SetAdminMode": "set_sdp_subarray_admin_mode",
+    "PrepareConfigurations": "prepare_configurations",
+    "SdpSLNCommand": "sdp_sln_command",
+    "CommandContext": "sdp_sln_command",
+}
+
+__all__ = list(_COMMAND_MODULES)
+
+
+def __getattr__(name: str) -> Any:
+    """Imports the command class on first access."""
+    if name not in _COMMAND_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f"{__name__}.{_COMMAND_MODULES[name]}")
+    command_class = getattr(module, name)
+    globals()[name] = command_class
+    return command_class
 
-from .abort_command import Abort
-from .assign_resources_command import AssignResources
-from .configure_command import Configure
-from .end_command import End
-from .end_scan_command import EndScan
-from .off_command import Off
-from .on_command import On
-from .release_resources_command import ReleaseAllResources
-from .restart_command import Restart
-from .scan_command import Scan
-from .set_sdp_subarray_admin_mode import SetAdminMode
 
-__all__ = [
-    "On",
-    "Off",
-    "AssignResources",
-    "Configure",
-    "Scan",
-    "EndScan",
-    "End",
-    "ReleaseAllResources",
-    "Abort",
-    "Restart",
-    "SetAdminMode",
-]
+def __dir__():
+    return sorted(list(globals()) + __all__)
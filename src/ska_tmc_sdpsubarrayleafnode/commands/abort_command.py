@@ -40,6 +40,7 @@ class Abort(SdpSLNCommand):
                 self.sdp_subarray_adapter.dev_name,
             )
             self.sdp_subarray_adapter.Abort()
+            self.trace("sdp_call_returned")
         except Exception as exception:
             self.logger.exception(
                 "Command Abort invocation failed with exception: %s", exception
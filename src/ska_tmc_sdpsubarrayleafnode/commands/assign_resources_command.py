@@ -5,14 +5,11 @@ from __future__ import annotations
 
 import json
 import logging
-import time
 from json import JSONDecodeError
-from typing import TYPE_CHECKING, Callable, Optional, Tuple
+from typing import TYPE_CHECKING, Tuple
 
-from ska_ser_logging import configure_logging
 from ska_tango_base.commands import ResultCode
 from ska_tango_base.control_model import ObsState
-from ska_tmc_common import TimeKeeper, TimeoutCallback
 from ska_tmc_common.v1.error_propagation_tracker import (
     error_propagation_tracker,
 )
@@ -20,7 +17,6 @@ from ska_tmc_common.v1.timeout_tracker import timeout_tracker
 
 from ska_tmc_sdpsubarrayleafnode.commands.sdp_sln_command import SdpSLNCommand
 
-configure_logging()
 LOGGER = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
@@ -40,14 +36,6 @@ class AssignResources(SdpSLNCommand):
     ):
         super().__init__(component_manager, logger)
         self.component_manager = component_manager
-        self.timeout_id: str = f"{time.time()}_{__class__.__name__}"
-        self.timeout_callback: Optional[
-            Callable[[str, logging.Logger], None]
-        ] = TimeoutCallback(self.timeout_id, self.logger)
-        self.timekeeper = TimeKeeper(
-            self.component_manager.command_timeout, logger
-        )
-        self.component_manager.command_in_progress = "AssignResources"
 
     # It is observed that the transitional obsState events are not received on
     # SDP Subarray Leaf Node while testing with real SDP on low-software
@@ -161,13 +149,13 @@ class AssignResources(SdpSLNCommand):
             )
 
         try:
-            json_argument[
-                "interface"
-            ] = "https://schema.skao.int/ska-sdp-assignres/0.4"
-
             self.sdp_subarray_adapter.AssignResources(
-                json.dumps(json_argument), self.component_manager.cmd_ended_cb
+                self.component_manager.interface_registry.render(
+                    "AssignResources", json_argument
+                ),
+                self.component_manager.cmd_ended_cb,
             )
+            self.trace("sdp_call_returned")
 
         except Exception as exception:
             self.logger.exception(
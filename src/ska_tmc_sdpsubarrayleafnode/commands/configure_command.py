@@ -6,14 +6,12 @@ from __future__ import annotations
 
 import json
 import logging
-import time
 from json import JSONDecodeError
-from typing import TYPE_CHECKING, Callable, Tuple
+from typing import TYPE_CHECKING, Any, Dict, Tuple, Union
 
-from ska_ser_logging import configure_logging
 from ska_tango_base.commands import ResultCode
 from ska_tango_base.control_model import ObsState
-from ska_tmc_common import TimeKeeper, TimeoutCallback
+from ska_tango_base.executor import TaskStatus
 from ska_tmc_common.v1.error_propagation_tracker import (
     error_propagation_tracker,
 )
@@ -21,7 +19,6 @@ from ska_tmc_common.v1.timeout_tracker import timeout_tracker
 
 from ska_tmc_sdpsubarrayleafnode.commands.sdp_sln_command import SdpSLNCommand
 
-configure_logging()
 LOGGER = logging.getLogger(__name__)
 
 
@@ -29,6 +26,22 @@ if TYPE_CHECKING:
     from ..manager.component_manager import SdpSLNComponentManager
 
 
+def get_configuration_error(json_argument: Dict[str, Any]) -> str:
+    """
+    Returns the error of a Configure argument.
+
+    :param json_argument: parsed Configure argument
+    :return: the error message, empty if the argument is valid
+    """
+    if "interface" not in json_argument:
+        return "Missing interface key"
+    if "scan_type" not in json_argument:
+        return "Missing scan_type key"
+    if json_argument["scan_type"] == "":
+        return "Missing scan_type value."
+    return ""
+
+
 class Configure(SdpSLNCommand):
     """
     This class implements the Configure command for SdpSubarray.
@@ -45,14 +58,6 @@ class Configure(SdpSLNCommand):
     ) -> None:
         super().__init__(component_manager, logger)
         self.component_manager = component_manager
-        self.timeout_id: str = f"{time.time()}_{__class__.__name__}"
-        self.timeout_callback: Callable = TimeoutCallback(
-            self.timeout_id, self.logger
-        )
-        self.timekeeper = TimeKeeper(
-            self.component_manager.command_timeout, logger
-        )
-        self.component_manager.command_in_progress = "Configure"
 
     # Once we will refactor the tracker thread will enable this intermediate
     # ObsState check.
@@ -76,7 +81,14 @@ class Configure(SdpSLNCommand):
         Method to invoke Configure command on SDP Subarray. \
 
         :param argin: The string in JSON format. \
-        The JSON contains following values: \
+        The JSON contains following values, its interface must be the \
+        SDP configure schema of a registered SDP interface version and is \
+        sent unchanged. If SDP Subarray is \
+        READY with the same configuration, the command completes without \
+        being sent, and if only the scan_type differs, only the scan_type \
+        is sent. A JSON with only the scan_type of a configuration \
+        prepared by PrepareConfigurations sends that configuration, with \
+        the interface it was prepared with: \
 
         Example: \
             { \
@@ -110,33 +122,82 @@ class Configure(SdpSLNCommand):
                 ),
             )
 
-        if "interface" not in json_argument:
-            return self.component_manager.generate_command_result(
-                ResultCode.FAILED,
-                "Missing interface key",
+        configuration_cache = self.component_manager.configuration_cache
+        prepared_configuration = None
+        if list(json_argument) == ["scan_type"]:
+            prepared_configuration = configuration_cache.get_prepared(
+                json_argument["scan_type"]
             )
-
-        if "scan_type" not in json_argument:
-            return self.component_manager.generate_command_result(
-                ResultCode.FAILED,
-                "Missing scan_type key",
+        if prepared_configuration is None:
+            error = get_configuration_error(json_argument)
+            if error:
+                return self.component_manager.generate_command_result(
+                    ResultCode.FAILED,
+                    error,
+                )
+        else:
+            json_argument = prepared_configuration.configuration
+
+        interface_registry = self.component_manager.interface_registry
+        if prepared_configuration is not None:
+            configuration, configuration_hash, payload = prepared_configuration
+        else:
+            try:
+                interface = interface_registry.get_argument_interface(
+                    "Configure", json_argument
+                )
+            except ValueError as exception:
+                return self.component_manager.generate_command_result(
+                    ResultCode.FAILED,
+                    str(exception),
+                )
+            if not interface_registry.is_registered("Configure", interface):
+                self.logger.warning(
+                    "Configure interface %s is not registered, "
+                    + "the argument is passed through",
+                    interface,
+                )
+            configuration = dict(json_argument, interface=interface)
+            configuration_hash = ""
+            payload = ""
+        delta = configuration_cache.get_delta(
+            configuration, configuration_hash
+        )
+        configured = self.component_manager.get_obs_state() == ObsState.READY
+        if configured and delta["unchanged"]:
+            self.logger.info(
+                "Configuration unchanged, Configure command not invoked on: %s",
+                self.sdp_subarray_adapter.dev_name,
             )
-
-        if json_argument["scan_type"] == "":
-            return self.component_manager.generate_command_result(
-                ResultCode.FAILED,
-                "Missing scan_type value.",
+            self.trace("configuration_unchanged")
+            return (
+                ResultCode.OK,
+                "Command Completed",
+            )
+        if configured and delta["changed_keys"] == ["scan_type"]:
+            # The scan types are already defined on SDP Subarray
+            payload = interface_registry.render(
+                "Configure",
+                {"scan_type": configuration["scan_type"]},
+                configuration["interface"],
+            )
+        elif not payload:
+            payload = interface_registry.render(
+                "Configure", configuration, configuration["interface"]
             )
 
         self.logger.info(
-            "Invoking Configure command on: %s",
+            "Invoking Configure command on: %s, changed keys: %s",
             self.sdp_subarray_adapter.dev_name,
+            delta["changed_keys"],
         )
 
         try:
+            configuration_cache.stage(configuration, delta["hash"])
             self.sdp_subarray_adapter.Configure(
-                json.dumps(json_argument), self.component_manager.cmd_ended_cb
+                payload, self.component_manager.cmd_ended_cb
             )
+            self.trace("sdp_call_returned")
 
         except Exception as exception:
             self.logger.exception(
@@ -164,3 +225,25 @@ class Configure(SdpSLNCommand):
             ResultCode.OK,
             "Command Completed",
         )
+
+    def update_task_status(
+        self,
+        **kwargs: Dict[str, Union[Tuple[ResultCode, str], TaskStatus, str]],
+    ) -> None:
+        """
+        Update the status of a task. The configuration sent is recorded as
+        applied if the command completed, and forgotten if it failed.
+
+        Args:
+            **kwargs: Keyword arguments for task status update.
+        """
+        result = kwargs.get("result")
+        status = kwargs.get("status", TaskStatus.COMPLETED)
+        configuration_cache = self.component_manager.configuration_cache
+        if status in (TaskStatus.ABORTED, TaskStatus.FAILED) or (
+            result and result[0] == ResultCode.FAILED
+        ):
+            configuration_cache.clear()
+        elif status == TaskStatus.COMPLETED and result:
+            configuration_cache.commit()
+        super().update_task_status(**kwargs)
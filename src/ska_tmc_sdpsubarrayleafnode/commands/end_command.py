@@ -4,13 +4,10 @@ End command class for SdpSubarrayLeafNode.
 from __future__ import annotations
 
 import logging
-import time
 from typing import TYPE_CHECKING, Tuple
 
-from ska_ser_logging import configure_logging
 from ska_tango_base.commands import ResultCode
 from ska_tango_base.control_model import ObsState
-from ska_tmc_common import TimeoutCallback
 from ska_tmc_common.v1.error_propagation_tracker import (
     error_propagation_tracker,
 )
@@ -18,7 +15,6 @@ from ska_tmc_common.v1.timeout_tracker import timeout_tracker
 
 from ska_tmc_sdpsubarrayleafnode.commands.sdp_sln_command import SdpSLNCommand
 
-configure_logging()
 LOGGER = logging.getLogger(__name__)
 if TYPE_CHECKING:
     from ..manager.component_manager import SdpSLNComponentManager
@@ -38,10 +34,7 @@ class End(SdpSLNCommand):
         logger: logging.Logger = LOGGER,
     ) -> None:
         super().__init__(component_manager, logger)
-        self.timeout_id = f"{time.time()}_{__class__.__name__}"
-        self.timeout_callback = TimeoutCallback(self.timeout_id, self.logger)
         self.component_manager = component_manager
-        self.component_manager.command_in_progress = "End"
 
     @timeout_tracker
     @error_propagation_tracker("get_obs_state", [ObsState.IDLE])
@@ -69,6 +62,7 @@ class End(SdpSLNCommand):
             return return_code, message
         try:
             self.sdp_subarray_adapter.End()
+            self.trace("sdp_call_returned")
         except Exception as exception:
             self.logger.exception(
                 "Command End "
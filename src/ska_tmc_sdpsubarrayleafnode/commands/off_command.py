@@ -36,6 +36,7 @@ class Off(SdpSLNCommand):
         :param task_abort_event: Check for abort, defaults to None
         :type task_abort_event: Event, optional
         """
+        self.task_callback = task_callback
         task_callback(status=TaskStatus.IN_PROGRESS)
         result_code, message = self.do()
 
@@ -45,17 +46,11 @@ class Off(SdpSLNCommand):
             result_code,
             message,
         )
-        if result_code == ResultCode.FAILED:
-            task_callback(
-                status=TaskStatus.COMPLETED,
-                result=(result_code, message),
-                exception=message,
-            )
-        else:
-            task_callback(
-                status=TaskStatus.COMPLETED,
-                result=(result_code, message),
-            )
+        self.update_task_status(
+            result=(result_code, message),
+            status=TaskStatus.COMPLETED,
+            exception=message,
+        )
 
     # pylint: enable=unused-argument
 
@@ -70,6 +65,7 @@ class Off(SdpSLNCommand):
 
         try:
             self.sdp_subarray_adapter.Off()
+            self.trace("sdp_call_returned")
         except Exception as exception:
             self.logger.exception(
                 "Command Off invocation failed with exception: %s", exception
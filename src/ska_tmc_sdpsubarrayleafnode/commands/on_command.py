@@ -36,6 +36,7 @@ class On(SdpSLNCommand):
         :param task_abort_event: Check for abort, defaults to None
         :type task_abort_event: Event, optional
         """
+        self.task_callback = task_callback
         task_callback(status=TaskStatus.IN_PROGRESS)
         result_code, message = self.do()
         logger.info(
@@ -44,17 +45,11 @@ class On(SdpSLNCommand):
             result_code,
             message,
         )
-        if result_code == ResultCode.FAILED:
-            task_callback(
-                status=TaskStatus.COMPLETED,
-                result=(result_code, message),
-                exception=message,
-            )
-        else:
-            task_callback(
-                status=TaskStatus.COMPLETED,
-                result=(result_code, message),
-            )
+        self.update_task_status(
+            result=(result_code, message),
+            status=TaskStatus.COMPLETED,
+            exception=message,
+        )
 
     # pylint: enable=unused-argument
 
@@ -68,6 +63,7 @@ class On(SdpSLNCommand):
             return return_code, message
         try:
             self.sdp_subarray_adapter.On()
+            self.trace("sdp_call_returned")
         except Exception as exception:
             self.logger.exception(
                 "Command On invocation failed with exception: %s", exception
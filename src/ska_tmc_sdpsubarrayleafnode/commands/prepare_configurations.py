@@ -0,0 +1,126 @@
+"""
+PrepareConfigurations command class for SdpSubarrayLeafNode.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from json import JSONDecodeError
+from typing import TYPE_CHECKING, Dict, Tuple
+
+from ska_tango_base.commands import ArgumentValidator, FastCommand, ResultCode
+
+from ska_tmc_sdpsubarrayleafnode.commands.configure_command import (
+    get_configuration_error,
+)
+from ska_tmc_sdpsubarrayleafnode.manager.configuration_cache import (
+    PreparedConfiguration,
+    canonicalize,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    from ..manager.component_manager import SdpSLNComponentManager
+
+
+# pylint: disable = abstract-method
+class PrepareConfigurations(FastCommand):
+    """
+    A class for SDP SubarrayLeafNode's PrepareConfigurations() command.
+
+    PrepareConfigurations validates and serialises ahead of time the
+    Configure arguments of an execution block, so that a later Configure
+    with only their scan_type sends the prepared configuration.
+    """
+
+    def __init__(
+        self,
+        component_manager: SdpSLNComponentManager,
+        logger: logging.Logger = LOGGER,
+    ) -> None:
+        """Initialization.
+
+        Args:
+            component_manager (SdpSLNComponentManager): Instance of
+            SdpSLNComponentManager.
+            logger (logging.Logger): Used for logging.
+        """
+        super().__init__(logger)
+        self.component_manager = component_manager
+        self._validator = ArgumentValidator()
+        self._name = "PrepareConfigurations"
+
+    # pylint: disable=signature-differs
+    def do(self, argin: str) -> Tuple[ResultCode, str]:
+        """
+        A method to prepare the Configure arguments. The prepared
+        configurations replace the previously prepared ones, an empty list
+        clears them.
+
+        :param argin: JSON list of Configure arguments with distinct
+            scan_type
+        """
+        try:
+            configurations = json.loads(argin)
+        except JSONDecodeError as json_error:
+            self.logger.exception(
+                "Execution of PrepareConfigurations command is failed. "
+                + "Reason: JSON parsing failed with exception: %s",
+                json_error,
+            )
+            return (
+                ResultCode.FAILED,
+                f"Exception occurred while parsing the JSON: {json_error}",
+            )
+        if not isinstance(configurations, list):
+            return ResultCode.FAILED, "Expected a list of configurations"
+
+        interface_registry = self.component_manager.interface_registry
+        prepared_configurations: Dict[str, PreparedConfiguration] = {}
+        for index, json_argument in enumerate(configurations):
+            if not isinstance(json_argument, dict):
+                return ResultCode.FAILED, f"Configuration {index}: not a JSON"
+            error = get_configuration_error(json_argument)
+            if not error and json_argument["scan_type"] in (
+                prepared_configurations
+            ):
+                error = f"Duplicate scan_type {json_argument['scan_type']}"
+            if error:
+                return ResultCode.FAILED, f"Configuration {index}: {error}"
+            try:
+                interface = interface_registry.get_argument_interface(
+                    "Configure", json_argument
+                )
+            except ValueError as exception:
+                return ResultCode.FAILED, f"Configuration {index}: {exception}"
+            if not interface_registry.is_registered("Configure", interface):
+                self.logger.warning(
+                    "Configure interface %s of configuration %s is not "
+                    + "registered, the argument is passed through",
+                    interface,
+                    index,
+                )
+            configuration = dict(json_argument, interface=interface)
+            _, configuration_hash = canonicalize(configuration)
+            prepared_configurations[
+                configuration["scan_type"]
+            ] = PreparedConfiguration(
+                configuration,
+                configuration_hash,
+                interface_registry.render(
+                    "Configure", configuration, interface
+                ),
+            )
+
+        self.component_manager.configuration_cache.prepare(
+            prepared_configurations
+        )
+        self.logger.info(
+            "Prepared the configurations of the scan types: %s",
+            list(prepared_configurations),
+        )
+        return (
+            ResultCode.OK,
+            f"Prepared {len(prepared_configurations)} configurations",
+        )
@@ -33,6 +33,7 @@ class Restart(SdpSLNCommand):
         :param task_abort_event: Check for abort, defaults to None
         :type task_abort_event: Event, optional
         """
+        self.task_callback = task_callback
         # Indicate that the task has started
         task_callback(status=TaskStatus.IN_PROGRESS)
         result_code, message = self.do()
@@ -42,17 +43,11 @@ class Restart(SdpSLNCommand):
             result_code,
             message,
         )
-        if result_code == ResultCode.FAILED:
-            task_callback(
-                status=TaskStatus.COMPLETED,
-                result=(result_code, message),
-                exception=message,
-            )
-        else:
-            task_callback(
-                status=TaskStatus.COMPLETED,
-                result=(result_code, message),
-            )
+        self.update_task_status(
+            result=(result_code, message),
+            status=TaskStatus.COMPLETED,
+            exception=message,
+        )
 
     # pylint: disable=arguments-differ
     def do(self) -> Tuple[ResultCode, str]:
@@ -76,6 +71,7 @@ class Restart(SdpSLNCommand):
                 self.sdp_subarray_adapter.dev_name,
             )
             self.sdp_subarray_adapter.Restart()
+            self.trace("sdp_call_returned")
         except Exception as exception:
             self.logger.exception(
                 "Command Restart invocation failed with exception: %s",
@@ -5,14 +5,11 @@ from __future__ import annotations
 
 import json
 import logging
-import time
 from json import JSONDecodeError
-from typing import TYPE_CHECKING, Callable, Tuple
+from typing import TYPE_CHECKING, Tuple
 
-from ska_ser_logging import configure_logging
 from ska_tango_base.commands import ResultCode
 from ska_tango_base.control_model import ObsState
-from ska_tmc_common import TimeoutCallback
 from ska_tmc_common.v1.error_propagation_tracker import (
     error_propagation_tracker,
 )
@@ -20,7 +17,6 @@ from ska_tmc_common.v1.timeout_tracker import timeout_tracker
 
 from ska_tmc_sdpsubarrayleafnode.commands.sdp_sln_command import SdpSLNCommand
 
-configure_logging()
 LOGGER = logging.getLogger(__name__)
 
 
@@ -44,11 +40,6 @@ class Scan(SdpSLNCommand):
     ) -> None:
         super().__init__(component_manager, logger)
         self.component_manager = component_manager
-        self.timeout_id: str = f"{time.time()}_{__class__.__name__}"
-        self.timeout_callback: Callable = TimeoutCallback(
-            self.timeout_id, self.logger
-        )
-        self.component_manager.command_in_progress = "Scan"
 
     @timeout_tracker
     @error_propagation_tracker("get_obs_state", [ObsState.SCANNING])
@@ -113,15 +104,17 @@ class Scan(SdpSLNCommand):
             # pylint: disable=fixme
             # TODO: Incorporate transaction id implementation for scan
             # command across TMC.
-            json_argument[
-                "interface"
-            ] = "https://schema.skao.int/ska-sdp-scan/0.4"
-            self.logger.debug(
+            scan_argument = self.component_manager.interface_registry.render(
+                "Scan", json_argument
+            )
+            self.component_manager.hot_path_logger.debug(
+                "scan_argument",
                 "Input JSON for Scan command for SDP subarray %s: %s",
                 self.sdp_subarray_adapter.dev_name,
-                json_argument,
+                scan_argument,
             )
-            self.sdp_subarray_adapter.Scan(json.dumps(json_argument))
+            self.sdp_subarray_adapter.Scan(scan_argument)
+            self.trace("sdp_call_returned")
         except Exception as exception:
             self.logger.exception(
                 "Command Scan invocation failed with exception: %s", exception
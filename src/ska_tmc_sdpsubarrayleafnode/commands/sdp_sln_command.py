@@ -1,15 +1,25 @@
 """SDP Subarray Leaf Node Base Command Class for SDP Subarray Leaf Node"""
 from __future__ import annotations
 
+import functools
 import logging
+import threading
 import time
-from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from ska_control_model.task_status import TaskStatus
-from ska_ser_logging import configure_logging
 from ska_tango_base.base import TaskCallbackType
 from ska_tango_base.commands import ResultCode
-from ska_tmc_common import SdpSubArrayAdapter
+from ska_tmc_common import SdpSubArrayAdapter, TimeKeeper, TimeoutCallback
 from ska_tmc_common.adapters import AdapterType
 from ska_tmc_common.exceptions import CommandNotAllowed
 from ska_tmc_common.tmc_command import TmcLeafNodeCommand
@@ -17,7 +27,6 @@ from tango import ConnectionFailed, DevFailed, DevState
 
 if TYPE_CHECKING:
     from ..manager.component_manager import SdpSLNComponentManager
-configure_logging()
 LOGGER = logging.getLogger(__name__)
 
 
@@ -50,18 +59,299 @@ def task_callback_default(
     )
 
 
+class CommandTimeKeeper(TimeKeeper):
+    """
+    TimeKeeper of a command context which reads the timeout of the command
+    when the timer starts, so that the timeout learned from the completion
+    times of the command applies to the invocation. It records whether its
+    timer is running and whether it expired, so that the context can be
+    reused by the next invocation.
+    """
+
+    def __init__(
+        self, get_timeout: Callable[[], float], logger: logging.Logger
+    ) -> None:
+        """
+        Initialise a new CommandTimeKeeper instance.
+
+        :param get_timeout: returns the timeout of the command in seconds
+        :param logger: logger of the command
+        """
+        super().__init__(get_timeout(), logger)
+        self._get_timeout = get_timeout
+        self._timeout_callback: Optional[Callable] = None
+        self.running: bool = False
+        self.timed_out: bool = False
+
+    def start_timer(
+        self, timeout_id: str, timeout_callback: TimeoutCallback
+    ) -> None:
+        """
+        Starts the timer with the current timeout of the command.
+
+        :param timeout_id: timeout id of the invocation
+        :param timeout_callback: timeout callback of the invocation
+        """
+        self.timeout = self._get_timeout()
+        self._timeout_callback = timeout_callback
+        self.running = True
+        self.timed_out = False
+        super().start_timer(timeout_id, self._expire)
+
+    def stop_timer(self) -> None:
+        """Stops the timer of the invocation."""
+        self.running = False
+        super().stop_timer()
+
+    def _expire(self, *args: Any) -> None:
+        """Records the expiry of the timer and calls the timeout callback."""
+        self.running = False
+        self.timed_out = True
+        self._timeout_callback(*args)
+
+
+class CommandContext:
+    """
+    State of an invocation of a long lived command object. The contexts are
+    pooled by the command object: a context is bound to an invocation when
+    it is dequeued and returned to the pool once the command method and its
+    tracker thread have returned, so that its timeout id, TimeoutCallback
+    and TimeKeeper are reused by the following invocations.
+    """
+
+    __slots__ = (
+        "command_name",
+        "logger",
+        "timeout_id",
+        "timeout_callback",
+        "timekeeper",
+        "task_callback",
+        "start_time",
+        "slow_timer",
+        "references",
+    )
+
+    def __init__(
+        self,
+        command_name: str,
+        get_timeout: Callable[[], float],
+        logger: logging.Logger,
+    ) -> None:
+        """
+        Initialise a new CommandContext instance.
+
+        :param command_name: name of the command
+        :param get_timeout: returns the timeout of the command in seconds
+        :param logger: logger of the command
+        """
+        self.command_name = command_name
+        self.logger = logger
+        self.timeout_id = f"{id(self)}_{command_name}"
+        self.timeout_callback = TimeoutCallback(self.timeout_id, logger)
+        self.timekeeper = CommandTimeKeeper(get_timeout, logger)
+        self.task_callback: TaskCallbackType = task_callback_default
+        self.start_time: Optional[float] = None
+        self.slow_timer: Optional[threading.Timer] = None
+        # Number of threads running the invocation bound to the context
+        self.references: int = 0
+
+    def reset(self) -> None:
+        """
+        Prepares the context for a new invocation. A timer left running by
+        the previous invocation is stopped, and its timeout callback is
+        replaced if the previous invocation timed out.
+        """
+        if self.timekeeper.running:
+            self.timekeeper.stop_timer()
+        if self.timekeeper.timed_out:
+            self.timekeeper.timed_out = False
+            self.timeout_callback = TimeoutCallback(
+                self.timeout_id, self.logger
+            )
+        self.task_callback = task_callback_default
+        self.start_time = None
+        self.slow_timer = None
+
+
 class SdpSLNCommand(TmcLeafNodeCommand):
-    """SDP Subarray Leaf Node Class"""
+    """SDP Subarray Leaf Node Class
+
+    The command objects are created once per component manager and reused
+    for every invocation. The state of an invocation is kept in a command
+    context taken from the pool of the command object, and bound to the
+    thread running the command method and to its tracker thread.
+    """
+
+    __slots__ = (
+        "sdp_subarray_adapter",
+        "_get_timeout",
+        "_idle_context",
+        "_free_contexts",
+        "_pool_lock",
+        "_local",
+        "_invokers",
+    )
 
     def __init__(
         self,
         component_manager: SdpSLNComponentManager,
         logger: logging.Logger = LOGGER,
     ) -> None:
+        command_name = type(self).__name__
+        # The timeout is learned from the completion times of the command
+        self._get_timeout = functools.partial(
+            component_manager.adaptive_timeout.get_timeout, command_name
+        )
+        # Context of the threads which run no invocation
+        self._idle_context = CommandContext(
+            command_name, self._get_timeout, logger
+        )
+        self._free_contexts: List[CommandContext] = []
+        self._pool_lock = threading.Lock()
+        self._local = threading.local()
+        self._invokers: Dict[Callable, Callable] = {}
         super().__init__(component_manager, logger=logger)
         self.component_manager = component_manager
         self.sdp_subarray_adapter = None
-        self.task_callback: TaskCallbackType = task_callback_default
+
+    @property
+    def context(self) -> CommandContext:
+        """Returns the context of the invocation run by the calling
+        thread."""
+        return getattr(self._local, "context", None) or self._idle_context
+
+    @property
+    def timeout_id(self) -> str:
+        """Returns the timeout id of the invocation."""
+        return self.context.timeout_id
+
+    @timeout_id.setter
+    def timeout_id(self, value: str) -> None:
+        self.context.timeout_id = value
+
+    @property
+    def timeout_callback(self) -> Optional[TimeoutCallback]:
+        """Returns the timeout callback of the invocation."""
+        return self.context.timeout_callback
+
+    @timeout_callback.setter
+    def timeout_callback(self, value: TimeoutCallback) -> None:
+        self.context.timeout_callback = value
+
+    @property
+    def timekeeper(self) -> TimeKeeper:
+        """Returns the timer of the invocation."""
+        return self.context.timekeeper
+
+    @timekeeper.setter
+    def timekeeper(self, value: TimeKeeper) -> None:
+        self.context.timekeeper = value
+
+    @property
+    def task_callback(self) -> TaskCallbackType:
+        """Returns the task callback of the invocation."""
+        return self.context.task_callback
+
+    @task_callback.setter
+    def task_callback(self, value: TaskCallbackType) -> None:
+        self.context.task_callback = value
+
+    def invoke(self, method: Callable) -> Callable:
+        """
+        Returns the callable to be submitted for execution, which runs the
+        method with a command context when it is dequeued. The callable of
+        a method of the command object is created once and reused.
+
+        :param method: bound command method, e.g. configure
+        :return: callable to be submitted to the task executor
+        """
+        key = getattr(method, "__func__", method)
+        invoker = self._invokers.get(key)
+        if invoker is None:
+            invoker = functools.update_wrapper(
+                functools.partial(self._run_invocation, method), method
+            )
+            if getattr(method, "__self__", None) is self:
+                self._invokers[key] = invoker
+        return invoker
+
+    def _run_invocation(self, method: Callable, *args, **kwargs) -> Any:
+        """Runs the command method with a command context from the pool."""
+        context = self._acquire_context()
+        context.slow_timer = self.component_manager.start_command_timing(
+            context.command_name
+        )
+        context.start_time = time.time()
+        self._local.context = context
+        try:
+            self.trace("dequeued")
+            return method(*args, **kwargs)
+        finally:
+            self._local.context = None
+            self._release_context(context)
+
+    def start_tracker_thread(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Starts the thread tracking the completion of the invocation, bound
+        to the command context of the invocation.
+        """
+        context = self.context
+        with self._pool_lock:
+            context.references += 1
+        self.tracker_thread = threading.Thread(
+            target=self._track_invocation,
+            args=(context, args, kwargs),
+            name=f"track_{context.command_name}",
+            daemon=True,
+        )
+        self.tracker_thread.start()
+
+    def _track_invocation(
+        self,
+        context: CommandContext,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> None:
+        """Tracks the completion of an invocation with its context."""
+        self._local.context = context
+        try:
+            self.track_and_update_command_status(*args, **kwargs)
+        finally:
+            self._local.context = None
+            self._release_context(context)
+
+    def _acquire_context(self) -> CommandContext:
+        """Returns a context of the pool, or a new one if all are bound."""
+        with self._pool_lock:
+            context = (
+                self._free_contexts.pop() if self._free_contexts else None
+            )
+        if context is None:
+            context = CommandContext(
+                self._idle_context.command_name, self._get_timeout, self.logger
+            )
+        else:
+            context.reset()
+        context.references = 1
+        return context
+
+    def _release_context(self, context: CommandContext) -> None:
+        """Returns a context to the pool once no thread uses it."""
+        with self._pool_lock:
+            context.references -= 1
+            if context.references == 0:
+                self._free_contexts.append(context)
+
+    def trace(self, phase: str, **args: Any) -> None:
+        """
+        Records a phase of the current invocation in the command trace.
+
+        :param phase: name of the phase, e.g. sdp_call_returned
+        :param args: details of the phase
+        """
+        self.component_manager.command_tracer.mark(
+            self.context.command_name, phase, **args
+        )
 
     def check_op_state(self, command_name) -> None:
         """Checks the operational state of the device"""
@@ -84,6 +374,13 @@ class SdpSLNCommand(TmcLeafNodeCommand):
         elapsed_time: float = 0
         start_time: float = time.time()
         device = self.component_manager._sdp_subarray_dev_name
+        if (
+            self.sdp_subarray_adapter is not None
+            and self.sdp_subarray_adapter.dev_name != device
+        ):
+            # The SDP Subarray FQDN has been changed at runtime
+            self.sdp_subarray_adapter = None
+        adapter_created: bool = False
         while (
             self.sdp_subarray_adapter is None
             and elapsed_time < adapter_timeout
@@ -94,6 +391,7 @@ class SdpSLNCommand(TmcLeafNodeCommand):
                     device,
                     AdapterType.SDPSUBARRAY,
                 )
+                adapter_created = True
             except ConnectionFailed as connection_failed:
                 elapsed_time = time.time() - start_time
                 if elapsed_time > adapter_timeout:
@@ -119,6 +417,11 @@ class SdpSLNCommand(TmcLeafNodeCommand):
                     exception,
                 )
                 return ResultCode.FAILED, message
+        if adapter_created:
+            # Read the state of a (re)connected SDP Subarray before the
+            # command relies on it.
+            self.component_manager.resync_device_state_if_required()
+        self.trace("adapter_ready", adapter_created=adapter_created)
         return (ResultCode.OK, "")
 
     def update_task_status(
@@ -143,8 +446,42 @@ class SdpSLNCommand(TmcLeafNodeCommand):
                 )
             else:
                 self.task_callback(status=status, result=result)
+        trace_status = self.get_trace_status(status, result, message)
+        self.component_manager.command_tracer.end(
+            self.context.command_name, trace_status, result=str(result)
+        )
+        self.component_manager.end_command_timing(
+            self.context.command_name,
+            self.context.start_time,
+            self.context.slow_timer,
+            trace_status == TaskStatus.COMPLETED.name,
+        )
+        self.context.start_time = None
+        self.context.slow_timer = None
         self.component_manager.command_in_progress = ""
 
+    @staticmethod
+    def get_trace_status(
+        status: TaskStatus,
+        result: Optional[Tuple[ResultCode, str]],
+        message: Optional[str],
+    ) -> str:
+        """
+        Returns the final status of an invocation recorded in its trace.
+
+        :param status: task status of the invocation
+        :param result: result code and message of the invocation
+        :param message: exception message of the invocation
+        :return: ABORTED, TIMED_OUT, FAILED or the task status name
+        """
+        if status == TaskStatus.ABORTED:
+            return "ABORTED"
+        if result and result[0] == ResultCode.FAILED:
+            if "timeout" in f"{message} {result[1]}".lower():
+                return "TIMED_OUT"
+            return "FAILED"
+        return TaskStatus(status).name
+
     def init_adapter_low(self):
         self.init_adapter()
 
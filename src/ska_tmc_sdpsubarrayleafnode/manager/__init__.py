@@ -1,5 +1,41 @@
-"""Init module for SDP Subarray Leaf Node Manager"""
-from .component_manager import SdpSLNComponentManager
-from .event_receiver import SdpSLNEventReceiver
+"""Init module for SDP Subarray Leaf Node Manager
 
-__all__ = ["SdpSLNComponentManager", "SdpSLNEventReceiver"]
+The manager classes are imported on first use, so that importing the package
+does not load every manager module.
+"""
+import importlib
+from typing import Any
+
+_MANAGER_MODULES = {
+    "AdaptiveTimeout": "adaptive_timeout",
+    "AsyncReplyDispatcher": "async_reply_dispatcher",
+    "AsyncReplyMode": "async_reply_dispatcher",
+    "CommandJournal": "command_journal",
+    "CommandLanes": "command_lanes",
+    "CommandTracer": "command_tracer",
+    "ConfigurationCache": "configuration_cache",
+    "EventSubscriptionMixin": "event_subscriptions",
+    "ExecutorMetrics": "executor_metrics",
+    "InterfaceRegistry": "interface_registry",
+    "ObsStateTimeline": "obs_state_timeline",
+    "QuantileSketch": "adaptive_timeout",
+    "SamplingProfiler": "sampling_profiler",
+    "SdpSLNComponentManager": "component_manager",
+    "SdpSLNEventReceiver": "event_receiver",
+}
+
+__all__ = sorted(_MANAGER_MODULES)
+
+
+def __getattr__(name: str) -> Any:
+    """Imports the manager class on first access."""
+    if name not in _MANAGER_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f"{__name__}.{_MANAGER_MODULES[name]}")
+    manager_class = getattr(module, name)
+    globals()[name] = manager_class
+    return manager_class
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,195 @@
+"""Command timeouts learned from the completion times of the commands"""
+import math
+import threading
+from typing import Any, Dict, Optional
+
+
+class QuantileSketch:
+    """
+    Streaming quantile sketch with a bounded relative error. The values are
+    counted in logarithmic buckets, so that any quantile is estimated within
+    relative_accuracy of the exact value, with a memory bounded by the
+    range of the values rather than their number.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01) -> None:
+        """
+        Initialise a new QuantileSketch instance.
+
+        :param relative_accuracy: relative error of the quantile estimates
+        """
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count: int = 0
+        self.count: int = 0
+
+    def add(self, value: float) -> None:
+        """Adds a value to the sketch."""
+        if value <= 0:
+            self.zero_count += 1
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+
+    def get_quantile(self, quantile: float) -> Optional[float]:
+        """
+        Returns the estimate of a quantile.
+
+        :param quantile: quantile between 0 and 1, e.g. 0.99
+        :return: the estimated value, None if the sketch is empty
+        """
+        if not self.count:
+            return None
+        rank = quantile * (self.count - 1)
+        cumulative_count = self.zero_count
+        if rank < cumulative_count:
+            return 0.0
+        for index in sorted(self.buckets):
+            cumulative_count += self.buckets[index]
+            if rank < cumulative_count:
+                break
+        return 2 * self._gamma**index / (self._gamma + 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the sketch in a JSON serialisable form."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "zero_count": self.zero_count,
+            "buckets": {str(index): n for index, n in self.buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, sketch: Dict[str, Any]) -> "QuantileSketch":
+        """Returns the sketch of a dictionary returned by to_dict."""
+        quantile_sketch = cls(sketch["relative_accuracy"])
+        quantile_sketch.zero_count = sketch["zero_count"]
+        quantile_sketch.buckets = {
+            int(index): n for index, n in sketch["buckets"].items()
+        }
+        quantile_sketch.count = quantile_sketch.zero_count + sum(
+            quantile_sketch.buckets.values()
+        )
+        return quantile_sketch
+
+
+class AdaptiveTimeout:
+    """
+    The AdaptiveTimeout learns the distribution of the completion time of
+    every command and returns as its timeout the learned p99 multiplied by
+    a safety multiple, within the configured bounds.
+
+    The static default timeout is returned if the adaptive timeouts are
+    disabled, or until min_samples completions of the command have been
+    observed.
+    """
+
+    QUANTILE: float = 0.99
+
+    def __init__(
+        self,
+        default_timeout: float,
+        enabled: bool = False,
+        multiple: float = 3.0,
+        min_timeout: float = 5.0,
+        max_timeout: float = 50.0,
+        min_samples: int = 20,
+    ) -> None:
+        """
+        Initialise a new AdaptiveTimeout instance.
+
+        :param default_timeout: static timeout in seconds
+        :param enabled: whether the learned timeouts are used
+        :param multiple: safety multiple of the learned p99
+        :param min_timeout: minimum learned timeout in seconds
+        :param max_timeout: maximum learned timeout in seconds
+        :param min_samples: number of completions before the learned timeout
+            of a command is used
+        """
+        self.default_timeout = default_timeout
+        self.enabled = enabled
+        self.multiple = multiple
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._sketches: Dict[str, QuantileSketch] = {}
+
+    def observe(
+        self, command_name: str, completion_time: float
+    ) -> Dict[str, Any]:
+        """
+        Adds the completion time of a successful command.
+
+        :param command_name: name of the command
+        :param completion_time: completion time in seconds
+        :return: the updated sketch of the command, as returned by to_dict
+        """
+        with self._lock:
+            sketch = self._sketches.get(command_name)
+            if sketch is None:
+                sketch = self._sketches[command_name] = QuantileSketch()
+            sketch.add(completion_time)
+            return sketch.to_dict()
+
+    def load(self, sketches: Dict[str, Dict[str, Any]]) -> None:
+        """Loads the sketches per command, e.g. from the journal."""
+        with self._lock:
+            self._sketches = {
+                command_name: QuantileSketch.from_dict(sketch)
+                for command_name, sketch in sketches.items()
+            }
+
+    def get_slow_threshold(self, command_name: str) -> Optional[float]:
+        """
+        Returns the learned p99 completion time of a command, after which
+        the command is reported as slow.
+
+        :param command_name: name of the command
+        :return: the threshold in seconds, None if the adaptive timeouts are
+            disabled or the command has not been learned yet
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            sketch = self._sketches.get(command_name)
+            if sketch is None or sketch.count < self.min_samples:
+                return None
+            return sketch.get_quantile(self.QUANTILE)
+
+    def get_timeout(self, command_name: str) -> float:
+        """
+        Returns the timeout of a command.
+
+        :param command_name: name of the command
+        :return: the timeout in seconds
+        """
+        slow_threshold = self.get_slow_threshold(command_name)
+        if slow_threshold is None:
+            return self.default_timeout
+        return min(
+            max(slow_threshold * self.multiple, self.min_timeout),
+            self.max_timeout,
+        )
+
+    @property
+    def statistics(self) -> Dict[str, Any]:
+        """Returns the learned completion times and the timeout per
+        command."""
+        with self._lock:
+            sketches = dict(self._sketches)
+        return {
+            "enabled": self.enabled,
+            "default_timeout": self.default_timeout,
+            "commands": {
+                command_name: {
+                    "count": sketch.count,
+                    "p50": sketch.get_quantile(0.5),
+                    "p99": sketch.get_quantile(self.QUANTILE),
+                    "timeout": self.get_timeout(command_name),
+                }
+                for command_name, sketch in sketches.items()
+            },
+        }
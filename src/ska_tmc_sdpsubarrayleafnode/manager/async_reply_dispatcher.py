@@ -0,0 +1,235 @@
+"""Dispatcher for asynchronous command replies of SDP Subarray Leaf Node"""
+import logging
+import threading
+import time
+from enum import Enum
+from queue import Empty, Queue
+from typing import Any, Callable, Dict, List, Tuple
+
+from tango import ApiUtil
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+
+class AsyncReplyMode(Enum):
+    """
+    Modes for handling the asynchronous command replies (CmdDoneEvent)
+    received from the SDP Subarray.
+
+    * INLINE: replies are processed on the Tango callback thread.
+    * PUSH: Tango pushes replies on its callback thread, they are queued and
+      processed in batches on a dedicated worker thread.
+    * PULL: replies are pulled by a dispatcher thread with
+      get_asynch_replies and processed in batches on the worker thread.
+    """
+
+    INLINE = "INLINE"
+    PUSH = "PUSH"
+    PULL = "PULL"
+
+    @classmethod
+    def parse(
+        cls, value: str, logger: logging.Logger = LOGGER
+    ) -> "AsyncReplyMode":
+        """
+        Returns the mode of a property value, INLINE if the value is not a
+        mode.
+
+        :param value: name of the mode, case insensitive
+        :param logger: logger of the invalid values
+        :return: the mode
+        """
+        try:
+            return cls(str(value).strip().upper())
+        except ValueError:
+            logger.warning(
+                "Invalid async reply handling %r, expected one of %s, "
+                + "using INLINE",
+                value,
+                [mode.value for mode in cls],
+            )
+            return cls.INLINE
+
+
+class AsyncReplyDispatcher:
+    """
+    The AsyncReplyDispatcher collects the asynchronous command replies and
+    hands them over in batches to a worker thread, so that the Tango
+    callback thread is never blocked by the completion handling.
+
+    It also measures the latency between the arrival of a reply and the
+    start of its processing, as well as the processing time.
+    """
+
+    def __init__(
+        self,
+        reply_handler: Callable[[Any], None],
+        logger: logging.Logger = LOGGER,
+        mode: AsyncReplyMode = AsyncReplyMode.PUSH,
+        batch_size: int = 16,
+        poll_period: float = 0.05,
+    ) -> None:
+        """
+        Initialise a new AsyncReplyDispatcher instance.
+
+        :param reply_handler: method called for every reply on the worker
+            thread
+        :param logger: a logger for this dispatcher
+        :param mode: the asynchronous reply mode, PUSH or PULL
+        :param batch_size: maximum number of replies processed in one batch
+        :param poll_period: period in seconds of the reply polling loop
+        """
+        if mode == AsyncReplyMode.INLINE:
+            raise ValueError(
+                "AsyncReplyDispatcher is not used in INLINE reply mode"
+            )
+        self._reply_handler = reply_handler
+        self._logger = logger
+        self.mode = mode
+        self._batch_size = batch_size
+        self._poll_period = poll_period
+        self._reply_queue: Queue = Queue()
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._statistics_lock = threading.Lock()
+        self._reply_count: int = 0
+        self._batch_count: int = 0
+        self._max_batch_size: int = 0
+        self._last_latency: float = 0.0
+        self._max_latency: float = 0.0
+        self._total_latency: float = 0.0
+        self._last_processing_time: float = 0.0
+        self._max_processing_time: float = 0.0
+
+    def start(self) -> None:
+        """Starts the worker thread and, in PULL mode, the poller thread."""
+        self._stop_event.clear()
+        self._threads = [
+            threading.Thread(
+                target=self._process_replies,
+                name="async_reply_worker",
+                daemon=True,
+            )
+        ]
+        if self.mode == AsyncReplyMode.PULL:
+            self._threads.append(
+                threading.Thread(
+                    target=self._poll_replies,
+                    name="async_reply_poller",
+                    daemon=True,
+                )
+            )
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """Stops the dispatcher threads."""
+        self._stop_event.set()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=2 * self._poll_period)
+        self._threads = []
+
+    def submit(self, event: Any) -> None:
+        """
+        Queues an asynchronous reply for processing. This method never
+        blocks, hence it is safe to call it from the Tango callback thread.
+
+        :param event: a CmdDoneEvent object
+        """
+        self._reply_queue.put_nowait((time.time(), event))
+
+    @property
+    def pending_replies(self) -> int:
+        """Returns the number of replies waiting to be processed."""
+        return self._reply_queue.qsize()
+
+    @property
+    def statistics(self) -> Dict[str, Any]:
+        """
+        Returns the reply processing statistics. Latencies and processing
+        times are in seconds.
+
+        :return: dictionary with the reply processing statistics
+        """
+        with self._statistics_lock:
+            mean_latency = (
+                self._total_latency / self._reply_count
+                if self._reply_count
+                else 0.0
+            )
+            return {
+                "mode": self.mode.value,
+                "replies_processed": self._reply_count,
+                "batches_processed": self._batch_count,
+                "max_batch_size": self._max_batch_size,
+                "pending_replies": self.pending_replies,
+                "last_latency": self._last_latency,
+                "mean_latency": mean_latency,
+                "max_latency": self._max_latency,
+                "last_processing_time": self._last_processing_time,
+                "max_processing_time": self._max_processing_time,
+            }
+
+    def _poll_replies(self) -> None:
+        """Fires the callbacks of the already arrived replies (PULL mode)."""
+        api_util = ApiUtil.instance()
+        while not self._stop_event.is_set():
+            try:
+                api_util.get_asynch_replies()
+            except Exception as exception:
+                self._logger.exception(
+                    "Exception occurred while pulling asynchronous "
+                    + "replies: %s",
+                    exception,
+                )
+            self._stop_event.wait(self._poll_period)
+
+    def _process_replies(self) -> None:
+        """Collects the queued replies in batches and processes them."""
+        while not self._stop_event.is_set():
+            try:
+                batch = [self._reply_queue.get(timeout=self._poll_period)]
+            except Empty:
+                continue
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._reply_queue.get_nowait())
+                except Empty:
+                    break
+            self._process_batch(batch)
+
+    def _process_batch(self, batch: List[Tuple[float, Any]]) -> None:
+        """
+        Processes a batch of replies with the reply handler.
+
+        :param batch: list of (arrival time, event) tuples
+        """
+        for arrival_time, event in batch:
+            start_time = time.time()
+            try:
+                self._reply_handler(event)
+            except Exception as exception:
+                self._logger.exception(
+                    "Exception occurred while processing the asynchronous "
+                    + "reply: %s",
+                    exception,
+                )
+            self._record_timing(
+                start_time - arrival_time, time.time() - start_time
+            )
+        with self._statistics_lock:
+            self._batch_count += 1
+            self._max_batch_size = max(self._max_batch_size, len(batch))
+
+    def _record_timing(self, latency: float, processing_time: float) -> None:
+        """Records the latency and processing time of a reply."""
+        with self._statistics_lock:
+            self._reply_count += 1
+            self._last_latency = latency
+            self._total_latency += latency
+            self._max_latency = max(self._max_latency, latency)
+            self._last_processing_time = processing_time
+            self._max_processing_time = max(
+                self._max_processing_time, processing_time
+            )
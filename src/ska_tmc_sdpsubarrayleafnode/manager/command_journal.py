@@ -0,0 +1,444 @@
+"""Command and state journal of SDP Subarray Leaf Node"""
+import copy
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+# A record is its payload length and CRC32 followed by the JSON payload
+RECORD_HEADER = struct.Struct("<II")
+# The index is the number of records followed by the offset of every record
+INDEX_ENTRY = struct.Struct("<Q")
+INDEX_GROWTH: int = 4096
+
+INTERRUPTED_MESSAGE = "Command interrupted by the restart of the leaf node"
+
+
+def get_initial_state() -> Dict[str, Any]:
+    """Returns the state of an empty journal."""
+    return {
+        "obs_state": None,
+        "lrc_result": ["", ""],
+        "command_ids": {},
+        "command_in_progress": "",
+        "in_flight": {},
+        "completion_sketches": {},
+    }
+
+
+class CommandJournal:
+    """
+    The CommandJournal appends the command lifecycle and the state
+    transitions of the leaf node to a local file, so that its last known
+    state can be reloaded at restart.
+
+    The journal is append only. Every snapshot_interval records the whole
+    state is appended as a snapshot record, and the offset of every record is
+    kept in a memory mapped index file. At restart the index is used to find
+    the last snapshot from the end of the journal, so that only the records
+    after it are replayed, whatever the size of the journal. A torn record at
+    the end of the journal is discarded. When the journal exceeds
+    max_journal_size it is compacted to a single snapshot.
+
+    The records are flushed to the operating system on every append, but not
+    synced to the disk.
+
+    If the journal cannot be opened or read at recovery, e.g. its directory
+    is missing, its volume is read only or its index is truncated, the
+    journal is disabled and the error is reported in the recovery report.
+    """
+
+    def __init__(
+        self,
+        journal_path: str = "",
+        logger: logging.Logger = LOGGER,
+        snapshot_interval: int = 256,
+        max_journal_size: int = 16 * 1024**2,
+    ) -> None:
+        """
+        Initialise a new CommandJournal instance. The journal is disabled if
+        the journal path is empty.
+
+        :param journal_path: path of the journal file, the index file has the
+            same path with the .idx extension
+        :param logger: a logger for this journal
+        :param snapshot_interval: number of records between two snapshots
+        :param max_journal_size: size in bytes above which the journal is
+            compacted
+        """
+        self._journal_path = journal_path
+        self._index_path = f"{journal_path}.idx"
+        self._logger = logger
+        self._snapshot_interval = snapshot_interval
+        self._max_journal_size = max_journal_size
+        self._lock = threading.Lock()
+        self._state: Dict[str, Any] = get_initial_state()
+        self._journal_file = None
+        self._index_file = None
+        self._index: Optional[mmap.mmap] = None
+        self._record_count: int = 0
+        self._records_since_snapshot: int = 0
+        self._error: str = ""
+
+    @property
+    def enabled(self) -> bool:
+        """Returns whether the journal is enabled, i.e. has a path and did
+        not fail to recover."""
+        return bool(self._journal_path) and not self._error
+
+    @property
+    def state(self) -> Dict[str, Any]:
+        """Returns a copy of the journaled state."""
+        with self._lock:
+            return copy.deepcopy(self._state)
+
+    def recover(self) -> Dict[str, Any]:
+        """
+        Opens the journal and reloads the last journaled state. The commands
+        which were in flight are recorded as failed, since their execution
+        did not survive the restart.
+
+        :return: the recovery report with the recovery time in seconds, the
+            number of replayed records, the interrupted commands, the
+            recovered state and the error which disabled the journal, empty
+            if none
+        """
+        start_time = time.perf_counter()
+        if not self.enabled:
+            return {
+                "recovery_time": 0.0,
+                "records_replayed": 0,
+                "interrupted_commands": [],
+                "state": self.state,
+                "error": self._error,
+            }
+        with self._lock:
+            try:
+                records_replayed, interrupted_commands = self._replay()
+            except (OSError, ValueError, struct.error) as exception:
+                self._error = f"{type(exception).__name__}: {exception}"
+                self._logger.error(
+                    "Unable to recover the journal %s, journal disabled: %s",
+                    self._journal_path,
+                    self._error,
+                )
+                self._close_files()
+                self._state = get_initial_state()
+                records_replayed = 0
+                interrupted_commands = []
+            state = copy.deepcopy(self._state)
+        recovery_time = time.perf_counter() - start_time
+        if not self._error:
+            self._logger.info(
+                "Journal %s recovered in %.3f s, %s records replayed, "
+                + "interrupted commands: %s",
+                self._journal_path,
+                recovery_time,
+                records_replayed,
+                interrupted_commands,
+            )
+        return {
+            "recovery_time": recovery_time,
+            "records_replayed": records_replayed,
+            "interrupted_commands": interrupted_commands,
+            "state": state,
+            "error": self._error,
+        }
+
+    def record_command_submitted(
+        self, command_name: str, command_id: str, command_ids: Dict[str, str]
+    ) -> None:
+        """
+        Records a command queued for execution.
+
+        :param command_name: name of the command
+        :param command_id: long running command id, or the command name if
+            the id is not known
+        :param command_ids: ids of the last AssignResources, Configure and
+            ReleaseAllResources commands
+        """
+        self._record(
+            {
+                "kind": "submitted",
+                "command": command_name,
+                "command_id": command_id,
+                "command_ids": command_ids,
+            }
+        )
+
+    def record_command_completed(
+        self, command_id: str, status: str, result: Any = None
+    ) -> None:
+        """
+        Records the end of a command.
+
+        :param command_id: long running command id
+        :param status: final task status of the command
+        :param result: result of the command
+        """
+        self._record(
+            {
+                "kind": "completed",
+                "command_id": command_id,
+                "status": status,
+                "result": result,
+            }
+        )
+
+    def record_obs_state(self, obs_state: int) -> None:
+        """Records an obsState transition of the SDP Subarray."""
+        self._record({"kind": "obs_state", "obs_state": int(obs_state)})
+
+    def record_lrc_result(self, lrc_result: Tuple[str, str]) -> None:
+        """Records a longRunningCommandResult of the leaf node."""
+        self._record({"kind": "lrc_result", "lrc_result": list(lrc_result)})
+
+    def record_completion_sketch(
+        self, command_name: str, sketch: Dict[str, Any]
+    ) -> None:
+        """Records the completion time sketch of a command."""
+        self._record(
+            {
+                "kind": "completion_sketch",
+                "command": command_name,
+                "sketch": sketch,
+            }
+        )
+
+    def close(self) -> None:
+        """Closes the journal and index files."""
+        with self._lock:
+            self._close_files()
+
+    def _close_files(self) -> None:
+        """Closes the journal and index files, with the lock held."""
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+        for journal_file in (self._journal_file, self._index_file):
+            if journal_file is not None:
+                journal_file.close()
+        self._journal_file = None
+        self._index_file = None
+
+    def _replay(self) -> Tuple[int, List[Dict[str, str]]]:
+        """
+        Opens the journal, replays the records from the last snapshot and
+        fails the commands which were in flight, with the lock held.
+
+        :return: the number of replayed records and the interrupted commands
+        """
+        self._open()
+        first_record = self._find_last_snapshot()
+        for position in range(first_record, self._record_count):
+            record = self._read_record(position)
+            if record is not None:
+                self._apply(self._state, record)
+        records_replayed = self._record_count - first_record
+        interrupted_commands = [
+            {"command_id": command_id, "command": command_name}
+            for command_id, command_name in self._state["in_flight"].items()
+        ]
+        for interrupted_command in interrupted_commands:
+            record = {
+                "kind": "completed",
+                "command_id": interrupted_command["command_id"],
+                "status": "FAILED",
+                "result": INTERRUPTED_MESSAGE,
+                "time": time.time(),
+            }
+            self._apply(self._state, record)
+            self._append(record)
+        self._append_snapshot()
+        return records_replayed, interrupted_commands
+
+    @staticmethod
+    def _apply(state: Dict[str, Any], record: Dict[str, Any]) -> None:
+        """Applies a record to the state."""
+        kind = record["kind"]
+        if kind == "snapshot":
+            state.clear()
+            state.update(copy.deepcopy(record["state"]))
+        elif kind == "submitted":
+            state["in_flight"][record["command_id"]] = record["command"]
+            state["command_in_progress"] = record["command"]
+            state["command_ids"].update(record["command_ids"])
+        elif kind == "completed":
+            state["in_flight"].pop(record["command_id"], None)
+            in_flight = list(state["in_flight"].values())
+            state["command_in_progress"] = in_flight[-1] if in_flight else ""
+        elif kind == "obs_state":
+            state["obs_state"] = record["obs_state"]
+        elif kind == "lrc_result":
+            state["lrc_result"] = record["lrc_result"]
+        elif kind == "completion_sketch":
+            state.setdefault("completion_sketches", {})[
+                record["command"]
+            ] = record["sketch"]
+
+    def _record(self, record: Dict[str, Any]) -> None:
+        """Applies a record to the state and appends it to the journal."""
+        if not self.enabled:
+            return
+        record["time"] = time.time()
+        with self._lock:
+            self._apply(self._state, record)
+            if self._journal_file is None:
+                return
+            try:
+                self._append(record)
+                if self._records_since_snapshot >= self._snapshot_interval:
+                    self._append_snapshot()
+            except (OSError, ValueError) as exception:
+                self._logger.error(
+                    "Unable to append to the journal %s: %s",
+                    self._journal_path,
+                    exception,
+                )
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        """Appends a record to the journal and its offset to the index."""
+        offset = self._journal_file.seek(0, os.SEEK_END)
+        self._journal_file.write(self._encode(record))
+        self._journal_file.flush()
+        self._set_index_entry(self._record_count, offset)
+        self._record_count += 1
+        self._set_record_count(self._record_count)
+        self._records_since_snapshot += 1
+
+    def _append_snapshot(self) -> None:
+        """Appends the whole state. If the journal has grown above the
+        maximum size it is replaced by a journal with only the snapshot."""
+        snapshot = {"kind": "snapshot", "time": time.time()}
+        snapshot["state"] = self._state
+        self._records_since_snapshot = 0
+        if self._journal_file.seek(0, os.SEEK_END) <= self._max_journal_size:
+            self._append(snapshot)
+            return
+        compacted_path = f"{self._journal_path}.compacted"
+        with open(compacted_path, "wb") as compacted_file:
+            compacted_file.write(self._encode(snapshot))
+            compacted_file.flush()
+            os.fsync(compacted_file.fileno())
+        os.replace(compacted_path, self._journal_path)
+        self._journal_file.close()
+        self._journal_file = open(  # pylint: disable=consider-using-with
+            self._journal_path, "ab+"
+        )
+        self._set_index_entry(0, 0)
+        self._record_count = 1
+        self._set_record_count(1)
+
+    @staticmethod
+    def _encode(record: Dict[str, Any]) -> bytes:
+        """Returns the header and JSON payload of a record."""
+        payload = json.dumps(record, separators=(",", ":")).encode()
+        return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+    def _open(self) -> None:
+        """Opens the journal and index files and makes the index consistent
+        with the journal."""
+        self._journal_file = open(  # pylint: disable=consider-using-with
+            self._journal_path, "ab+"
+        )
+        if not os.path.exists(self._index_path):
+            with open(self._index_path, "wb") as index_file:
+                index_file.write(bytes(INDEX_ENTRY.size * (INDEX_GROWTH + 1)))
+        self._index_file = open(  # pylint: disable=consider-using-with
+            self._index_path, "r+b"
+        )
+        self._index = mmap.mmap(self._index_file.fileno(), 0)
+        self._record_count = min(
+            INDEX_ENTRY.unpack_from(self._index, 0)[0], self._index_capacity
+        )
+        # The index may be ahead of the journal after a crash
+        while (
+            self._record_count
+            and self._read_record(self._record_count - 1) is None
+        ):
+            self._record_count -= 1
+        # The journal may be ahead of the index, or end with a torn record
+        if self._record_count:
+            offset = self._get_index_entry(self._record_count - 1)
+            offset += RECORD_HEADER.size + self._read_header(offset)[0]
+        else:
+            offset = 0
+        while True:
+            header = self._read_header(offset)
+            if header is None or self._read_payload(offset, header) is None:
+                break
+            self._set_index_entry(self._record_count, offset)
+            self._record_count += 1
+            offset += RECORD_HEADER.size + header[0]
+        self._journal_file.truncate(offset)
+        self._set_record_count(self._record_count)
+
+    def _find_last_snapshot(self) -> int:
+        """Returns the position of the last snapshot record, 0 if none."""
+        for position in range(self._record_count - 1, -1, -1):
+            record = self._read_record(position)
+            if record is not None and record["kind"] == "snapshot":
+                return position
+        return 0
+
+    @property
+    def _index_capacity(self) -> int:
+        """Returns the number of offsets the index file can hold."""
+        return len(self._index) // INDEX_ENTRY.size - 1
+
+    def _get_index_entry(self, position: int) -> int:
+        """Returns the offset of the record at the given position."""
+        return INDEX_ENTRY.unpack_from(
+            self._index, INDEX_ENTRY.size * (position + 1)
+        )[0]
+
+    def _set_index_entry(self, position: int, offset: int) -> None:
+        """Sets the offset of the record at the given position, growing the
+        index file if required."""
+        if position >= self._index_capacity:
+            size = len(self._index) + INDEX_ENTRY.size * INDEX_GROWTH
+            self._index.close()
+            self._index_file.truncate(size)
+            self._index = mmap.mmap(self._index_file.fileno(), 0)
+        INDEX_ENTRY.pack_into(
+            self._index, INDEX_ENTRY.size * (position + 1), offset
+        )
+
+    def _set_record_count(self, record_count: int) -> None:
+        """Sets the number of records in the index header."""
+        INDEX_ENTRY.pack_into(self._index, 0, record_count)
+
+    def _read_header(self, offset: int) -> Optional[Tuple[int, int]]:
+        """Returns the payload length and CRC32 of the record at the given
+        offset, None if there is no complete header."""
+        self._journal_file.seek(offset)
+        header = self._journal_file.read(RECORD_HEADER.size)
+        if len(header) < RECORD_HEADER.size:
+            return None
+        return RECORD_HEADER.unpack(header)
+
+    def _read_payload(
+        self, offset: int, header: Tuple[int, int]
+    ) -> Optional[Dict[str, Any]]:
+        """Returns the record at the given offset, None if it is torn."""
+        length, crc = header
+        self._journal_file.seek(offset + RECORD_HEADER.size)
+        payload = self._journal_file.read(length)
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            return None
+        return json.loads(payload)
+
+    def _read_record(self, position: int) -> Optional[Dict[str, Any]]:
+        """Returns the record at the given position, None if it is torn."""
+        offset = self._get_index_entry(position)
+        header = self._read_header(offset)
+        if header is None:
+            return None
+        return self._read_payload(offset, header)
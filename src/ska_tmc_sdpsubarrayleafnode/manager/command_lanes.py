@@ -0,0 +1,121 @@
+"""Concurrency classes of the SDP Subarray Leaf Node commands"""
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ska_tango_base.executor import TaskExecutor, TaskStatus
+
+OBSERVATION_LANE = "observation"
+HOUSEKEEPING_LANE = "housekeeping"
+PREEMPTIVE_LANE = "preemptive"
+
+# Commands submitted on every lane. The observation commands are
+# serialised on the task executor of the component manager, so that the
+# obsState sequencing is kept. Abort is not submitted: it is executed
+# immediately on the Tango thread.
+COMMAND_LANES: Dict[str, Tuple[str, ...]] = {
+    OBSERVATION_LANE: (
+        "AssignResources",
+        "Configure",
+        "Scan",
+        "EndScan",
+        "End",
+        "ReleaseAllResources",
+    ),
+    HOUSEKEEPING_LANE: ("On", "Off"),
+    PREEMPTIVE_LANE: ("Restart",),
+}
+
+
+class CommandLanes:
+    """
+    The CommandLanes route the commands to a task executor per concurrency
+    class, so that a slow housekeeping command, e.g. On waiting for the
+    adapter creation, does not block the observation commands queued behind
+    it, and Restart does not wait behind the observation commands queued
+    before the Abort.
+
+    Every lane has a single worker, so that the commands of a lane, e.g. On
+    and Off, never run concurrently on the device.
+
+    If disabled every command is submitted on the observation lane, i.e.
+    the single task executor of the component manager.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        """
+        Initialise a new CommandLanes instance.
+
+        :param enabled: whether the commands are routed per concurrency
+            class
+        """
+        self.enabled = enabled
+        self._workers = {
+            OBSERVATION_LANE: 1,
+            HOUSEKEEPING_LANE: 1,
+            PREEMPTIVE_LANE: 1,
+        }
+        self._executors: Dict[str, TaskExecutor] = {}
+        if enabled:
+            for lane in (HOUSEKEEPING_LANE, PREEMPTIVE_LANE):
+                self._executors[lane] = TaskExecutor(self._workers[lane])
+
+    def get_lane(self, command_name: str) -> str:
+        """
+        Returns the lane of a command.
+
+        :param command_name: name of the command
+        :return: the lane, observation if the lanes are disabled or the
+            command is not classified
+        """
+        if self.enabled:
+            for lane, command_names in COMMAND_LANES.items():
+                if command_name in command_names:
+                    return lane
+        return OBSERVATION_LANE
+
+    def submit(
+        self,
+        lane: str,
+        func: Callable,
+        args: Optional[Any] = None,
+        kwargs: Optional[Dict[str, Any]] = None,
+        is_cmd_allowed: Optional[Callable] = None,
+        task_callback: Optional[Callable] = None,
+    ) -> Tuple[TaskStatus, str]:
+        """
+        Submits a task on the task executor of a housekeeping or preemptive
+        lane.
+
+        :param lane: lane returned by get_lane
+        :return: the task status and response
+        """
+        return self._executors[lane].submit(
+            func,
+            args=args,
+            kwargs=kwargs,
+            is_cmd_allowed=is_cmd_allowed,
+            task_callback=task_callback,
+        )
+
+    def stop(self) -> None:
+        """
+        Shuts down the task executors of the housekeeping and preemptive
+        lanes. The queued commands are not run.
+        """
+        for executor in self._executors.values():
+            # pylint: disable=protected-access
+            executor._executor.shutdown(wait=False, cancel_futures=True)
+        self._executors.clear()
+
+    @property
+    def lanes(self) -> Dict[str, Any]:
+        """Returns the workers and commands of every lane."""
+        return {
+            "enabled": self.enabled,
+            "lanes": {
+                lane: {
+                    "workers": self._workers[lane],
+                    "commands": list(command_names),
+                }
+                for lane, command_names in COMMAND_LANES.items()
+            },
+        }
@@ -0,0 +1,224 @@
+"""Per command trace spans of SDP Subarray Leaf Node"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+
+class CommandTracer:
+    """
+    The CommandTracer records, for every command, the time of each phase of
+    its execution: submitted, dequeued, adapter ready, SDP call returned,
+    cmd_ended_cb, every intermediate obsState event and the completion or
+    timeout.
+
+    Only one trace per command name is active at a time. The last completed
+    traces are retained and, if a trace file is configured, exported to it in
+    the Chrome trace event format, which can be opened in Perfetto or
+    chrome://tracing.
+    """
+
+    def __init__(
+        self,
+        max_traces: int = 20,
+        trace_file_path: str = "",
+        logger: logging.Logger = LOGGER,
+    ) -> None:
+        """
+        Initialise a new CommandTracer instance.
+
+        :param max_traces: number of completed traces retained
+        :param trace_file_path: path of the Chrome trace event file, the
+            traces are not exported if empty
+        :param logger: a logger for this tracer
+        """
+        self._trace_file_path = trace_file_path
+        self._logger = logger
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+        self._trace_count: int = 0
+        self._active_traces: Dict[str, Dict[str, Any]] = {}
+        self._completed_traces: Deque[Dict[str, Any]] = deque(
+            maxlen=max_traces
+        )
+
+    @property
+    def traces(self) -> List[Dict[str, Any]]:
+        """
+        Returns the completed traces, the oldest first. The time of every
+        event is relative to the submission of the command, in seconds.
+
+        :return: list of the completed traces
+        """
+        with self._lock:
+            return [dict(trace) for trace in self._completed_traces]
+
+    @property
+    def active_commands(self) -> List[str]:
+        """Returns the names of the commands with an active trace."""
+        with self._lock:
+            return list(self._active_traces)
+
+    def start(self, command_name: str) -> None:
+        """
+        Starts the trace of a command at its submission. An active trace of
+        the same command, e.g. of a command rejected by the executor, is
+        completed as ABANDONED.
+
+        :param command_name: name of the command
+        """
+        start_time = time.time()
+        with self._lock:
+            stale_trace = self._active_traces.pop(command_name, None)
+            if stale_trace is not None:
+                self._complete(stale_trace, "ABANDONED", start_time)
+            self._trace_count += 1
+            self._active_traces[command_name] = {
+                "trace_id": self._trace_count,
+                "command": command_name,
+                "start_time": start_time,
+                "duration": None,
+                "status": None,
+                "events": [{"phase": "submitted", "time": 0.0}],
+            }
+        if stale_trace is not None:
+            self._export()
+
+    def mark(self, command_name: str, phase: str, **args: Any) -> None:
+        """
+        Records a phase of the active trace of a command. Nothing is
+        recorded if the command has no active trace.
+
+        :param command_name: name of the command
+        :param phase: name of the phase, e.g. dequeued
+        :param args: details of the phase
+        """
+        event_time = time.time()
+        with self._lock:
+            trace = self._active_traces.get(command_name)
+            if trace is not None:
+                self._add_event(trace, phase, event_time, args)
+
+    def mark_all(self, phase: str, **args: Any) -> None:
+        """
+        Records a phase in all the active traces, e.g. an obsState event.
+
+        :param phase: name of the phase
+        :param args: details of the phase
+        """
+        event_time = time.time()
+        with self._lock:
+            for trace in self._active_traces.values():
+                self._add_event(trace, phase, event_time, args)
+
+    def end(self, command_name: str, status: str, **args: Any) -> None:
+        """
+        Completes the active trace of a command and exports the retained
+        traces to the trace file.
+
+        :param command_name: name of the command
+        :param status: final status of the command, e.g. COMPLETED or
+            TIMED_OUT
+        :param args: details of the completion
+        """
+        end_time = time.time()
+        with self._lock:
+            trace = self._active_traces.pop(command_name, None)
+            if trace is None:
+                return
+            self._add_event(trace, status.lower(), end_time, args)
+            self._complete(trace, status, end_time)
+        self._export()
+
+    def to_trace_events(self) -> Dict[str, Any]:
+        """
+        Returns the completed traces in the Chrome trace event format. Every
+        command is a complete event on its own track, with a nested slice
+        per phase ending at that phase, and every phase is an instant event.
+
+        :return: dictionary with the traceEvents list
+        """
+        trace_events: List[Dict[str, Any]] = []
+        for trace in self.traces:
+            start_us = trace["start_time"] * 1e6
+            common = {"pid": os.getpid(), "tid": trace["trace_id"]}
+            trace_events.append(
+                {
+                    "name": trace["command"],
+                    "cat": "command",
+                    "ph": "X",
+                    "ts": start_us,
+                    "dur": trace["duration"] * 1e6,
+                    "args": {"status": trace["status"]},
+                    **common,
+                }
+            )
+            previous_time = 0.0
+            for event in trace["events"]:
+                if event["time"] > previous_time:
+                    trace_events.append(
+                        {
+                            "name": event["phase"],
+                            "cat": "phase",
+                            "ph": "X",
+                            "ts": start_us + previous_time * 1e6,
+                            "dur": (event["time"] - previous_time) * 1e6,
+                            **common,
+                        }
+                    )
+                    previous_time = event["time"]
+                trace_events.append(
+                    {
+                        "name": event["phase"],
+                        "cat": "event",
+                        "ph": "i",
+                        "s": "t",
+                        "ts": start_us + event["time"] * 1e6,
+                        "args": event.get("args", {}),
+                        **common,
+                    }
+                )
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    @staticmethod
+    def _add_event(
+        trace: Dict[str, Any],
+        phase: str,
+        event_time: float,
+        args: Dict[str, Any],
+    ) -> None:
+        """Appends a phase to a trace."""
+        event = {"phase": phase, "time": event_time - trace["start_time"]}
+        if args:
+            event["args"] = args
+        trace["events"].append(event)
+
+    def _complete(
+        self, trace: Dict[str, Any], status: str, end_time: float
+    ) -> None:
+        """Moves a trace to the completed traces."""
+        trace["status"] = status
+        trace["duration"] = end_time - trace["start_time"]
+        self._completed_traces.append(trace)
+
+    def _export(self) -> None:
+        """Writes the completed traces to the trace file, if configured."""
+        if not self._trace_file_path:
+            return
+        temporary_path = f"{self._trace_file_path}.tmp"
+        try:
+            with self._export_lock:
+                with open(temporary_path, "w", encoding="utf-8") as trace_file:
+                    json.dump(self.to_trace_events(), trace_file, default=str)
+                os.replace(temporary_path, self._trace_file_path)
+        except OSError as exception:
+            self._logger.warning(
+                "Unable to write the command traces to %s: %s",
+                self._trace_file_path,
+                exception,
+            )
@@ -5,17 +5,20 @@ This module provided a reference implementation of a BaseComponentManager.
 It is provided for explanatory purposes, and to support testing of this
 package.
 """
+from __future__ import annotations
+
+import json
 import logging
 import threading
 import time
-from typing import Callable, Optional, Tuple, Union
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 
 from ska_control_model import AdminMode
-from ska_ser_logging import configure_logging
 from ska_tango_base.base import TaskCallbackType
 from ska_tango_base.commands import ResultCode
 from ska_tango_base.control_model import ObsState
 from ska_tango_base.executor import TaskStatus
+from ska_tmc_common.dev_factory import DevFactory
 from ska_tmc_common.device_info import SubArrayDeviceInfo
 from ska_tmc_common.enum import LivelinessProbeType
 from ska_tmc_common.exceptions import (
@@ -27,27 +30,63 @@ from ska_tmc_common.lrcr_callback import LRCRCallback
 from ska_tmc_common.v1.tmc_component_manager import TmcLeafNodeComponentManager
 from tango import DevState
 
-from ska_tmc_sdpsubarrayleafnode.commands.abort_command import Abort
-from ska_tmc_sdpsubarrayleafnode.commands.assign_resources_command import (
-    AssignResources,
+from ska_tmc_sdpsubarrayleafnode import commands
+from ska_tmc_sdpsubarrayleafnode.manager.adaptive_timeout import (
+    AdaptiveTimeout,
+)
+from ska_tmc_sdpsubarrayleafnode.manager.async_reply_dispatcher import (
+    AsyncReplyDispatcher,
+    AsyncReplyMode,
+)
+from ska_tmc_sdpsubarrayleafnode.manager.command_journal import (
+    INTERRUPTED_MESSAGE,
+    CommandJournal,
 )
-from ska_tmc_sdpsubarrayleafnode.commands.configure_command import Configure
-from ska_tmc_sdpsubarrayleafnode.commands.end_command import End
-from ska_tmc_sdpsubarrayleafnode.commands.end_scan_command import EndScan
-from ska_tmc_sdpsubarrayleafnode.commands.off_command import Off
-from ska_tmc_sdpsubarrayleafnode.commands.on_command import On
-from ska_tmc_sdpsubarrayleafnode.commands.release_resources_command import (
-    ReleaseAllResources,
+from ska_tmc_sdpsubarrayleafnode.manager.command_lanes import (
+    OBSERVATION_LANE,
+    CommandLanes,
+)
+from ska_tmc_sdpsubarrayleafnode.manager.command_tracer import CommandTracer
+from ska_tmc_sdpsubarrayleafnode.manager.configuration_cache import (
+    ConfigurationCache,
+)
+from ska_tmc_sdpsubarrayleafnode.manager.encoded_payload import (
+    decode_payload,
 )
-from ska_tmc_sdpsubarrayleafnode.commands.restart_command import Restart
-from ska_tmc_sdpsubarrayleafnode.commands.scan_command import Scan
 from ska_tmc_sdpsubarrayleafnode.manager.event_receiver import (
     SdpSLNEventReceiver,
 )
+from ska_tmc_sdpsubarrayleafnode.manager.executor_metrics import (
+    ExecutorMetrics,
+)
+from ska_tmc_sdpsubarrayleafnode.manager.interface_registry import (
+    DEFAULT_INTERFACE_VERSION,
+    InterfaceRegistry,
+)
+from ska_tmc_sdpsubarrayleafnode.manager.obs_state_timeline import (
+    ObsStateTimeline,
+)
+from ska_tmc_sdpsubarrayleafnode.manager.thread_inventory import (
+    ThreadInventory,
+)
+from ska_tmc_sdpsubarrayleafnode.rate_limited_logging import RateLimitedLogger
 
-configure_logging()
 LOGGER: logging.Logger = logging.getLogger(__name__)
 
+FINAL_TASK_STATUSES = (
+    TaskStatus.COMPLETED,
+    TaskStatus.FAILED,
+    TaskStatus.ABORTED,
+    TaskStatus.REJECTED,
+)
+
+# ObsStates in which the SDP Subarray keeps the applied configuration
+CONFIGURED_OBS_STATES = (
+    ObsState.CONFIGURING,
+    ObsState.READY,
+    ObsState.SCANNING,
+)
+
 
 class SdpSLNComponentManager(TmcLeafNodeComponentManager):
     """
@@ -77,6 +116,22 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
         liveliness_check_period: int = 1,
         adapter_timeout: int = 30,
         command_timeout: int = 30,
+        async_reply_mode: AsyncReplyMode = AsyncReplyMode.INLINE,
+        command_trace_depth: int = 20,
+        command_trace_file: str = "",
+        log_rate_limit_period: float = 10.0,
+        log_payload_max_length: int = 512,
+        command_journal_file: str = "",
+        obs_state_timeline_length: int = 1024,
+        executor_metrics_file: str = "",
+        executor_metrics_labels: Optional[Dict[str, str]] = None,
+        command_lanes_enabled: bool = False,
+        adaptive_timeout_enabled: bool = False,
+        adaptive_timeout_multiple: float = 3.0,
+        adaptive_timeout_min: float = 5.0,
+        adaptive_timeout_max: float = 50.0,
+        sdp_interface_version: str = DEFAULT_INTERFACE_VERSION,
+        _update_slow_command_callback: Optional[Callable] = None,
     ):
         """
         Initialise a new ComponentManager instance.
@@ -86,8 +141,51 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
         :param logger: a logger for this component manager
         :param _component: allows setting of the component to be
             managed; for testing purposes only
+        :param async_reply_mode: how the asynchronous command replies are
+            handled, INLINE on the Tango callback thread or batched on a
+            worker thread using the PUSH or PULL callback model
+        :param command_trace_depth: number of completed command traces
+            retained
+        :param command_trace_file: path of the file where the command traces
+            are exported in the Chrome trace event format, not exported if
+            empty
+        :param log_rate_limit_period: minimum time in seconds between two
+            records of a hot path log call site
+        :param log_payload_max_length: maximum length of a payload logged on
+            a hot path
+        :param command_journal_file: path of the file where the commands and
+            the state are journaled and reloaded from at restart, not
+            journaled if empty
+        :param obs_state_timeline_length: number of obsState transitions kept
+            in the obsState timeline
+        :param executor_metrics_file: path of the file where the task
+            executor metrics are written in the Prometheus text format, not
+            written if empty
+        :param executor_metrics_labels: labels of the task executor metrics
+        :param command_lanes_enabled: whether the housekeeping commands and
+            Restart are submitted on their own task executors rather than
+            behind the observation commands
+        :param adaptive_timeout_enabled: whether the command timeouts are
+            learned from the completion times of the commands
+        :param adaptive_timeout_multiple: safety multiple of the learned p99
+            completion time used as timeout
+        :param adaptive_timeout_min: minimum learned timeout in seconds
+        :param adaptive_timeout_max: maximum learned timeout in seconds
+        :param sdp_interface_version: SDP interface version of the commands
+            sent to SDP Subarray
         """
         self._sdp_subarray_dev_name = sdp_subarray_dev_name
+        self.adaptive_timeout = AdaptiveTimeout(
+            command_timeout,
+            enabled=adaptive_timeout_enabled,
+            multiple=adaptive_timeout_multiple,
+            min_timeout=adaptive_timeout_min,
+            max_timeout=adaptive_timeout_max,
+        )
+        # Command running on the task executor thread
+        self._running_command = threading.local()
+        self._update_slow_command_callback = _update_slow_command_callback
+        self.slow_command_warning: Dict[str, Any] = {}
         super().__init__(
             logger,
             _liveliness_probe=_liveliness_probe,
@@ -99,10 +197,17 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
         self._device: SubArrayDeviceInfo = SubArrayDeviceInfo(
             self._sdp_subarray_dev_name, False
         )
+        # Logger of the call sites executed on every event or command
+        self.hot_path_logger = RateLimitedLogger(
+            self.logger, log_rate_limit_period, log_payload_max_length
+        )
 
         if _liveliness_probe:
             self.start_liveliness_probe(_liveliness_probe)
 
+        self._dev_factory = DevFactory()
+        self.thread_inventory = ThreadInventory()
+        self.event_receiver: Optional[SdpSLNEventReceiver] = None
         if _event_receiver:
             evt_subscription_check_period = event_subscription_check_period
             self.event_receiver = SdpSLNEventReceiver(
@@ -117,6 +222,8 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
         self.adapter_timeout = adapter_timeout
         self.command_timeout = command_timeout
         self.rlock = threading.RLock()
+        self._is_state_synced: bool = False
+        self.last_resync_time: Optional[float] = None
         self.assign_id: str = ""
         self.configure_id: str = ""
         self.release_id: str = ""
@@ -127,14 +234,42 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
         self.abort_event = threading.Event()
         self.update_lrcr_callback = _update_lrcr_callback
         self._lrc_result = ("", "")
-        self.on_command = On(self, self.logger)
-        self.off_command = Off(self, self.logger)
+        self.command_tracer = CommandTracer(
+            command_trace_depth, command_trace_file, self.logger
+        )
+        self.obs_state_timeline = ObsStateTimeline(obs_state_timeline_length)
+        self.executor_metrics = ExecutorMetrics(
+            executor_metrics_file, executor_metrics_labels, logger=logger
+        )
+        self.executor_metrics.start()
+        self.command_lanes = CommandLanes(command_lanes_enabled)
+        self.interface_registry = InterfaceRegistry(sdp_interface_version)
+        self.encoded_payload_statistics: Dict[str, Any] = {}
+        self.configuration_cache = ConfigurationCache()
+        self._command_objects: Dict[str, commands.SdpSLNCommand] = {}
         self.command_in_progress: str = ""
+        self.command_journal = CommandJournal(
+            command_journal_file, self.logger
+        )
+        self.journal_recovery = self.recover_from_journal()
         self.tracker_thread = None
         self._is_admin_mode_enabled: bool = _sdp_subarray_admin_mode_enabled
         self._update_admin_mode_callback = _update_admin_mode_callback
-        self.event_processing_methods = self.get_attribute_dict()
+        # The adminMode events are processed even if the admin mode is
+        # disabled, so that it can be enabled at runtime without restart.
+        self.event_processing_methods = self.get_attribute_dict(
+            include_admin_mode=True
+        )
         self.start_event_processing_threads()
+        self.async_reply_mode = async_reply_mode
+        self.async_reply_dispatcher: Optional[AsyncReplyDispatcher] = None
+        if self.async_reply_mode != AsyncReplyMode.INLINE:
+            self.async_reply_dispatcher = AsyncReplyDispatcher(
+                self.process_cmd_ended_event,
+                self.logger,
+                mode=self.async_reply_mode,
+            )
+            self.async_reply_dispatcher.start()
 
     @property
     def lrc_result(self) -> Tuple[str, str]:
@@ -157,17 +292,166 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
         """
         if self._lrc_result != value:
             self._lrc_result = value
+            self.command_journal.record_lrc_result(value)
             self._invoke_lrcr_callback()
 
+    @property
+    def command_timeout(self) -> float:
+        """
+        Returns the timeout of the command running on the calling thread,
+        learned from its completion times if the adaptive timeouts are
+        enabled.
+
+        :return: the timeout in seconds
+        """
+        return self.adaptive_timeout.get_timeout(
+            getattr(self._running_command, "name", "")
+        )
+
+    @command_timeout.setter
+    def command_timeout(self, value: float) -> None:
+        """
+        Sets the static command timeout
+
+        :param value: the timeout in seconds
+        """
+        self.adaptive_timeout.default_timeout = value
+
     def stop(self):
         """
         Method used to Stop the liveliness probe and event receiver
         for given devices.
         """
         self.stop_liveliness_probe()
-        self.event_receiver.stop()
+        if self.event_receiver is not None:
+            self.event_receiver.stop()
+        if self.async_reply_dispatcher is not None:
+            self.async_reply_dispatcher.stop()
+        self.command_lanes.stop()
+        self.command_journal.close()
+        self.executor_metrics.stop()
         self._stop_thread = True
 
+    @property
+    def is_admin_mode_enabled(self) -> bool:
+        """Returns whether the admin mode functionality is enabled."""
+        return self._is_admin_mode_enabled
+
+    @is_admin_mode_enabled.setter
+    def is_admin_mode_enabled(self, value: bool) -> None:
+        """
+        Enables or disables the admin mode functionality. The adminMode
+        event subscription is added or dropped accordingly.
+
+        :param value: True to enable the admin mode functionality
+        """
+        previous_value = getattr(self, "_is_admin_mode_enabled", value)
+        self._is_admin_mode_enabled = value
+        if value != previous_value:
+            self.reconfigure_monitoring()
+
+    def update_sdp_subarray_dev_name(self, dev_name: str) -> None:
+        """
+        Switches the leaf node to another SDP Subarray device at runtime.
+        The device info is rebuilt, all the event subscriptions are moved to
+        the new device and its state is read again.
+
+        :param dev_name: FQDN of the new SDP Subarray device
+        """
+        with self.rlock:
+            if dev_name == self._sdp_subarray_dev_name:
+                return
+            self._sdp_subarray_dev_name = dev_name
+            self._device = SubArrayDeviceInfo(dev_name, False)
+            self._is_state_synced = False
+        self.reconfigure_monitoring(device_changed=True)
+
+    def reconfigure_monitoring(self, device_changed: bool = False) -> None:
+        """
+        Incrementally updates the monitoring of the SDP Subarray after a
+        change of the attributes to be monitored or of the device FQDN. Only
+        the obsolete subscriptions are dropped and only the missing ones are
+        created. The command adapters are swapped on their next use.
+
+        :param device_changed: True if the SDP Subarray FQDN has changed, in
+            that case all the subscriptions are moved to the new device
+        """
+        start_time = time.time()
+        if self.event_receiver is not None:
+            self.event_receiver.update_subscriptions(
+                self.get_device(),
+                list(self.get_attribute_dict().keys()),
+                resubscribe_all=device_changed,
+            )
+        self.resync_device_state()
+        self.logger.info(
+            "Monitoring of %s reconfigured in %.3f seconds",
+            self._sdp_subarray_dev_name,
+            time.time() - start_time,
+        )
+
+    def resync_device_state(self) -> bool:
+        """
+        Reads the monitored attributes of the SDP Subarray with a single
+        read_attributes call and applies them to the device info as one
+        snapshot.
+
+        :return: True if the state was read successfully
+        """
+        attribute_names = list(self.get_attribute_dict().keys())
+        try:
+            sdp_subarray_proxy = self._dev_factory.get_device(
+                self._sdp_subarray_dev_name
+            )
+            attribute_values = sdp_subarray_proxy.read_attributes(
+                attribute_names
+            )
+        except Exception as exception:
+            self.logger.warning(
+                "Unable to read the state of %s: %s",
+                self._sdp_subarray_dev_name,
+                exception,
+            )
+            return False
+        self.apply_state_snapshot(
+            {
+                attribute_name: attribute_value.value
+                for attribute_name, attribute_value in zip(
+                    attribute_names, attribute_values
+                )
+                if not attribute_value.has_failed
+            }
+        )
+        return True
+
+    def resync_device_state_if_required(self) -> None:
+        """
+        Resyncs the device state if it has not been read since the last
+        (re)connection to the SDP Subarray.
+        """
+        if not self._is_state_synced:
+            self.resync_device_state()
+
+    def apply_state_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        """
+        Applies a snapshot of the SDP Subarray attributes. The lock is held
+        for the whole update, so the command admission checks see either the
+        previous or the new state, never a mix of both.
+
+        :param snapshot: dictionary of attribute names and values
+        """
+        attribute_dict = self.get_attribute_dict()
+        with self.rlock:
+            for attribute_name, attribute_value in snapshot.items():
+                attribute_dict[attribute_name](attribute_value)
+            self._is_state_synced = True
+            self.last_resync_time = time.time()
+        self.logger.info(
+            "State of %s resynced: %s",
+            self._sdp_subarray_dev_name,
+            snapshot,
+        )
+
     def get_device(self) -> SubArrayDeviceInfo:
         """
         Return the device info our of the monitoring loop with name dev_name
@@ -178,6 +462,27 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
         """
         return self._device
 
+    def get_resource_inventory(self) -> Dict[str, Any]:
+        """
+        Returns the threads of the device server with their purpose, CPU
+        time and last active time, with the number of device proxies and
+        event subscriptions held by the leaf node.
+
+        :return: dictionary with the resource inventory
+        """
+        inventory = self.thread_inventory.get_inventory()
+        inventory["proxies"] = len(
+            getattr(self._dev_factory, "dev_proxys", {})
+        )
+        inventory["subscriptions"] = {
+            "sdp_subarray": (
+                self.event_receiver.subscription_count
+                if self.event_receiver is not None
+                else 0
+            ),
+        }
+        return inventory
+
     def update_device_obs_state(self, obs_state: ObsState) -> None:
         """
         Update a monitored device obs state,
@@ -192,9 +497,23 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
             dev_info.obs_state = obs_state
             dev_info.last_event_arrived = time.time()
             dev_info.update_unresponsive(False)
-            self.logger.info(
-                "Obs State value changed to :%s", ObsState(obs_state).name
+            self.hot_path_logger.info(
+                "obs_state",
+                "Obs State value changed to :%s",
+                ObsState(obs_state).name,
+            )
+            self.command_tracer.mark_all(
+                "obs_state_event", obs_state=ObsState(obs_state).name
             )
+            self.command_journal.record_obs_state(obs_state)
+            self.obs_state_timeline.record(
+                obs_state, dev_info.last_event_arrived
+            )
+            if obs_state not in CONFIGURED_OBS_STATES:
+                self.configuration_cache.clear()
+            if obs_state == ObsState.EMPTY:
+                # The prepared configurations belong to the execution block
+                self.configuration_cache.clear_prepared()
             if self._update_sdp_subarray_obs_state_callback:
                 self._update_sdp_subarray_obs_state_callback(obs_state)
             self.observable.notify_observers(attribute_value_change=True)
@@ -210,6 +529,7 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
         """
         with self.rlock:
             device_info.update_unresponsive(True, exception)
+            self._is_state_synced = False
             if self._update_availablity_callback is not None:
                 self._update_availablity_callback(False)
 
@@ -226,6 +546,9 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
             self._device.update_unresponsive(False, "")
             if self._update_availablity_callback is not None:
                 self._update_availablity_callback(True)
+        # The device is reachable again, hence the state received before the
+        # disconnection may be stale.
+        self.resync_device_state_if_required()
 
     def get_obs_state(self) -> ObsState:
         """
@@ -236,7 +559,8 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
 
     def update_command_result(self, command_name: str, value: str) -> None:
         """Updates the long running command result callback"""
-        self.logger.info(
+        self.hot_path_logger.info(
+            "command_result",
             "Received longRunningCommandResult for device : %s value: %s",
             self._sdp_subarray_dev_name,
             value,
@@ -246,10 +570,12 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
             int(value)
         except ValueError as value_error:
             self.logger.exception(
-                f"Exception occurred in command {command_name}: {value_error}"
+                "Exception occurred in command %s: %s",
+                command_name,
+                value_error,
             )
             self.logger.info(
-                f"Updating LRCRCallback with {value} for {command_name}"
+                "Updating LRCRCallback with %s for %s", value, command_name
             )
             self.long_running_result_callback(
                 self.command_id, ResultCode.FAILED, exception_msg=value
@@ -309,30 +635,33 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
                 bool: whether the command may be called in the current device
                 state
             """
+            # The obsState is read once under the lock, so the decision is
+            # taken on a consistent snapshot of the device state.
+            obs_state = self.get_obs_state()
             match command_name:
                 case "AssignResources":
-                    if self.get_device().obs_state not in [
+                    if obs_state not in [
                         ObsState.EMPTY,
                         ObsState.IDLE,
                     ]:
                         return False
                 case "ReleaseAllResources":
-                    if self.get_device().obs_state != ObsState.IDLE:
+                    if obs_state != ObsState.IDLE:
                         return False
                 case "Configure":
-                    if self.get_device().obs_state not in [
+                    if obs_state not in [
                         ObsState.IDLE,
                         ObsState.READY,
                     ]:
                         return False
                 case "End" | "Scan":
-                    if self.get_device().obs_state != ObsState.READY:
+                    if obs_state != ObsState.READY:
                         return False
                 case "EndScan":
-                    if self.get_device().obs_state != ObsState.SCANNING:
+                    if obs_state != ObsState.SCANNING:
                         return False
                 case "Restart":
-                    if self.get_device().obs_state not in [
+                    if obs_state not in [
                         ObsState.FAULT,
                         ObsState.ABORTED,
                     ]:
@@ -396,7 +725,22 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
                 - errors     : (sequence<DevError>) The error stack
                 - ext
         """
+        self.command_tracer.mark(
+            event.cmd_name, "cmd_ended_cb", error=bool(event.err)
+        )
+        if self.async_reply_dispatcher is not None:
+            self.async_reply_dispatcher.submit(event)
+            return
+        self.process_cmd_ended_event(event)
 
+    def process_cmd_ended_event(self, event) -> None:
+        """
+        Processes the asynchronous reply of a command invoked on SdpSubarray.
+        It is executed either on the Tango callback thread (INLINE mode) or
+        on the worker thread of the AsyncReplyDispatcher.
+
+        :param event: a CmdDoneEvent object
+        """
         if event.err:
             self.logger.error(
                 "Error invoking command: %s failed with error : %s",
@@ -408,10 +752,297 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
             self.update_command_result(event.cmd_name, error.desc)
 
         else:
-            self.logger.info(
-                "Command %s invoked successfully.", event.cmd_name
+            self.hot_path_logger.info(
+                f"cmd_ended_{event.cmd_name}",
+                "Command %s invoked successfully.",
+                event.cmd_name,
             )
 
+    def recover_from_journal(self) -> Dict[str, Any]:
+        """
+        Reloads the last journaled obsState, longRunningCommandResult and
+        command ids. The commands which were in flight at the last stop of
+        the device are failed, and their result is reported by
+        publish_recovered_state.
+
+        :return: the recovery report of the journal
+        """
+        recovery = self.command_journal.recover()
+        state = recovery["state"]
+        if state["obs_state"] is not None:
+            self._device.obs_state = ObsState(state["obs_state"])
+        self.assign_id = state["command_ids"].get("assign_id", "")
+        self.configure_id = state["command_ids"].get("configure_id", "")
+        self.release_id = state["command_ids"].get("release_id", "")
+        self.command_in_progress = state["command_in_progress"]
+        self._lrc_result = tuple(state["lrc_result"])
+        self.adaptive_timeout.load(state.get("completion_sketches", {}))
+        return recovery
+
+    def publish_recovered_state(self) -> None:
+        """
+        Publishes the obsState recovered from the journal and the failed
+        result of every interrupted command, once the device is able to push
+        events.
+        """
+        obs_state = self.command_journal.state["obs_state"]
+        if (
+            obs_state is not None
+            and self._update_sdp_subarray_obs_state_callback
+        ):
+            self._update_sdp_subarray_obs_state_callback(ObsState(obs_state))
+        for command in self.journal_recovery["interrupted_commands"]:
+            self.lrc_result = (
+                command["command_id"],
+                json.dumps([ResultCode.FAILED, INTERRUPTED_MESSAGE]),
+            )
+
+    def start_command_timing(
+        self, command_name: str
+    ) -> Optional[threading.Timer]:
+        """
+        Records the command running on the calling thread and, if its
+        completion time has been learned, starts the timer which reports it
+        as slow once it runs beyond its p99 completion time.
+
+        :param command_name: name of the command
+        :return: the slow command timer, None if not started
+        """
+        self._running_command.name = command_name
+        slow_threshold = self.adaptive_timeout.get_slow_threshold(command_name)
+        if slow_threshold is None:
+            return None
+        slow_timer = threading.Timer(
+            slow_threshold,
+            self.report_slow_command,
+            args=(command_name, slow_threshold, time.time()),
+        )
+        slow_timer.daemon = True
+        slow_timer.start()
+        return slow_timer
+
+    def end_command_timing(
+        self,
+        command_name: str,
+        start_time: Optional[float],
+        slow_timer: Optional[threading.Timer],
+        succeeded: bool,
+    ) -> None:
+        """
+        Cancels the slow command timer and learns the completion time of a
+        successful command.
+
+        :param command_name: name of the command
+        :param start_time: time the command started to run
+        :param slow_timer: slow command timer of the command
+        :param succeeded: whether the command completed successfully
+        """
+        if slow_timer is not None:
+            slow_timer.cancel()
+        if succeeded and start_time is not None:
+            sketch = self.adaptive_timeout.observe(
+                command_name, time.time() - start_time
+            )
+            self.command_journal.record_completion_sketch(command_name, sketch)
+
+    def report_slow_command(
+        self, command_name: str, slow_threshold: float, start_time: float
+    ) -> None:
+        """
+        Reports a command running beyond its p99 completion time, before its
+        timeout.
+
+        :param command_name: name of the command
+        :param slow_threshold: learned p99 completion time in seconds
+        :param start_time: time the command started to run
+        """
+        now = time.time()
+        self.slow_command_warning = {
+            "command": command_name,
+            "elapsed": now - start_time,
+            "p99": slow_threshold,
+            "timeout": self.adaptive_timeout.get_timeout(command_name),
+            "time": now,
+        }
+        self.logger.warning(
+            "%s command is slow: running for %.3f s, beyond its p99 "
+            + "completion time, timeout in %.3f s",
+            command_name,
+            now - start_time,
+            self.slow_command_warning["timeout"] - (now - start_time),
+        )
+        if self._update_slow_command_callback:
+            self._update_slow_command_callback(self.slow_command_warning)
+
+    @staticmethod
+    def get_command_name(func: Callable) -> str:
+        """Returns the name of the command of a submitted method."""
+        # The invocations are partials of a command object method
+        command = getattr(func, "__self__", None) or getattr(
+            getattr(func, "func", None), "__self__", None
+        )
+        if isinstance(command, commands.SdpSLNCommand):
+            return command.context.command_name
+        return getattr(func, "__name__", str(func))
+
+    @staticmethod
+    def is_command_invocation(func: Callable) -> bool:
+        """Returns whether a submitted callable was returned by the invoke
+        method of a command object."""
+        return isinstance(
+            getattr(getattr(func, "func", None), "__self__", None),
+            commands.SdpSLNCommand,
+        )
+
+    @staticmethod
+    def get_command_id(task_callback: Optional[Callable]) -> str:
+        """
+        Returns the long running command id bound to the task callback by
+        the command tracker, an empty string if there is none.
+        """
+        args = getattr(task_callback, "args", ())
+        if args and isinstance(args[0], str):
+            return args[0]
+        return ""
+
+    # pylint: disable=arguments-differ
+    def submit_task(
+        self,
+        func: Callable,
+        args: Optional[Any] = None,
+        kwargs: Optional[Dict[str, Any]] = None,
+        is_cmd_allowed: Optional[Callable] = None,
+        task_callback: Optional[Callable] = None,
+    ) -> Tuple[TaskStatus, str]:
+        """
+        Submits a task to the task executor of its command lane. The queue
+        wait and execution of the task are recorded in the executor metrics
+        and, if the journal is enabled, the submission and the end of the
+        task are journaled. A command invocation is recorded as the command
+        in progress and traced from its submission, until it is rejected or
+        reports its final status.
+
+        :return: the task status and response
+        """
+        command_name = self.get_command_name(func)
+        is_invocation = self.is_command_invocation(func)
+        if is_invocation:
+            self.command_in_progress = command_name
+            self.command_tracer.start(command_name)
+            task_callback = self.get_invocation_task_callback(
+                command_name, task_callback
+            )
+        command_id = ""
+        if self.command_journal.enabled:
+            command_id, task_callback = self.get_journaled_task_callback(
+                command_name, task_callback
+            )
+        task_id, func, task_callback = self.executor_metrics.track(
+            command_name, func, task_callback
+        )
+        lane = self.command_lanes.get_lane(command_name)
+        if lane == OBSERVATION_LANE:
+            task_status, response = super().submit_task(
+                func,
+                args=args,
+                kwargs=kwargs,
+                is_cmd_allowed=is_cmd_allowed,
+                task_callback=task_callback,
+            )
+        else:
+            task_status, response = self.command_lanes.submit(
+                lane,
+                func,
+                args=args,
+                kwargs=kwargs,
+                is_cmd_allowed=is_cmd_allowed,
+                task_callback=task_callback,
+            )
+        self.executor_metrics.submitted(task_id, task_status)
+        if task_status == TaskStatus.REJECTED:
+            if command_id:
+                self.command_journal.record_command_completed(
+                    command_id, task_status.name, response
+                )
+            if is_invocation:
+                self.end_rejected_invocation(command_name, response)
+        return task_status, response
+
+    def get_invocation_task_callback(
+        self, command_name: str, task_callback: Optional[Callable]
+    ) -> Callable:
+        """
+        Returns the task callback of a command invocation wrapped to end
+        the invocation if the task executor rejects it.
+
+        :param command_name: name of the command
+        :param task_callback: task callback of the command
+        :return: the wrapped task callback
+        """
+
+        def invocation_task_callback(
+            status: Optional[TaskStatus] = None, **callback_kwargs: Any
+        ) -> None:
+            if status == TaskStatus.REJECTED:
+                self.end_rejected_invocation(
+                    command_name, callback_kwargs.get("result")
+                )
+            if task_callback is not None:
+                task_callback(status=status, **callback_kwargs)
+
+        return invocation_task_callback
+
+    def end_rejected_invocation(self, command_name: str, result: Any) -> None:
+        """
+        Clears the command in progress and ends the trace of a command
+        invocation rejected at its submission or when it is dequeued.
+
+        :param command_name: name of the command
+        :param result: result of the rejection
+        """
+        if self.command_in_progress == command_name:
+            self.command_in_progress = ""
+        self.command_tracer.end(
+            command_name, TaskStatus.REJECTED.name, result=str(result)
+        )
+
+    def get_journaled_task_callback(
+        self, command_name: str, task_callback: Optional[Callable]
+    ) -> Tuple[str, Callable]:
+        """
+        Journals the submission of a command and returns its task callback
+        wrapped to journal the end of the command.
+
+        :param command_name: name of the command
+        :param task_callback: task callback of the command
+        :return: the command id in the journal and the wrapped task callback
+        """
+        command_id = (
+            self.get_command_id(task_callback)
+            or f"{time.time()}_{command_name}"
+        )
+        self.command_journal.record_command_submitted(
+            command_name,
+            command_id,
+            {
+                "assign_id": self.assign_id,
+                "configure_id": self.configure_id,
+                "release_id": self.release_id,
+            },
+        )
+
+        def journaled_task_callback(
+            status: Optional[TaskStatus] = None, **callback_kwargs: Any
+        ) -> None:
+            if status in FINAL_TASK_STATUSES:
+                self.command_journal.record_command_completed(
+                    command_id, status.name, str(callback_kwargs.get("result"))
+                )
+            if task_callback is not None:
+                task_callback(status=status, **callback_kwargs)
+
+        return command_id, journaled_task_callback
+
     # pylint: disable= signature-differs
     def on(self, task_callback: TaskCallbackType) -> Tuple[TaskStatus, str]:
         """Submits the On command for execution.
@@ -419,14 +1050,42 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
         :rtype: tuple
         """
         task_status, response = self.submit_task(
-            self.on_command.on,
+            self.on_command.invoke(self.on_command.on),
             args=[self.logger],
             is_cmd_allowed=self._check_if_sdp_sa_is_responsive(),
             task_callback=task_callback,
         )
-        self.logger.info("On command queued for execution")
+        self.hot_path_logger.info(
+            "submit_On", "On command queued for execution"
+        )
         return task_status, response
 
+    @property
+    def on_command(self) -> commands.SdpSLNCommand:
+        """Returns the On command object, created on first use."""
+        return self.get_command_object("On")
+
+    @property
+    def off_command(self) -> commands.SdpSLNCommand:
+        """Returns the Off command object, created on first use."""
+        return self.get_command_object("Off")
+
+    def get_command_object(self, command_name: str) -> commands.SdpSLNCommand:
+        """
+        Returns the command object of the given command. The command objects
+        are created on first use and reused for every invocation.
+
+        :param command_name: name of the command class, e.g. Configure
+        :return: the command object
+        """
+        command_object = self._command_objects.get(command_name)
+        if command_object is None:
+            command_object = getattr(commands, command_name)(
+                self, logger=self.logger
+            )
+            self._command_objects[command_name] = command_object
+        return command_object
+
     def assign_resources(
         self, argin: str, task_callback: TaskCallbackType
     ) -> Tuple[TaskStatus, str]:
@@ -435,15 +1094,18 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
 
         :return: a result code and message
         """
-        assign_resources_command = AssignResources(self, self.logger)
-        self.assign_id = f"{time.time()}-{AssignResources.__name__}"
+        assign_resources_command = self.get_command_object("AssignResources")
+        self.assign_id = f"{time.time()}-{commands.AssignResources.__name__}"
         task_status, response = self.submit_task(
-            assign_resources_command.assign_resources,
+            assign_resources_command.invoke(
+                assign_resources_command.assign_resources
+            ),
             kwargs={"argin": argin},
             is_cmd_allowed=self.is_command_allowed_callable("AssignResources"),
             task_callback=task_callback,
         )
-        self.logger.info(
+        self.hot_path_logger.info(
+            "submit_AssignResources",
             (
                 "TaskStatus: %s and Response: %s of AssignResources "
                 "command after being queued for execution"
@@ -453,6 +1115,39 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
         )
         return task_status, response
 
+    def assign_resources_encoded(
+        self, argin: Tuple[str, bytes], task_callback: TaskCallbackType
+    ) -> Tuple[TaskStatus, str]:
+        """
+        Decodes the compressed AssignResources argument and submits the
+        AssignResources command in queue. SDP Subarray accepts the JSON
+        string only, so the decoded argument is sent.
+
+        :param argin: encoding format and compressed UTF-8 JSON
+        :return: a result code and message
+        """
+        encoding, data = argin
+        try:
+            assign_argin, statistics = decode_payload(encoding, data)
+        except ValueError as exception:
+            self.logger.error(
+                "Unable to decode the AssignResources argument: %s", exception
+            )
+            return (
+                TaskStatus.REJECTED,
+                f"Unable to decode the AssignResources argument: {exception}",
+            )
+        self.encoded_payload_statistics = statistics
+        self.logger.info(
+            "Decoded the %s AssignResources argument of %s bytes to %s bytes"
+            + " in %.6f seconds",
+            statistics["encoding"],
+            statistics["encoded_size"],
+            statistics["decoded_size"],
+            statistics["decode_time"],
+        )
+        return self.assign_resources(assign_argin, task_callback)
+
     def configure(
         self, argin: str, task_callback: TaskCallbackType
     ) -> Tuple[TaskStatus, str]:
@@ -460,15 +1155,16 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
 
         :rtype: tuple
         """
-        configure_command = Configure(self, self.logger)
-        self.configure_id = f"{time.time()}-{Configure.__name__}"
+        configure_command = self.get_command_object("Configure")
+        self.configure_id = f"{time.time()}-{commands.Configure.__name__}"
         task_status, response = self.submit_task(
-            configure_command.configure,
+            configure_command.invoke(configure_command.configure),
             kwargs={"argin": argin},
             is_cmd_allowed=self.is_command_allowed_callable("Configure"),
             task_callback=task_callback,
         )
-        self.logger.info(
+        self.hot_path_logger.info(
+            "submit_Configure",
             (
                 "TaskStatus: %s and Response: %s of Configure "
                 "command after being queued for execution"
@@ -485,14 +1181,15 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
 
         :rtype: tuple
         """
-        scan_command = Scan(self, self.logger)
+        scan_command = self.get_command_object("Scan")
         task_status, response = self.submit_task(
-            scan_command.scan,
+            scan_command.invoke(scan_command.scan),
             kwargs={"argin": argin},
             is_cmd_allowed=self.is_command_allowed_callable("Scan"),
             task_callback=task_callback,
         )
-        self.logger.info(
+        self.hot_path_logger.info(
+            "submit_Scan",
             (
                 "TaskStatus: %s and Response: %s of Scan command "
                 "after being queued for execution"
@@ -509,12 +1206,14 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
         :rtype: tuple
         """
         task_status, response = self.submit_task(
-            self.off_command.off,
+            self.off_command.invoke(self.off_command.off),
             args=[self.logger],
             is_cmd_allowed=self._check_if_sdp_sa_is_responsive(),
             task_callback=task_callback,
         )
-        self.logger.info("Off command queued for execution")
+        self.hot_path_logger.info(
+            "submit_Off", "Off command queued for execution"
+        )
         return task_status, response
 
     def release_all_resources(
@@ -524,16 +1223,19 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
 
         :rtype: tuple
         """
-        release_command = ReleaseAllResources(self, self.logger)
-        self.release_id = f"{time.time()}-{ReleaseAllResources.__name__}"
+        release_command = self.get_command_object("ReleaseAllResources")
+        self.release_id = (
+            f"{time.time()}-{commands.ReleaseAllResources.__name__}"
+        )
         task_status, response = self.submit_task(
-            release_command.release_resources,
+            release_command.invoke(release_command.release_resources),
             is_cmd_allowed=self.is_command_allowed_callable(
                 "ReleaseAllResources"
             ),
             task_callback=task_callback,
         )
-        self.logger.info(
+        self.hot_path_logger.info(
+            "submit_ReleaseAllResources",
             (
                 "TaskStatus: %s and Response: %s of ReleaseAllResources "
                 "command after being queued for execution"
@@ -548,14 +1250,15 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
 
         :rtype: tuple
         """
-        end_command = End(self, self.logger)
+        end_command = self.get_command_object("End")
         task_status, response = self.submit_task(
-            end_command.end,
+            end_command.invoke(end_command.end),
             args=[self.logger],
             is_cmd_allowed=self.is_command_allowed_callable("End"),
             task_callback=task_callback,
         )
-        self.logger.info(
+        self.hot_path_logger.info(
+            "submit_End",
             (
                 "TaskStatus: %s and Response: %s of End command "
                 "after being queued for execution"
@@ -573,14 +1276,15 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
 
         :rtype: tuple
         """
-        end_scan_command = EndScan(self, self.logger)
+        end_scan_command = self.get_command_object("EndScan")
         task_status, response = self.submit_task(
-            end_scan_command.end_scan,
+            end_scan_command.invoke(end_scan_command.end_scan),
             args=[self.logger],
             is_cmd_allowed=self.is_command_allowed_callable("EndScan"),
             task_callback=task_callback,
         )
-        self.logger.info(
+        self.hot_path_logger.info(
+            "submit_EndScan",
             (
                 "TaskStatus: %s and Response: %s of EndScan command "
                 "after being queued for execution"
@@ -599,13 +1303,17 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
         :param task_callback: callback to be called whenever the status
             of the task changes.
         """
-        abort_command = Abort(
-            self,
-            logger=self.logger,
-        )
+        abort_command = self.get_command_object("Abort")
+        self.command_tracer.start("Abort")
         self.abort_event.set()
+        if self.command_lanes.enabled:
+            # Abort preempts the observation commands still queued
+            self.abort_tasks()
         self.observable.notify_observers(attribute_value_change=True)
         result_code, message = abort_command.do()
+        self.command_tracer.end(
+            "Abort", ResultCode(result_code).name, message=message
+        )
         self.abort_event.clear()
         self.logger.info("Abort Event cleared")
         return result_code, message
@@ -618,14 +1326,15 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
 
         :return: a result code and message
         """
-        restart_command = Restart(self, logger=self.logger)
+        restart_command = self.get_command_object("Restart")
         task_status, response = self.submit_task(
-            restart_command.restart,
+            restart_command.invoke(restart_command.restart),
             args=[self.logger],
             is_cmd_allowed=self.is_command_allowed_callable("Restart"),
             task_callback=task_callback,
         )
-        self.logger.info(
+        self.hot_path_logger.info(
+            "submit_Restart",
             (
                 "TaskStatus: %s and Response: %s of Restart command "
                 "after being queued for execution"
@@ -681,9 +1390,11 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
             if self._update_admin_mode_callback:
                 self._update_admin_mode_callback(admin_mode)
 
-    def get_attribute_dict(self) -> dict:
+    def get_attribute_dict(self, include_admin_mode: bool = False) -> dict:
         """
 
+        :param include_admin_mode: include adminMode even if the admin mode
+            functionality is disabled
         :return: Dictionary of attributes to be handled by the EventReceiver.
         """
 
@@ -692,7 +1403,7 @@ class SdpSLNComponentManager(TmcLeafNodeComponentManager):
             "state": self.update_device_state,
             "healthState": self.update_device_health_state,
         }
-        if self.is_admin_mode_enabled:
+        if self.is_admin_mode_enabled or include_admin_mode:
             attributes["adminMode"] = self.update_device_admin_mode
 
         return {**attributes}
@@ -0,0 +1,179 @@
+"""Cache of the configuration applied on the SDP Subarray"""
+import hashlib
+import json
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+
+def canonicalize(argument: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Returns the canonical form of a configuration, with sorted keys and
+    without whitespace, and its hash.
+
+    :param argument: Configure argument
+    :return: the canonical JSON string and its SHA-256 hex digest
+    """
+    canonical = json.dumps(argument, sort_keys=True, separators=(",", ":"))
+    return canonical, hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def get_changed_keys(
+    previous: Dict[str, Any], current: Dict[str, Any], prefix: str = ""
+) -> List[str]:
+    """
+    Returns the keys whose value differs between two configurations. The
+    keys of nested objects are returned as dotted paths, the arrays are
+    compared as a whole.
+
+    :param previous: previous configuration
+    :param current: new configuration
+    :param prefix: path of the compared objects
+    :return: the sorted paths of the added, removed and changed keys
+    """
+    changed_keys = []
+    for key in sorted(set(previous) | set(current)):
+        path = f"{prefix}{key}"
+        previous_value = previous.get(key)
+        current_value = current.get(key)
+        if isinstance(previous_value, dict) and isinstance(
+            current_value, dict
+        ):
+            changed_keys.extend(
+                get_changed_keys(previous_value, current_value, f"{path}.")
+            )
+        elif (
+            key not in previous
+            or key not in current
+            or previous_value != current_value
+        ):
+            changed_keys.append(path)
+    return changed_keys
+
+
+class PreparedConfiguration(NamedTuple):
+    """Configure argument validated and serialised ahead of the Configure
+    command."""
+
+    configuration: Dict[str, Any]
+    hash: str
+    payload: str
+
+
+class ConfigurationCache:
+    """
+    The ConfigurationCache keeps the last configuration successfully applied
+    on the SDP Subarray, in canonical form with its hash, so that a Configure
+    can be compared with it before being sent.
+
+    A configuration is staged when it is sent to SDP Subarray and becomes
+    the applied configuration when the Configure command completes. The
+    applied configuration is cleared when SDP Subarray leaves the configured
+    obsStates, e.g. on End or Abort.
+
+    The cache also holds the configurations prepared ahead of the Configure
+    commands, by scan type, until SDP Subarray releases its resources.
+    """
+
+    def __init__(self) -> None:
+        """Initialise a new ConfigurationCache instance."""
+        self._lock = threading.Lock()
+        self._applied: Optional[Dict[str, Any]] = None
+        self._applied_hash: str = ""
+        self._staged: Optional[Tuple[Dict[str, Any], str]] = None
+        self.last_delta: Dict[str, Any] = {}
+        self._prepared: Dict[str, PreparedConfiguration] = {}
+
+    @property
+    def applied_hash(self) -> str:
+        """Returns the hash of the applied configuration, empty if none."""
+        return self._applied_hash
+
+    @property
+    def prepared(self) -> Dict[str, str]:
+        """Returns the hash of the prepared configuration per scan type."""
+        return {
+            scan_type: prepared_configuration.hash
+            for scan_type, prepared_configuration in self._prepared.items()
+        }
+
+    def prepare(
+        self, prepared_configurations: Dict[str, PreparedConfiguration]
+    ) -> None:
+        """
+        Replaces the prepared configurations.
+
+        :param prepared_configurations: prepared configuration per scan type
+        """
+        self._prepared = dict(prepared_configurations)
+
+    def clear_prepared(self) -> None:
+        """Forgets the prepared configurations."""
+        self._prepared = {}
+
+    def get_prepared(self, scan_type: str) -> Optional[PreparedConfiguration]:
+        """
+        Returns the prepared configuration of a scan type.
+
+        :param scan_type: scan type of the configuration
+        :return: the prepared configuration, None if there is none
+        """
+        return self._prepared.get(scan_type)
+
+    def get_delta(
+        self, argument: Dict[str, Any], configuration_hash: str = ""
+    ) -> Dict[str, Any]:
+        """
+        Compares a configuration with the applied one.
+
+        :param argument: Configure argument, with the interface sent to
+            SDP Subarray
+        :param configuration_hash: hash of the configuration, computed if
+            empty
+        :return: dictionary with the hash of the configuration, whether it
+            is unchanged and the changed keys, None if there is no applied
+            configuration
+        """
+        if not configuration_hash:
+            _, configuration_hash = canonicalize(argument)
+        with self._lock:
+            applied = self._applied
+            applied_hash = self._applied_hash
+        if applied is None:
+            changed_keys = None
+        elif configuration_hash == applied_hash:
+            changed_keys = []
+        else:
+            changed_keys = get_changed_keys(applied, argument)
+        self.last_delta = {
+            "hash": configuration_hash,
+            "applied_hash": applied_hash,
+            "unchanged": configuration_hash == applied_hash,
+            "changed_keys": changed_keys,
+        }
+        return self.last_delta
+
+    def stage(self, argument: Dict[str, Any], configuration_hash: str) -> None:
+        """
+        Records the configuration sent to SDP Subarray.
+
+        :param argument: Configure argument, with the interface sent to
+            SDP Subarray
+        :param configuration_hash: hash of the configuration returned by
+            get_delta
+        """
+        with self._lock:
+            self._staged = (argument, configuration_hash)
+
+    def commit(self) -> None:
+        """Records the staged configuration as applied."""
+        with self._lock:
+            if self._staged is not None:
+                self._applied, self._applied_hash = self._staged
+                self._staged = None
+
+    def clear(self) -> None:
+        """Forgets the applied and staged configurations."""
+        with self._lock:
+            self._applied = None
+            self._applied_hash = ""
+            self._staged = None
@@ -0,0 +1,63 @@
+"""Decoding of the compressed DevEncoded command arguments"""
+import time
+import zlib
+from typing import Any, Dict, Tuple
+
+# Window bits of the decompressor per encoding format of the DevEncoded
+# argument, json being the uncompressed UTF-8 JSON
+ENCODING_WBITS: Dict[str, int] = {
+    "zlib": zlib.MAX_WBITS,
+    "gzip": 16 + zlib.MAX_WBITS,
+}
+UNCOMPRESSED_ENCODING = "json"
+
+# Maximum size in bytes of a decompressed argument
+MAX_DECODED_SIZE: int = 64 * 1024 * 1024
+
+
+def decode_payload(encoding: str, data: bytes) -> Tuple[str, Dict[str, Any]]:
+    """
+    Returns the JSON string of a DevEncoded argument.
+
+    :param encoding: encoding format of the argument, zlib, gzip or json
+    :param data: compressed UTF-8 JSON
+    :return: the JSON string and the statistics of the decoding: encoded
+        and decoded sizes in bytes and decoding time in seconds
+    :raises ValueError: if the encoding is not supported, the data is not
+        valid or is decompressed beyond MAX_DECODED_SIZE
+    """
+    encoding = encoding.lower()
+    start_time = time.perf_counter()
+    if encoding == UNCOMPRESSED_ENCODING:
+        decoded_data = bytes(data)
+    elif encoding in ENCODING_WBITS:
+        decompressor = zlib.decompressobj(ENCODING_WBITS[encoding])
+        try:
+            decoded_data = decompressor.decompress(data, MAX_DECODED_SIZE)
+        except zlib.error as exception:
+            raise ValueError(
+                f"Invalid {encoding} data: {exception}"
+            ) from exception
+        if decompressor.unconsumed_tail:
+            raise ValueError(
+                f"Decoded argument larger than {MAX_DECODED_SIZE} bytes"
+            )
+        if not decompressor.eof:
+            raise ValueError(f"Truncated {encoding} data")
+    else:
+        raise ValueError(
+            f"Unsupported encoding {encoding}, supported encodings: "
+            + ", ".join([*ENCODING_WBITS, UNCOMPRESSED_ENCODING])
+        )
+    try:
+        argin = decoded_data.decode("utf-8")
+    except UnicodeDecodeError as exception:
+        raise ValueError(f"Invalid UTF-8 data: {exception}") from exception
+    decode_time = time.perf_counter() - start_time
+    return argin, {
+        "encoding": encoding,
+        "encoded_size": len(data),
+        "decoded_size": len(decoded_data),
+        "compression_ratio": len(decoded_data) / max(len(data), 1),
+        "decode_time": decode_time,
+    }
@@ -1,19 +1,18 @@
 """Event Reciever for SDP Subarray Leaf Node Manager"""
 import logging
-from concurrent import futures
-from time import sleep
-from typing import Callable, List, Optional
+import time
+from typing import Callable, Optional
 
-import tango
-from ska_ser_logging import configure_logging
-from ska_tmc_common.device_info import SubArrayDeviceInfo
 from ska_tmc_common.v1.event_receiver import EventReceiver
 
-configure_logging()
+from ska_tmc_sdpsubarrayleafnode.manager.event_subscriptions import (
+    EventSubscriptionMixin,
+)
+
 LOGGER: logging.Logger = logging.getLogger(__name__)
 
 
-class SdpSLNEventReceiver(EventReceiver):
+class SdpSLNEventReceiver(EventSubscriptionMixin, EventReceiver):
     """
     The SdpSLNEventReceiver class has the responsibility to receive events
     from the sub devices managed by the Sdp Subarray Leaf Node.
@@ -22,6 +21,8 @@ class SdpSLNEventReceiver(EventReceiver):
     for the attribute of interest.
     For each of them a callback is defined.
 
+    The attributes are subscribed and retried one at a time by the
+    EventSubscriptionMixin.
     """
 
     def __init__(
@@ -45,60 +46,8 @@ class SdpSLNEventReceiver(EventReceiver):
         self._event_subscription_check_period = event_subscription_check_period
         self._stop = False
         self._component_manager = component_manager
+        self._init_subscriptions()
 
     def run(self):
-        while not self._stop:
-            with futures.ThreadPoolExecutor(
-                max_workers=self._max_workers
-            ) as executor:
-                dev_info = self._component_manager.get_device()
-                if dev_info.last_event_arrived is None:
-                    executor.submit(
-                        self.subscribe_events,
-                        dev_info=dev_info,
-                        attribute_tobe_subscribed=(
-                            self.attribute_tobe_subscribed
-                        ),
-                    )
-            sleep(self._event_subscription_check_period)
-
-    def subscribe_events(
-        self,
-        dev_info: SubArrayDeviceInfo,
-        attribute_tobe_subscribed: Optional[List[str]] = None,
-    ):
-        sdp_subarray_proxy = None
-        try:
-            sdp_subarray_proxy = self._dev_factory.get_device(
-                dev_info.dev_name
-            )
-
-            try:
-                for attribute in self.attribute_tobe_subscribed:
-                    self._logger.info(
-                        "Subscribing event for attribute: %s", attribute
-                    )
-                    handle_event = self.event_handling_methods[attribute]
-                    sdp_subarray_proxy.subscribe_event(
-                        attribute,
-                        tango.EventType.CHANGE_EVENT,
-                        handle_event,
-                        stateless=True,
-                    )
-            except Exception as exception:
-                self._logger.exception(
-                    "Exception occured while subscribing to events "
-                    + "for device %s: %s",
-                    dev_info.dev_name,
-                    exception,
-                )
-
-            self.stop()
-        except Exception as exception:
-            if sdp_subarray_proxy:
-                self._logger.debug(
-                    "Error on Device %s while event subscription."
-                    " Exception: %s",
-                    sdp_subarray_proxy.dev_name,
-                    exception,
-                )
+        self._start_time = time.time()
+        self.retry_subscriptions()
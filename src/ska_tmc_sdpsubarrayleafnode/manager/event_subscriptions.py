@@ -0,0 +1,342 @@
+"""Per attribute event subscriptions shared by the event receivers"""
+import functools
+import threading
+import time
+from concurrent import futures
+from time import sleep
+from typing import Any, Dict, Hashable, List, Optional
+
+import tango
+from ska_tmc_common.device_info import DeviceInfo
+
+
+class EventSubscriptionMixin:
+    """
+    Keeps one event subscription per attribute, so that the subscriptions
+    can be retried, updated and dropped one attribute at a time.
+
+    The attributes to be subscribed are listed in attribute_tobe_subscribed.
+    By default an attribute is the name of an attribute of the device of
+    the component manager; a class subscribing to several devices overrides
+    _get_attribute_device and _get_attribute_name. The class using the
+    mixin provides _logger, _dev_factory, _event_subscription_check_period
+    and _stop, and calls _init_subscriptions in its __init__.
+
+    The attributes are subscribed concurrently and each failed subscription
+    is retried on its own, every event_subscription_check_period, until all
+    the attributes are subscribed. The time to subscription and the time to
+    first event of each attribute are tracked, relative to the start of the
+    subscriptions.
+    """
+
+    attribute_tobe_subscribed: List[Hashable]
+
+    def _init_subscriptions(self) -> None:
+        """Initialises the subscription state."""
+        self._subscription_lock = threading.Lock()
+        # Whether a loop retrying the pending subscriptions is running
+        self._retry_lock = threading.Lock()
+        self._retrying = False
+        self._subscription_ids: Dict[Hashable, int] = {}
+        self._subscription_proxies: Dict[Hashable, tango.DeviceProxy] = {}
+        self._subscription_attempts: Dict[Hashable, int] = {}
+        self._subscription_errors: Dict[Hashable, str] = {}
+        self._time_to_subscribed: Dict[Hashable, float] = {}
+        self._time_to_first_event: Dict[Hashable, float] = {}
+        self._start_time: float = time.time()
+        # Number of events received, e.g. for the shard load report
+        self.event_count: int = 0
+
+    def retry_subscriptions(self) -> None:
+        """
+        Subscribes to the pending attributes every
+        event_subscription_check_period until all the attributes are
+        subscribed or the subscriptions are stopped. Only one retry loop
+        runs at a time.
+        """
+        with self._retry_lock:
+            if self._retrying:
+                return
+            self._retrying = True
+        while not self._stop:
+            with self._retry_lock:
+                pending_attributes = self.pending_attributes
+                if not pending_attributes:
+                    self._retrying = False
+                    self._logger.info(
+                        "Event subscription completed for attributes: %s",
+                        self.attribute_tobe_subscribed,
+                    )
+                    return
+            self.subscribe_pending_attributes(pending_attributes)
+            if self.pending_attributes:
+                sleep(self._event_subscription_check_period)
+        with self._retry_lock:
+            self._retrying = False
+
+    @property
+    def pending_attributes(self) -> List[Hashable]:
+        """Returns the attributes which are not subscribed yet."""
+        with self._subscription_lock:
+            return [
+                attribute
+                for attribute in self.attribute_tobe_subscribed
+                if attribute not in self._subscription_ids
+            ]
+
+    @property
+    def subscription_statistics(self) -> Dict[Hashable, Dict[str, Any]]:
+        """
+        Returns the subscription status of every attribute. Times are in
+        seconds since the start of the subscriptions.
+
+        :return: dictionary with the subscription statistics per attribute
+        """
+        with self._subscription_lock:
+            return {
+                attribute: {
+                    "subscribed": attribute in self._subscription_ids,
+                    "attempts": self._subscription_attempts.get(attribute, 0),
+                    "time_to_subscribed": self._time_to_subscribed.get(
+                        attribute
+                    ),
+                    "time_to_first_event": self._time_to_first_event.get(
+                        attribute
+                    ),
+                    "last_error": self._subscription_errors.get(attribute, ""),
+                }
+                for attribute in self.attribute_tobe_subscribed
+            }
+
+    @property
+    def subscription_count(self) -> int:
+        """Returns the number of active event subscriptions."""
+        with self._subscription_lock:
+            return len(self._subscription_ids)
+
+    @property
+    def startup_timing(self) -> Dict[str, Optional[float]]:
+        """
+        Returns the time in seconds, since the start of the subscriptions,
+        to subscribe to all the attributes and to receive the first event.
+
+        :return: dictionary with the subscription and first_event times
+        """
+        with self._subscription_lock:
+            all_subscribed = all(
+                attribute in self._time_to_subscribed
+                for attribute in self.attribute_tobe_subscribed
+            )
+            return {
+                "subscription": (
+                    max(self._time_to_subscribed.values(), default=None)
+                    if all_subscribed
+                    else None
+                ),
+                "first_event": min(
+                    self._time_to_first_event.values(), default=None
+                ),
+            }
+
+    def subscribe_events(
+        self,
+        dev_info: DeviceInfo,
+        attribute_tobe_subscribed: Optional[List[Hashable]] = None,
+    ):
+        """
+        Subscribes to the given attributes of the device.
+
+        :param dev_info: device info of the device to be subscribed
+        :param attribute_tobe_subscribed: the attributes to be subscribed,
+            the pending ones if None
+        """
+        if attribute_tobe_subscribed is None:
+            attribute_tobe_subscribed = self.pending_attributes
+        self.subscribe_device_attributes(
+            dev_info.dev_name, attribute_tobe_subscribed
+        )
+
+    def subscribe_pending_attributes(
+        self, attributes: Optional[List[Hashable]] = None
+    ) -> None:
+        """
+        Subscribes to the given attributes, grouped by device.
+
+        :param attributes: the attributes to be subscribed, the pending ones
+            if None
+        """
+        if attributes is None:
+            attributes = self.pending_attributes
+        device_attributes: Dict[str, List[Hashable]] = {}
+        for attribute in attributes:
+            device_attributes.setdefault(
+                self._get_attribute_device(attribute), []
+            ).append(attribute)
+        for dev_name, attribute_list in device_attributes.items():
+            self.subscribe_device_attributes(dev_name, attribute_list)
+
+    def subscribe_device_attributes(
+        self, dev_name: str, attributes: List[Hashable]
+    ) -> None:
+        """
+        Subscribes concurrently to the attributes of a single device.
+
+        :param dev_name: FQDN of the device
+        :param attributes: the attributes of the device to be subscribed
+        """
+        if not attributes:
+            return
+        try:
+            proxy = self._dev_factory.get_device(dev_name)
+        except Exception as exception:
+            self._logger.debug(
+                "Error on Device %s while event subscription."
+                " Exception: %s",
+                dev_name,
+                exception,
+            )
+            return
+
+        with futures.ThreadPoolExecutor(
+            max_workers=len(attributes)
+        ) as executor:
+            for attribute in attributes:
+                executor.submit(self.subscribe_attribute, proxy, attribute)
+
+    def subscribe_attribute(
+        self, proxy: tango.DeviceProxy, attribute: Hashable
+    ) -> bool:
+        """
+        Subscribes to the change events of a single attribute.
+
+        :param proxy: proxy of the device of the attribute
+        :param attribute: the attribute to be subscribed
+        :return: True if the subscription succeeded
+        """
+        with self._subscription_lock:
+            self._subscription_attempts[attribute] = (
+                self._subscription_attempts.get(attribute, 0) + 1
+            )
+        attribute_name = self._get_attribute_name(attribute)
+        self._logger.info(
+            "Subscribing event for attribute: %s", attribute_name
+        )
+        try:
+            event_id = proxy.subscribe_event(
+                attribute_name,
+                tango.EventType.CHANGE_EVENT,
+                functools.partial(self._handle_tracked_event, attribute),
+                stateless=True,
+            )
+        except Exception as exception:
+            self._logger.exception(
+                "Exception occured while subscribing to event for "
+                + "attribute %s of device %s: %s",
+                attribute_name,
+                proxy.dev_name(),
+                exception,
+            )
+            with self._subscription_lock:
+                self._subscription_errors[attribute] = str(exception)
+            return False
+
+        with self._subscription_lock:
+            self._subscription_ids[attribute] = event_id
+            self._subscription_proxies[attribute] = proxy
+            self._subscription_errors.pop(attribute, None)
+            self._time_to_subscribed[attribute] = (
+                time.time() - self._start_time
+            )
+        return True
+
+    def update_subscriptions(
+        self,
+        dev_info: DeviceInfo,
+        attribute_list: List[Hashable],
+        resubscribe_all: bool = False,
+    ) -> None:
+        """
+        Updates the event subscriptions to the given attribute list. The
+        subscriptions of attributes that are no longer in the list are
+        dropped and the missing ones are created, the failed ones are
+        retried in the background.
+
+        :param dev_info: device info of the device to be subscribed
+        :param attribute_list: the attributes to be subscribed
+        :param resubscribe_all: drop and recreate all the subscriptions, used
+            when the device FQDN has changed
+        """
+        with self._subscription_lock:
+            obsolete_attributes = [
+                attribute
+                for attribute in self._subscription_ids
+                if resubscribe_all or attribute not in attribute_list
+            ]
+        self.unsubscribe_attributes(obsolete_attributes)
+        self.attribute_tobe_subscribed = list(attribute_list)
+        self.subscribe_events(dev_info, self.pending_attributes)
+        with self._retry_lock:
+            if self._retrying or not self.pending_attributes:
+                return
+        # The failed subscriptions are retried until they succeed
+        threading.Thread(
+            target=self.retry_subscriptions,
+            name="event_receiver_retry",
+            daemon=True,
+        ).start()
+
+    def unsubscribe_attributes(self, attributes: List[Hashable]) -> None:
+        """
+        Drops the event subscriptions of the given attributes.
+
+        :param attributes: the attributes to be unsubscribed
+        """
+        for attribute in attributes:
+            with self._subscription_lock:
+                event_id = self._subscription_ids.pop(attribute, None)
+                proxy = self._subscription_proxies.pop(attribute, None)
+                self._time_to_subscribed.pop(attribute, None)
+                self._time_to_first_event.pop(attribute, None)
+            if event_id is None:
+                continue
+            try:
+                proxy.unsubscribe_event(event_id)
+                self._logger.info(
+                    "Unsubscribed event for attribute: %s",
+                    self._get_attribute_name(attribute),
+                )
+            except Exception as exception:
+                self._logger.warning(
+                    "Exception occured while unsubscribing event for "
+                    + "attribute %s: %s",
+                    self._get_attribute_name(attribute),
+                    exception,
+                )
+
+    def _get_attribute_device(self, attribute: Hashable) -> str:
+        """Returns the FQDN of the device of the attribute."""
+        return self._component_manager.get_device().dev_name
+
+    def _get_attribute_name(self, attribute: Hashable) -> str:
+        """Returns the Tango name of the attribute."""
+        return attribute
+
+    def _handle_tracked_event(self, attribute: Hashable, event) -> None:
+        """
+        Records the time to first event of the attribute and forwards the
+        event to _handle_subscribed_event.
+
+        :param attribute: the subscribed attribute
+        :param event: the change event
+        """
+        self.event_count += 1
+        if attribute not in self._time_to_first_event:
+            with self._subscription_lock:
+                self._time_to_first_event.setdefault(
+                    attribute, time.time() - self._start_time
+                )
+        self._handle_subscribed_event(attribute, event)
+
+    def _handle_subscribed_event(self, attribute: Hashable, event) -> None:
+        """Forwards the event to the handling method of the attribute."""
+        self.event_handling_methods[attribute](event)
@@ -0,0 +1,338 @@
+"""Task executor metrics of the SDP Subarray and SDP Master Leaf Nodes"""
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ska_tango_base.executor import TaskStatus
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds of the queue wait histogram buckets
+QUEUE_WAIT_BUCKETS: Tuple[float, ...] = (
+    0.001,
+    0.01,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+    10.0,
+    30.0,
+)
+
+METRIC_PREFIX = "tmc_leaf_node"
+
+
+class ExecutorMetrics:
+    """
+    The ExecutorMetrics count the tasks submitted to the task executor of a
+    component manager: the queued and running tasks, the tasks submitted and
+    rejected per command, the queue wait time per command and the ratio of
+    time during which the executor runs at least one task.
+
+    The metrics are returned as a dictionary and, if a metrics file is
+    configured, periodically written to it in the Prometheus text exposition
+    format.
+    """
+
+    def __init__(
+        self,
+        metrics_file: str = "",
+        labels: Optional[Dict[str, str]] = None,
+        export_period: float = 5.0,
+        logger: logging.Logger = LOGGER,
+    ) -> None:
+        """
+        Initialise a new ExecutorMetrics instance.
+
+        :param metrics_file: path of the Prometheus metrics file, not written
+            if empty
+        :param labels: labels added to every metric, e.g. the device name
+        :param export_period: period in seconds of the metrics file update
+        :param logger: a logger for the metrics
+        """
+        self._metrics_file = metrics_file
+        self._labels = dict(labels or {})
+        self._export_period = export_period
+        self._logger = logger
+        self._lock = threading.Lock()
+        self._task_ids = itertools.count()
+        # Per task: command name, state (queued or running) and state time
+        self._tasks: Dict[int, list] = {}
+        self._commands: Dict[str, Dict[str, Any]] = {}
+        self._start_time = time.monotonic()
+        self._busy_seconds: float = 0.0
+        self._busy_since: Optional[float] = None
+        self._stop_event = threading.Event()
+        self._export_thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Starts the periodic update of the metrics file, if configured."""
+        if not self._metrics_file or self._export_thread is not None:
+            return
+        self._export_thread = threading.Thread(
+            target=self._export_periodically,
+            name="executor_metrics_export",
+            daemon=True,
+        )
+        self._export_thread.start()
+
+    def stop(self) -> None:
+        """Stops the periodic update of the metrics file."""
+        self._stop_event.set()
+        if self._export_thread is not None:
+            self._export_thread.join()
+            self._export_thread = None
+
+    def track(
+        self,
+        command_name: str,
+        func: Callable,
+        task_callback: Optional[Callable],
+    ) -> Tuple[int, Callable, Callable]:
+        """
+        Records a task about to be submitted as queued, and wraps its method
+        and task callback so that its start, end or removal from the queue
+        are recorded.
+
+        :param command_name: name of the command
+        :param func: method of the task
+        :param task_callback: task callback of the task
+        :return: the task id, the wrapped method and the wrapped callback
+        """
+        task_id = next(self._task_ids)
+        with self._lock:
+            command = self._get_command(command_name)
+            command["submitted"] += 1
+            self._tasks[task_id] = [command_name, "queued", time.monotonic()]
+
+        def tracked_func(*args: Any, **kwargs: Any) -> Any:
+            self._start_task(task_id)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._end_task(task_id)
+
+        def tracked_task_callback(
+            status: Optional[TaskStatus] = None, **kwargs: Any
+        ) -> None:
+            if status in (
+                TaskStatus.REJECTED,
+                TaskStatus.ABORTED,
+                TaskStatus.FAILED,
+            ):
+                # The task may have been removed from the queue unrun
+                self._discard_task(task_id, status == TaskStatus.REJECTED)
+            if task_callback is not None:
+                task_callback(status=status, **kwargs)
+
+        return task_id, tracked_func, tracked_task_callback
+
+    def submitted(self, task_id: int, task_status: TaskStatus) -> None:
+        """
+        Records the status returned by the submission of a task.
+
+        :param task_id: id returned by track
+        :param task_status: status returned by submit_task
+        """
+        if task_status == TaskStatus.REJECTED:
+            self._discard_task(task_id, True)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Returns the executor metrics.
+
+        :return: dictionary with the queued and running task gauges, the
+            executor busy time and ratio, and the counters and queue wait
+            per command
+        """
+        now = time.monotonic()
+        with self._lock:
+            states = [task[1] for task in self._tasks.values()]
+            busy_seconds = self._busy_seconds
+            if self._busy_since is not None:
+                busy_seconds += now - self._busy_since
+            commands = {
+                command_name: {
+                    **command,
+                    "queue_wait_buckets": list(command["queue_wait_buckets"]),
+                }
+                for command_name, command in self._commands.items()
+            }
+        return {
+            "queued": states.count("queued"),
+            "running": states.count("running"),
+            "busy_seconds": busy_seconds,
+            "busy_ratio": busy_seconds / max(now - self._start_time, 1e-9),
+            "commands": commands,
+        }
+
+    def to_prometheus(self) -> str:
+        """Returns the metrics in the Prometheus text exposition format."""
+        metrics = self.get_metrics()
+        lines = []
+
+        def add_metric(name, metric_type, help_text, samples):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {metric_type}")
+            for suffix, labels, value in samples:
+                lines.append(
+                    f"{METRIC_PREFIX}_{name}{suffix}"
+                    + f"{self._format_labels(labels)} {value}"
+                )
+
+        add_metric(
+            "tasks_queued",
+            "gauge",
+            "Number of tasks waiting in the task executor queue.",
+            [("", {}, metrics["queued"])],
+        )
+        add_metric(
+            "tasks_running",
+            "gauge",
+            "Number of tasks running on the task executor.",
+            [("", {}, metrics["running"])],
+        )
+        commands = metrics["commands"]
+        for name, help_text in (
+            ("submitted", "Number of tasks submitted per command."),
+            ("rejected", "Number of tasks rejected per command."),
+        ):
+            add_metric(
+                f"tasks_{name}_total",
+                "counter",
+                help_text,
+                [
+                    ("", {"command": command_name}, command[name])
+                    for command_name, command in commands.items()
+                ],
+            )
+        samples = []
+        for command_name, command in commands.items():
+            for bound, count in zip(
+                QUEUE_WAIT_BUCKETS + (float("inf"),),
+                command["queue_wait_buckets"],
+            ):
+                bound_label = "+Inf" if bound == float("inf") else str(bound)
+                samples.append(
+                    (
+                        "_bucket",
+                        {"command": command_name, "le": bound_label},
+                        count,
+                    )
+                )
+            samples.append(
+                ("_sum", {"command": command_name}, command["queue_wait_sum"])
+            )
+            samples.append(
+                ("_count", {"command": command_name}, command["started"])
+            )
+        add_metric(
+            "task_queue_wait_seconds",
+            "histogram",
+            "Time in seconds the tasks waited in the queue per command.",
+            samples,
+        )
+        add_metric(
+            "executor_busy_seconds_total",
+            "counter",
+            "Time in seconds during which at least one task was running.",
+            [("", {}, metrics["busy_seconds"])],
+        )
+        add_metric(
+            "executor_busy_ratio",
+            "gauge",
+            "Ratio of time during which at least one task was running.",
+            [("", {}, metrics["busy_ratio"])],
+        )
+        return "\n".join(lines) + "\n"
+
+    def export(self) -> None:
+        """Writes the metrics file atomically."""
+        temporary_file = f"{self._metrics_file}.tmp"
+        with open(temporary_file, "w", encoding="utf-8") as metrics_file:
+            metrics_file.write(self.to_prometheus())
+        os.replace(temporary_file, self._metrics_file)
+
+    def _export_periodically(self) -> None:
+        """Writes the metrics file every export period until stopped."""
+        while not self._stop_event.wait(self._export_period):
+            try:
+                self.export()
+            except OSError as exception:
+                self._logger.error(
+                    "Unable to write the executor metrics to %s: %s",
+                    self._metrics_file,
+                    exception,
+                )
+
+    def _format_labels(self, labels: Dict[str, str]) -> str:
+        """Returns the labels of a sample in the exposition format."""
+        labels = {**self._labels, **labels}
+        if not labels:
+            return ""
+        formatted_labels = ",".join(
+            f'{name}="{value}"' for name, value in labels.items()
+        )
+        return "{" + formatted_labels + "}"
+
+    def _get_command(self, command_name: str) -> Dict[str, Any]:
+        """Returns the metrics of a command, with the lock held."""
+        command = self._commands.get(command_name)
+        if command is None:
+            command = self._commands[command_name] = {
+                "submitted": 0,
+                "rejected": 0,
+                "started": 0,
+                "queue_wait_sum": 0.0,
+                "queue_wait_max": 0.0,
+                "queue_wait_buckets": [0] * (len(QUEUE_WAIT_BUCKETS) + 1),
+            }
+        return command
+
+    def _start_task(self, task_id: int) -> None:
+        """Records the start of a task."""
+        now = time.monotonic()
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return
+            command_name, _, queued_time = task
+            self._tasks[task_id] = [command_name, "running", now]
+            queue_wait = now - queued_time
+            command = self._get_command(command_name)
+            command["started"] += 1
+            command["queue_wait_sum"] += queue_wait
+            command["queue_wait_max"] = max(
+                command["queue_wait_max"], queue_wait
+            )
+            # Cumulative buckets, as in the Prometheus histograms
+            for index, bound in enumerate(QUEUE_WAIT_BUCKETS):
+                if queue_wait <= bound:
+                    command["queue_wait_buckets"][index] += 1
+            command["queue_wait_buckets"][-1] += 1
+            if self._busy_since is None:
+                self._busy_since = now
+
+    def _end_task(self, task_id: int) -> None:
+        """Records the end of a task."""
+        now = time.monotonic()
+        with self._lock:
+            self._tasks.pop(task_id, None)
+            if self._busy_since is not None and not any(
+                task[1] == "running" for task in self._tasks.values()
+            ):
+                self._busy_seconds += now - self._busy_since
+                self._busy_since = None
+
+    def _discard_task(self, task_id: int, rejected: bool) -> None:
+        """Removes a task which is still queued."""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None or task[1] != "queued":
+                return
+            del self._tasks[task_id]
+            if rejected:
+                self._get_command(task[0])["rejected"] += 1
@@ -0,0 +1,214 @@
+"""Interface versions of the commands sent to the SDP Subarray"""
+import json
+import threading
+from typing import Any, Dict, List, Tuple
+
+SCHEMA_URI = "https://schema.skao.int"
+
+DEFAULT_INTERFACE_VERSION = "0.4"
+
+# Schema of the argument of every command sent to SDP Subarray with an
+# interface, per SDP interface version
+INTERFACE_SCHEMAS: Dict[str, Dict[str, str]] = {
+    version: {
+        "AssignResources": f"{SCHEMA_URI}/ska-sdp-assignres/{version}",
+        "Configure": f"{SCHEMA_URI}/ska-sdp-configure/{version}",
+        "Scan": f"{SCHEMA_URI}/ska-sdp-scan/{version}",
+    }
+    for version in ("0.3", "0.4")
+}
+
+
+class PayloadTemplate:
+    """
+    The PayloadTemplate serialises the argument of a command with the
+    interface of its schema as first key. The interface member is encoded
+    once, when the template is created, and the other members are encoded
+    in the order of the argument, so that the same argument always gives
+    the same payload.
+    """
+
+    def __init__(self, interface: str) -> None:
+        """
+        Initialise a new PayloadTemplate instance.
+
+        :param interface: URI of the schema of the command argument
+        """
+        self.interface = interface
+        self._encoder = json.JSONEncoder()
+        self._prefix = '{"interface": ' + self._encoder.encode(interface)
+
+    def render(self, argument: Dict[str, Any]) -> str:
+        """
+        Returns the payload of a command argument.
+
+        :param argument: command argument, its interface is replaced
+        :return: the JSON payload
+        """
+        members = self._encoder.encode(
+            {
+                key: value
+                for key, value in argument.items()
+                if key != "interface"
+            }
+        )
+        if members == "{}":
+            return self._prefix + "}"
+        return self._prefix + ", " + members[1:]
+
+
+class InterfaceRegistry:
+    """
+    The InterfaceRegistry holds the payload templates of every SDP interface
+    version and the interface version in use, which can be switched at
+    runtime. Switching the version swaps the set of templates used by the
+    following commands.
+
+    A command argument may also be rendered with the interface of any
+    registered version, e.g. the interface chosen by the caller. An
+    interface which is not registered, e.g. of a newer version, is passed
+    through with a generic template.
+    """
+
+    def __init__(self, version: str = DEFAULT_INTERFACE_VERSION) -> None:
+        """
+        Initialise a new InterfaceRegistry instance.
+
+        :param version: SDP interface version in use
+        """
+        self._lock = threading.Lock()
+        self._templates: Dict[str, Dict[str, PayloadTemplate]] = {}
+        # Template per command name and interface, of every version
+        self._interface_templates: Dict[Tuple[str, str], PayloadTemplate] = {}
+        for interface_version, schemas in INTERFACE_SCHEMAS.items():
+            self.register(interface_version, schemas)
+        self._version = ""
+        self._version_templates: Dict[str, PayloadTemplate] = {}
+        self.version = version
+
+    @property
+    def versions(self) -> List[str]:
+        """Returns the registered interface versions."""
+        with self._lock:
+            return sorted(self._templates)
+
+    @property
+    def version(self) -> str:
+        """Returns the interface version in use."""
+        return self._version
+
+    @version.setter
+    def version(self, version: str) -> None:
+        """
+        Switches the interface version in use.
+
+        :param version: registered interface version
+        :raises ValueError: if the version is not registered
+        """
+        with self._lock:
+            if version not in self._templates:
+                raise ValueError(
+                    f"Unknown SDP interface version {version}, "
+                    + f"registered versions: {sorted(self._templates)}"
+                )
+            self._version_templates = self._templates[version]
+            self._version = version
+
+    def register(self, version: str, schemas: Dict[str, str]) -> None:
+        """
+        Registers an interface version.
+
+        :param version: interface version, e.g. 0.4
+        :param schemas: URI of the argument schema per command name
+        """
+        templates = {
+            command_name: PayloadTemplate(interface)
+            for command_name, interface in schemas.items()
+        }
+        with self._lock:
+            self._templates[version] = templates
+            for command_name, template in templates.items():
+                self._interface_templates[
+                    (command_name, template.interface)
+                ] = template
+
+    def get_interface(self, command_name: str) -> str:
+        """
+        Returns the interface of a command in the version in use.
+
+        :param command_name: name of the command
+        :return: the URI of the schema of the command argument
+        """
+        return self._version_templates[command_name].interface
+
+    def get_argument_interface(
+        self, command_name: str, argument: Dict[str, Any]
+    ) -> str:
+        """
+        Returns the interface of a command argument: the interface of the
+        argument if it has one, registered or not, else the interface of the
+        version in use.
+
+        :param command_name: name of the command
+        :param argument: command argument
+        :return: the URI of the schema of the command argument
+        :raises ValueError: if the interface of the argument is not a non
+            empty string
+        """
+        interface = argument.get("interface")
+        if interface is None:
+            return self.get_interface(command_name)
+        if not isinstance(interface, str) or not interface:
+            raise ValueError(
+                f"Invalid {command_name} interface {interface!r}, "
+                + "expected a schema URI"
+            )
+        return interface
+
+    def is_registered(self, command_name: str, interface: str) -> bool:
+        """
+        Returns whether an interface is registered for a command in any
+        version.
+
+        :param command_name: name of the command
+        :param interface: URI of the schema of the command argument
+        :return: True if the interface is registered
+        """
+        with self._lock:
+            return (command_name, interface) in self._interface_templates
+
+    def render(
+        self, command_name: str, argument: Dict[str, Any], interface: str = ""
+    ) -> str:
+        """
+        Returns the payload of a command in the version in use.
+
+        :param command_name: name of the command
+        :param argument: command argument
+        :param interface: interface of the command to render the payload
+            with, the interface of the version in use if empty. An interface
+            which is not registered is rendered with a generic template
+        :return: the JSON payload with the interface of the command
+        """
+        template = self._version_templates[command_name]
+        if interface and interface != template.interface:
+            template = self._interface_templates.get(
+                (command_name, interface)
+            ) or PayloadTemplate(interface)
+        return template.render(argument)
+
+    @property
+    def interfaces(self) -> Dict[str, Any]:
+        """Returns the version in use and the interfaces of every
+        version."""
+        with self._lock:
+            return {
+                "version": self._version,
+                "versions": {
+                    version: {
+                        command_name: template.interface
+                        for command_name, template in templates.items()
+                    }
+                    for version, templates in self._templates.items()
+                },
+            }
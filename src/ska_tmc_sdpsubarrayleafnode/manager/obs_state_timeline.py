@@ -0,0 +1,152 @@
+"""Timeline of the obsState transitions of the SDP Subarray"""
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from ska_tango_base.control_model import ObsState
+
+# Maximum number of transitions kept, the length of the spectrum attributes
+MAX_TIMELINE_LENGTH: int = 10000
+
+# Transition sequences whose duration is measured: from the entry into the
+# intermediate state to the entry into the final state
+TRANSITION_SEQUENCES: Tuple[Tuple[ObsState, ObsState, ObsState], ...] = (
+    (ObsState.EMPTY, ObsState.RESOURCING, ObsState.IDLE),
+    (ObsState.IDLE, ObsState.RESOURCING, ObsState.IDLE),
+    (ObsState.IDLE, ObsState.RESOURCING, ObsState.EMPTY),
+    (ObsState.IDLE, ObsState.CONFIGURING, ObsState.READY),
+    (ObsState.READY, ObsState.CONFIGURING, ObsState.READY),
+    (ObsState.ABORTING, ObsState.ABORTED, ObsState.RESTARTING),
+    (ObsState.ABORTED, ObsState.RESTARTING, ObsState.EMPTY),
+)
+
+
+def get_duration_statistics(durations: np.ndarray) -> Dict[str, Any]:
+    """
+    Returns the count, mean, minimum, maximum, median and 95th percentile
+    of durations.
+
+    :param durations: durations in seconds
+    :return: dictionary of statistics, without values if there are none
+    """
+    if not durations.size:
+        return {"count": 0}
+    percentiles = np.percentile(durations, [50, 95])
+    return {
+        "count": int(durations.size),
+        "mean": float(durations.mean()),
+        "min": float(durations.min()),
+        "max": float(durations.max()),
+        "p50": float(percentiles[0]),
+        "p95": float(percentiles[1]),
+    }
+
+
+class ObsStateTimeline:
+    """
+    The ObsStateTimeline keeps the last obsState transitions of the SDP
+    Subarray in three parallel ring buffers: the time of the transition, the
+    obsState entered and the time spent in that obsState. The duration of
+    the current obsState is NaN until it is left.
+
+    The statistics per obsState and per transition sequence are computed
+    with vectorised operations over the buffers.
+    """
+
+    def __init__(self, length: int = 1024) -> None:
+        """
+        Initialise a new ObsStateTimeline instance.
+
+        :param length: number of transitions kept, at most
+            MAX_TIMELINE_LENGTH
+        """
+        length = max(1, min(length, MAX_TIMELINE_LENGTH))
+        self._lock = threading.Lock()
+        self._timestamps = np.zeros(length, dtype=np.float64)
+        self._states = np.zeros(length, dtype=np.int8)
+        self._durations = np.full(length, np.nan, dtype=np.float32)
+        # Position of the next transition and number of transitions kept
+        self._next: int = 0
+        self._count: int = 0
+
+    @property
+    def length(self) -> int:
+        """Returns the number of transitions kept."""
+        return len(self._timestamps)
+
+    def record(
+        self, obs_state: ObsState, timestamp: Optional[float] = None
+    ) -> bool:
+        """
+        Records the obsState of an event. Nothing is recorded if the
+        obsState is unchanged.
+
+        :param obs_state: obsState of the SDP Subarray
+        :param timestamp: time of the event, now if None
+        :return: whether a transition has been recorded
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            if self._count:
+                last = (self._next - 1) % self.length
+                if self._states[last] == obs_state:
+                    return False
+                self._durations[last] = timestamp - self._timestamps[last]
+            self._timestamps[self._next] = timestamp
+            self._states[self._next] = obs_state
+            self._durations[self._next] = np.nan
+            self._next = (self._next + 1) % self.length
+            self._count = min(self._count + 1, self.length)
+        return True
+
+    def get_timeline(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns copies of the transitions from the oldest to the newest.
+
+        :return: the timestamps, obsStates and durations
+        """
+        with self._lock:
+            start = (self._next - self._count) % self.length
+            order = (start + np.arange(self._count)) % self.length
+            return (
+                self._timestamps[order],
+                self._states[order],
+                self._durations[order],
+            )
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Returns the statistics of the time spent per obsState, e.g. the
+        SCANNING dwell time, and of the duration of the transition
+        sequences, e.g. IDLE->CONFIGURING->READY.
+
+        :return: dictionary with the dwell and sequence statistics
+        """
+        timestamps, states, durations = self.get_timeline()
+        left = ~np.isnan(durations)
+        dwell = {
+            ObsState(state).name: get_duration_statistics(
+                durations[left & (states == state)].astype(np.float64)
+            )
+            for state in np.unique(states[left])
+        }
+        sequences = {}
+        for first, middle, last in TRANSITION_SEQUENCES:
+            matches = (
+                (states[:-2] == first)
+                & (states[1:-1] == middle)
+                & (states[2:] == last)
+            )
+            sequence_durations = (
+                timestamps[2:][matches] - timestamps[1:-1][matches]
+            )
+            sequences[
+                f"{first.name}->{middle.name}->{last.name}"
+            ] = get_duration_statistics(sequence_durations)
+        return {
+            "transitions": int(timestamps.size),
+            "dwell": dwell,
+            "sequences": sequences,
+        }
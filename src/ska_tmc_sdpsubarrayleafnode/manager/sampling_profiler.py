@@ -0,0 +1,233 @@
+"""Sampling profiler of the SDP leaf node device servers"""
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+# A frame is identified like in pstats: (file name, line number, function)
+Frame = Tuple[str, int, str]
+
+
+class _SampledProfile:
+    """Profile built from the stack samples, in the form loaded by
+    pstats.Stats."""
+
+    def __init__(self, stats: Dict[Frame, Tuple]) -> None:
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        """The statistics are already created from the samples."""
+
+
+class SamplingProfiler:
+    """
+    The SamplingProfiler periodically samples the stacks of all the threads
+    of the process, e.g. liveliness probe, event receiver, event processing
+    and task executor threads, without instrumenting any function, so that
+    it can be run on a device in operation.
+
+    At the end of the profiling the samples are written as collapsed stacks,
+    one line per distinct stack, ready for flame graph tools, and as a pstats
+    file where the time of a function is the number of samples in which it
+    appears multiplied by the measured sampling period.
+    """
+
+    MIN_INTERVAL: float = 0.001
+    MAX_DURATION: float = 3600.0
+
+    def __init__(
+        self,
+        output_directory: str = "/tmp",
+        file_prefix: str = "profile",
+        logger: logging.Logger = LOGGER,
+    ) -> None:
+        """
+        Initialise a new SamplingProfiler instance.
+
+        :param output_directory: directory of the collapsed stack and pstats
+            files
+        :param file_prefix: prefix of the output file names
+        :param logger: a logger for this profiler
+        """
+        self._output_directory = output_directory
+        self._file_prefix = file_prefix
+        self._logger = logger
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._sample_period: float = 0.0
+        self._samples: Counter = Counter()
+        self._sample_count: int = 0
+        self.last_output: Tuple[str, str] = ("", "")
+
+    @property
+    def is_running(self) -> bool:
+        """Returns whether a profiling is in progress."""
+        with self._lock:
+            return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: float, interval: float = 0.01) -> None:
+        """
+        Starts sampling the thread stacks in a background thread for the
+        given duration.
+
+        :param duration: profiling duration in seconds
+        :param interval: sampling interval in seconds
+        :raises ValueError: if the duration or interval is out of range
+        :raises RuntimeError: if a profiling is already in progress
+        """
+        if not 0 < duration <= self.MAX_DURATION:
+            raise ValueError(
+                f"Profiling duration must be in (0, {self.MAX_DURATION}] s"
+            )
+        if not self.MIN_INTERVAL <= interval < duration:
+            raise ValueError(
+                "Sampling interval must be at least "
+                + f"{self.MIN_INTERVAL} s and less than the duration"
+            )
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                raise RuntimeError("Profiling is already in progress")
+            self._samples = Counter()
+            self._sample_count = 0
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(duration, interval),
+                name="sampling_profiler",
+                daemon=True,
+            )
+            self._thread.start()
+        self._logger.info(
+            "Profiling started for %s s with a sampling interval of %s s",
+            duration,
+            interval,
+        )
+
+    def stop(self) -> Tuple[str, str]:
+        """
+        Stops the profiling in progress and waits for the output files.
+
+        :return: paths of the collapsed stack file and of the pstats file
+        :raises RuntimeError: if no profiling is in progress
+        """
+        with self._lock:
+            thread = self._thread
+        if thread is None or not thread.is_alive():
+            raise RuntimeError("Profiling is not in progress")
+        self._stop_event.set()
+        thread.join()
+        return self.last_output
+
+    def _run(self, duration: float, interval: float) -> None:
+        """Samples the thread stacks until the duration elapses or the
+        profiling is stopped, then writes the output files."""
+        start_time = time.monotonic()
+        while time.monotonic() < start_time + duration:
+            self._take_sample()
+            if self._stop_event.wait(interval):
+                break
+        # The samples are weighted by the measured sampling period, which
+        # includes the sampling time on top of the interval.
+        self._sample_period = (time.monotonic() - start_time) / max(
+            self._sample_count, 1
+        )
+        try:
+            self.last_output = self._write_output()
+        except OSError as exception:
+            self._logger.error(
+                "Unable to write the profiling output: %s", exception
+            )
+            return
+        self._logger.info(
+            "Profiling completed with %s samples, output: %s",
+            self._sample_count,
+            self.last_output,
+        )
+
+    def _take_sample(self) -> None:
+        """Records the current stack of every thread but this one."""
+        own_thread_id = threading.get_ident()
+        thread_names = {
+            thread.ident: thread.name for thread in threading.enumerate()
+        }
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread_id:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    (code.co_filename, code.co_firstlineno, code.co_name)
+                )
+                frame = frame.f_back
+            stack.reverse()
+            thread_name = thread_names.get(thread_id, str(thread_id))
+            self._samples[(thread_name, tuple(stack))] += 1
+        self._sample_count += 1
+
+    def _write_output(self) -> Tuple[str, str]:
+        """Writes the collapsed stacks and pstats files of the samples."""
+        file_path = os.path.join(
+            self._output_directory,
+            f"{self._file_prefix}_{time.strftime('%Y%m%dT%H%M%S')}",
+        )
+        collapsed_path = f"{file_path}.collapsed"
+        pstats_path = f"{file_path}.pstats"
+        with open(collapsed_path, "w", encoding="utf-8") as collapsed_file:
+            for (thread_name, stack), count in self._samples.items():
+                frames = ";".join(
+                    f"{function} ({os.path.basename(file_name)}:{line})"
+                    for file_name, line, function in stack
+                )
+                collapsed_file.write(f"{thread_name};{frames} {count}\n")
+        pstats.Stats(_SampledProfile(self._get_stats())).dump_stats(
+            pstats_path
+        )
+        return collapsed_path, pstats_path
+
+    def _get_stats(self) -> Dict[Frame, Tuple[Any, ...]]:
+        """
+        Converts the samples to the pstats format. A function is counted
+        once per sample whatever its recursion depth.
+
+        :return: dictionary of (call count, primitive call count, own time,
+            cumulative time, callers) per function
+        """
+        call_counts: Counter = Counter()
+        own_times: Counter = Counter()
+        callers: Dict[Frame, Counter] = {}
+        for (_, stack), count in self._samples.items():
+            if not stack:
+                continue
+            own_times[stack[-1]] += count * self._sample_period
+            for function in set(stack):
+                call_counts[function] += count
+            for caller, callee in set(zip(stack, stack[1:])):
+                callers.setdefault(callee, Counter())[caller] += count
+        return {
+            function: (
+                call_count,
+                call_count,
+                own_times[function],
+                call_count * self._sample_period,
+                {
+                    caller: (
+                        caller_count,
+                        caller_count,
+                        0.0,
+                        caller_count * self._sample_period,
+                    )
+                    for caller, caller_count in callers.get(
+                        function, Counter()
+                    ).items()
+                },
+            )
+            for function, call_count in call_counts.items()
+        }
@@ -0,0 +1,116 @@
+"""Inventory of the threads of the SDP leaf node device servers"""
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+# Purpose of a thread, from a pattern of its name or target function
+THREAD_PURPOSES: Tuple[Tuple[str, str], ...] = (
+    ("liveliness", "liveliness probe"),
+    ("event_receiver", "event subscription"),
+    ("EventReceiver", "event subscription"),
+    ("event_processing", "event processing"),
+    ("process_event", "event processing"),
+    ("async_reply", "asynchronous command replies"),
+    ("health_aggregator", "SDP Subarray health aggregation"),
+    ("fan_out", "power command fan-out"),
+    ("sampling_profiler", "sampling profiler"),
+    ("executor_metrics", "task executor metrics export"),
+    ("shard_load", "shard load report"),
+    ("track", "command tracker"),
+    ("timeout", "command timeout"),
+    ("ThreadPoolExecutor", "task executor or thread pool"),
+    ("MainThread", "main thread"),
+)
+
+
+class ThreadInventory:
+    """
+    The ThreadInventory lists the threads of the device server process with
+    their purpose, CPU time and last active time.
+
+    The last active time is the time of the first inventory at which the
+    CPU time of the thread was found to have increased since the previous
+    inventory. It is None until such an increase has been observed.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # Per thread: CPU time and last active time at the last inventory
+        self._thread_activity: Dict[
+            Tuple[Optional[int], str], Tuple[float, Optional[float]]
+        ] = {}
+
+    @staticmethod
+    def get_purpose(thread: threading.Thread, target: str) -> str:
+        """
+        Returns the purpose of a thread from its type, name and target.
+
+        :param thread: the thread
+        :param target: qualified name of the thread target function
+        :return: the purpose of the thread, unknown if not recognised
+        """
+        if isinstance(thread, threading.Timer):
+            return "timer"
+        description = f"{thread.name} {target}"
+        for pattern, purpose in THREAD_PURPOSES:
+            if pattern in description:
+                return purpose
+        return "unknown"
+
+    @staticmethod
+    def get_cpu_time(thread: threading.Thread) -> Optional[float]:
+        """Returns the CPU time in seconds of a thread, None if it is not
+        available."""
+        try:
+            return time.clock_gettime(time.pthread_getcpuclockid(thread.ident))
+        except (AttributeError, OSError, TypeError):
+            return None
+
+    def get_inventory(self) -> Dict[str, Any]:
+        """
+        Returns the threads of the process and their number per purpose.
+
+        :return: dictionary with the threads list and the thread_counts
+        """
+        now = time.time()
+        threads: List[Dict[str, Any]] = []
+        thread_activity = {}
+        with self._lock:
+            for thread in threading.enumerate():
+                # The target is kept by the thread only while it runs
+                # pylint: disable=protected-access
+                target_function = getattr(thread, "_target", None)
+                target = getattr(target_function, "__qualname__", "")
+                cpu_time = self.get_cpu_time(thread)
+                key = (thread.ident, thread.name)
+                previous_cpu_time, last_active = self._thread_activity.get(
+                    key, (None, None)
+                )
+                if (
+                    previous_cpu_time is not None
+                    and cpu_time is not None
+                    and cpu_time > previous_cpu_time
+                ):
+                    last_active = now
+                if cpu_time is not None:
+                    thread_activity[key] = (cpu_time, last_active)
+                threads.append(
+                    {
+                        "name": thread.name,
+                        "purpose": self.get_purpose(thread, target),
+                        "target": target,
+                        "native_id": thread.native_id,
+                        "daemon": thread.daemon,
+                        "cpu_time": cpu_time,
+                        "last_active": last_active,
+                    }
+                )
+            # The threads which have ended are dropped
+            self._thread_activity = thread_activity
+        return {
+            "threads": threads,
+            "thread_counts": dict(
+                Counter(thread["purpose"] for thread in threads)
+            ),
+        }
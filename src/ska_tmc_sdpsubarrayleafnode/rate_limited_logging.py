@@ -0,0 +1,127 @@
+"""Rate limited logging for the hot paths of SDP Subarray Leaf Node"""
+import logging
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+
+class TruncatedPayload:
+    """
+    Wraps a log argument so that it is converted to a string, and truncated,
+    only if the log record is actually formatted.
+    """
+
+    __slots__ = ("payload", "max_length")
+
+    def __init__(self, payload: Any, max_length: int) -> None:
+        self.payload = payload
+        self.max_length = max_length
+
+    def __str__(self) -> str:
+        text = str(self.payload)
+        if len(text) <= self.max_length:
+            return text
+        return f"{text[:self.max_length]}... ({len(text)} characters)"
+
+    __repr__ = __str__
+
+
+class RateLimitedLogger:
+    """
+    The RateLimitedLogger wraps a logger for the call sites executed on
+    every event or command. Every call site, identified by a key, emits at
+    most one record per period. The calls suppressed in between are counted
+    and reported with the next emitted record, e.g. "Obs State value changed
+    to :READY (339 similar messages suppressed in the last 10.0 s)".
+
+    The records are formatted lazily by the logging module, and only if the
+    level is enabled. The str, list, tuple and dict arguments are truncated
+    to max_payload_length characters.
+    """
+
+    TRUNCATED_TYPES: Tuple[type, ...] = (str, list, tuple, dict)
+
+    def __init__(
+        self,
+        logger: logging.Logger = LOGGER,
+        period: float = 10.0,
+        max_payload_length: int = 512,
+    ) -> None:
+        """
+        Initialise a new RateLimitedLogger instance.
+
+        :param logger: the logger the records are emitted on
+        :param period: minimum time in seconds between two records of the
+            same call site, 0 disables the rate limiting
+        :param max_payload_length: maximum length of a payload argument
+        """
+        self.logger = logger
+        self.period = period
+        self.max_payload_length = max_payload_length
+        self._lock = threading.Lock()
+        # Per call site: time of the last emitted record, number of records
+        # suppressed since then, total emitted and total suppressed
+        self._call_sites: Dict[str, list] = {}
+
+    @property
+    def statistics(self) -> Dict[str, Dict[str, int]]:
+        """Returns the number of emitted and suppressed records per call
+        site."""
+        with self._lock:
+            return {
+                key: {"emitted": call_site[2], "suppressed": call_site[3]}
+                for key, call_site in self._call_sites.items()
+            }
+
+    def debug(self, key: str, msg: str, *args: Any) -> None:
+        """Logs a rate limited record with level DEBUG."""
+        self._log(logging.DEBUG, key, msg, args)
+
+    def info(self, key: str, msg: str, *args: Any) -> None:
+        """Logs a rate limited record with level INFO."""
+        self._log(logging.INFO, key, msg, args)
+
+    def warning(self, key: str, msg: str, *args: Any) -> None:
+        """Logs a rate limited record with level WARNING."""
+        self._log(logging.WARNING, key, msg, args)
+
+    def _log(
+        self, level: int, key: str, msg: str, args: Tuple[Any, ...]
+    ) -> None:
+        """
+        Emits the record unless the call site has emitted one less than a
+        period ago, in which case it is only counted.
+
+        :param level: logging level of the record
+        :param key: identifier of the call site
+        :param msg: %-style format string of the record
+        :param args: arguments of the format string
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        with self._lock:
+            call_site = self._call_sites.get(key)
+            if call_site is None:
+                call_site = self._call_sites[key] = [None, 0, 0, 0]
+            last_time, suppressed = call_site[0], call_site[1]
+            if last_time is not None and now - last_time < self.period:
+                call_site[1] += 1
+                call_site[3] += 1
+                return
+            call_site[0] = now
+            call_site[1] = 0
+            call_site[2] += 1
+        args = tuple(
+            TruncatedPayload(arg, self.max_payload_length)
+            if isinstance(arg, self.TRUNCATED_TYPES)
+            else arg
+            for arg in args
+        )
+        if suppressed:
+            msg += " (%d similar messages suppressed in the last %.1f s)"
+            args += (suppressed, now - last_time)
+        # stacklevel 3 reports the caller of debug, info or warning
+        self.logger.log(level, msg, *args, stacklevel=3)
@@ -4,8 +4,11 @@ actions during an observation.
 It also acts as a SDP contact point for Subarray Node for observation execution
 """
 
+import json
+import time
 from typing import List, Tuple, Union
 
+import numpy as np
 import tango
 from ska_control_model import AdminMode, HealthState
 from ska_tango_base.commands import ResultCode, SubmittedSlowCommand
@@ -22,11 +25,18 @@ from ska_tmc_common.v1.tmc_base_leaf_device import TMCBaseLeafDevice
 from tango import ApiUtil, AttrWriteType, DebugIt
 from tango.server import attribute, command, device_property, run
 
-from ska_tmc_sdpsubarrayleafnode import release
-from ska_tmc_sdpsubarrayleafnode.commands.set_sdp_subarray_admin_mode import (
-    SetAdminMode,
+from ska_tmc_sdpsubarrayleafnode import IMPORT_START_TIME, commands, release
+from ska_tmc_sdpsubarrayleafnode.manager import (
+    AsyncReplyMode,
+    SamplingProfiler,
+    SdpSLNComponentManager,
+)
+from ska_tmc_sdpsubarrayleafnode.manager.interface_registry import (
+    DEFAULT_INTERFACE_VERSION,
+)
+from ska_tmc_sdpsubarrayleafnode.manager.obs_state_timeline import (
+    MAX_TIMELINE_LENGTH,
 )
-from ska_tmc_sdpsubarrayleafnode.manager import SdpSLNComponentManager
 
 
 class SdpSubarrayLeafNode(TMCBaseLeafDevice):
@@ -41,17 +51,27 @@ class SdpSubarrayLeafNode(TMCBaseLeafDevice):
         self._LastDeviceInfoChanged = ""
         self._command_result = ("", "")
         self._issubsystemavailable = False
+        self._init_duration = None
         super().__init__(*args, **kwargs)
 
     def init_device(self):
+        init_start_time = time.time()
         super().init_device()
+        self.profiler = SamplingProfiler(
+            self.ProfilingOutputDirectory,
+            file_prefix=self.get_name().replace("/", "_"),
+            logger=self.logger,
+        )
         for attribute_name in [
             "sdpSubarrayObsState",
             "longRunningCommandResult",
             "isSubsystemAvailable",
+            "slowCommandWarning",
         ]:
             self.set_change_event(attribute_name, True, False)
             self.set_archive_event(attribute_name, True)
+        self.component_manager.publish_recovered_state()
+        self._init_duration = time.time() - init_start_time
 
     # -----------------
     # Device Properties
@@ -68,6 +88,115 @@ class SdpSubarrayLeafNode(TMCBaseLeafDevice):
         default_value=True,
     )
 
+    AsyncReplyHandling = device_property(
+        dtype="str",
+        doc="""Handling of the asynchronous command replies from SDP
+        Subarray. INLINE processes them on the Tango callback thread, PUSH and
+        PULL hand them over in batches to a worker thread using the push or
+        pull callback model respectively.""",
+        default_value="INLINE",
+    )
+
+    CommandTraceDepth = device_property(
+        dtype="DevUShort",
+        doc="Number of completed command traces retained.",
+        default_value=20,
+    )
+
+    CommandTraceFile = device_property(
+        dtype="str",
+        doc="""Path of the file where the command traces are exported in the
+        Chrome trace event format. The traces are not exported if empty.""",
+        default_value="",
+    )
+
+    LogRateLimitPeriod = device_property(
+        dtype="DevFloat",
+        doc="""Minimum time in seconds between two records of a log call
+        site executed on every event or command. The suppressed records are
+        counted and reported with the next one. 0 disables the limit.""",
+        default_value=10.0,
+    )
+
+    LogPayloadMaxLength = device_property(
+        dtype="DevULong",
+        doc="Maximum length of a payload logged on every command.",
+        default_value=512,
+    )
+
+    ProfilingOutputDirectory = device_property(
+        dtype="str",
+        doc="Directory of the files written by the StartProfiling command.",
+        default_value="/tmp",
+    )
+
+    ExecutorMetricsFile = device_property(
+        dtype="str",
+        doc="""Path of the file where the task executor metrics are written
+        in the Prometheus text exposition format. Not written if empty.""",
+        default_value="",
+    )
+
+    CommandLanesEnabled = device_property(
+        dtype=bool,
+        doc="""Submit the housekeeping commands (On, Off) and Restart on their
+        own task executors, so that they are not blocked behind the
+        observation commands, which stay serialised. Abort then also aborts
+        the queued observation commands.""",
+        default_value=False,
+    )
+
+    SdpInterfaceVersion = device_property(
+        dtype="str",
+        doc="""SDP interface version of the AssignResources, Configure and
+        Scan arguments sent to SDP Subarray. It can be switched at runtime
+        with the sdpInterfaceVersion attribute.""",
+        default_value=DEFAULT_INTERFACE_VERSION,
+    )
+
+    CommandJournalFile = device_property(
+        dtype="str",
+        doc="""Path of the file where the commands and the obsState are
+        journaled. At restart the last journaled state is reloaded and the
+        commands in flight are failed. Nothing is journaled if empty.""",
+        default_value="",
+    )
+
+    ObsStateTimelineLength = device_property(
+        dtype="DevUShort",
+        doc=f"""Number of obsState transitions kept in the obsState
+        timeline, at most {MAX_TIMELINE_LENGTH}.""",
+        default_value=1024,
+    )
+
+    AdaptiveCommandTimeout = device_property(
+        dtype=bool,
+        doc="""Use as timeout of every command its p99 completion time,
+        learned from the previous completions, multiplied by
+        AdaptiveTimeoutMultiple and bounded by AdaptiveTimeoutMin and
+        AdaptiveTimeoutMax. CommandTimeOut is used until the command has
+        completed enough times.""",
+        default_value=False,
+    )
+
+    AdaptiveTimeoutMultiple = device_property(
+        dtype="DevFloat",
+        doc="Safety multiple of the learned p99 completion time.",
+        default_value=3.0,
+    )
+
+    AdaptiveTimeoutMin = device_property(
+        dtype="DevFloat",
+        doc="Minimum learned command timeout in seconds.",
+        default_value=5.0,
+    )
+
+    AdaptiveTimeoutMax = device_property(
+        dtype="DevFloat",
+        doc="Maximum learned command timeout in seconds.",
+        default_value=50.0,
+    )
+
     # -----------------
     # Attributes
     # -----------------
@@ -94,6 +223,138 @@ class SdpSubarrayLeafNode(TMCBaseLeafDevice):
         access=AttrWriteType.READ,
     )
 
+    asyncReplyStatistics = attribute(
+        dtype="DevString",
+        access=AttrWriteType.READ,
+        doc="""Json String representing the latency and processing time
+        statistics of the asynchronous command replies.""",
+    )
+
+    eventSubscriptionStatistics = attribute(
+        dtype="DevString",
+        access=AttrWriteType.READ,
+        doc="""Json String representing the subscription status, time to
+        subscription and time to first event of each subscribed attribute.""",
+    )
+
+    resourceInventory = attribute(
+        dtype="DevString",
+        access=AttrWriteType.READ,
+        doc="""Json String representing the threads of the device server with
+        their purpose, CPU time and last active time, and the number of device
+        proxies and event subscriptions.""",
+    )
+
+    commandLanes = attribute(
+        dtype="DevString",
+        access=AttrWriteType.READ,
+        doc="""Json String representing the workers and commands of every
+        command lane.""",
+    )
+
+    executorMetrics = attribute(
+        dtype="DevString",
+        access=AttrWriteType.READ,
+        doc="""Json String representing the queued and running tasks, the
+        submitted and rejected tasks and the queue wait time per command, and
+        the busy ratio of the task executor.""",
+    )
+
+    startupTiming = attribute(
+        dtype="DevString",
+        access=AttrWriteType.READ,
+        doc="""Json String representing the time in seconds of every startup
+        phase: imports, init, event subscription and first event. The event
+        subscription and first event times are measured from the start of the
+        event receiver.""",
+    )
+
+    commandTraces = attribute(
+        dtype="DevString",
+        access=AttrWriteType.READ,
+        doc="""Json String representing the last command traces, with the
+        time in seconds of every phase relative to the command submission.""",
+    )
+
+    journalRecovery = attribute(
+        dtype="DevString",
+        access=AttrWriteType.READ,
+        doc="""Json String representing the recovery from the command journal
+        at startup: recovery time in seconds, number of replayed records,
+        interrupted commands, recovered state and the error which disabled
+        the journal, empty if none.""",
+    )
+
+    obsStateTimelineTimestamps = attribute(
+        dtype=("DevDouble",),
+        max_dim_x=MAX_TIMELINE_LENGTH,
+        access=AttrWriteType.READ,
+        doc="Time of the last obsState transitions of SDP Subarray, from the "
+        + "oldest to the newest.",
+    )
+
+    obsStateTimelineStates = attribute(
+        dtype=("DevShort",),
+        max_dim_x=MAX_TIMELINE_LENGTH,
+        access=AttrWriteType.READ,
+        doc="ObsState entered at every transition of "
+        + "obsStateTimelineTimestamps.",
+    )
+
+    obsStateTimelineDurations = attribute(
+        dtype=("DevFloat",),
+        max_dim_x=MAX_TIMELINE_LENGTH,
+        access=AttrWriteType.READ,
+        doc="Time in seconds spent in every obsState of "
+        + "obsStateTimelineStates, NaN for the current obsState.",
+    )
+
+    obsStateTimelineStatistics = attribute(
+        dtype="DevString",
+        access=AttrWriteType.READ,
+        doc="""Json String representing the statistics of the time spent per
+        obsState, e.g. the SCANNING dwell time, and of the duration of the
+        transition sequences, e.g. IDLE->CONFIGURING->READY.""",
+    )
+
+    slowCommandWarning = attribute(
+        dtype="DevString",
+        access=AttrWriteType.READ,
+        doc="""Json String representing the last command which ran beyond
+        its learned p99 completion time, pushed as a change event before the
+        command times out.""",
+    )
+
+    adaptiveCommandTimeouts = attribute(
+        dtype="DevString",
+        access=AttrWriteType.READ,
+        doc="""Json String representing the learned p50 and p99 completion
+        times and the timeout of every command.""",
+    )
+
+    configurationDelta = attribute(
+        dtype="DevString",
+        access=AttrWriteType.READ,
+        doc="""Json String representing the hash of the last Configure
+        argument, the hash of the configuration applied before it, whether
+        it was unchanged and its changed keys.""",
+    )
+
+    preparedConfigurations = attribute(
+        dtype="DevString",
+        access=AttrWriteType.READ,
+        doc="""Json String representing the hash of the configuration
+        prepared by PrepareConfigurations per scan type.""",
+    )
+
+    encodedPayloadStatistics = attribute(
+        dtype="DevString",
+        access=AttrWriteType.READ,
+        doc="""Json String representing the encoding format, the encoded and
+        decoded sizes in bytes and the decoding time in seconds of the last
+        AssignResourcesEncoded argument.""",
+    )
+
     # ---------------
     # General methods
     # ---------------
@@ -113,6 +374,12 @@ class SdpSubarrayLeafNode(TMCBaseLeafDevice):
             "sdpSubarrayObsState", self._sdp_subarray_obs_state
         )
 
+    def update_slow_command_callback(self, slow_command_warning: dict) -> None:
+        """Change event callback for slowCommandWarning"""
+        self.push_change_archive_events(
+            "slowCommandWarning", json.dumps(slow_command_warning)
+        )
+
     def update_lrcr_callback(
         self,
         lrc_result: Tuple[str, Union[ResultCode, TaskStatus, Exception, str]],
@@ -185,9 +452,17 @@ class SdpSubarrayLeafNode(TMCBaseLeafDevice):
             ]:
                 device.set_change_event(attribute_name, True, False)
             device._isSubsystemAvailable = False
-            ApiUtil.instance().set_asynch_cb_sub_model(
-                tango.cb_sub_model.PUSH_CALLBACK
-            )
+            if (
+                device.component_manager.async_reply_mode
+                == AsyncReplyMode.PULL
+            ):
+                ApiUtil.instance().set_asynch_cb_sub_model(
+                    tango.cb_sub_model.PULL_CALLBACK
+                )
+            else:
+                ApiUtil.instance().set_asynch_cb_sub_model(
+                    tango.cb_sub_model.PUSH_CALLBACK
+                )
             device.op_state_model.perform_action("component_on")
             return (ResultCode.OK, "")
 
@@ -210,7 +485,7 @@ class SdpSubarrayLeafNode(TMCBaseLeafDevice):
 
     def write_sdpSubarrayDevName(self, value: str) -> None:
         """Set the sdpsubarraydevname attribute."""
-        self.component_manager._sdp_subarray_dev_name = value
+        self.component_manager.update_sdp_subarray_dev_name(value)
 
     def read_isSubsystemAvailable(self) -> bool:
         """Read method for issubsystemavailable"""
@@ -224,6 +499,102 @@ class SdpSubarrayLeafNode(TMCBaseLeafDevice):
         """Reads the current observation state of the SDP subarray"""
         return self._sdp_subarray_obs_state
 
+    def read_asyncReplyStatistics(self) -> str:
+        """Return the asynchronous command reply statistics"""
+        dispatcher = self.component_manager.async_reply_dispatcher
+        if dispatcher is None:
+            return json.dumps(
+                {"mode": self.component_manager.async_reply_mode.value}
+            )
+        return json.dumps(dispatcher.statistics)
+
+    def read_resourceInventory(self) -> str:
+        """Return the thread and resource inventory"""
+        return json.dumps(self.component_manager.get_resource_inventory())
+
+    def read_commandLanes(self) -> str:
+        """Return the command lanes"""
+        return json.dumps(self.component_manager.command_lanes.lanes)
+
+    def read_executorMetrics(self) -> str:
+        """Return the task executor metrics"""
+        return json.dumps(
+            self.component_manager.executor_metrics.get_metrics()
+        )
+
+    def read_startupTiming(self) -> str:
+        """Return the startup time of every phase in seconds"""
+        startup_timing = {
+            "imports": IMPORTS_DURATION,
+            "init": self._init_duration,
+            "subscription": None,
+            "first_event": None,
+        }
+        event_receiver = getattr(
+            self.component_manager, "event_receiver", None
+        )
+        if event_receiver is not None:
+            startup_timing.update(event_receiver.startup_timing)
+        return json.dumps(startup_timing)
+
+    def read_eventSubscriptionStatistics(self) -> str:
+        """Return the event subscription statistics per attribute"""
+        event_receiver = getattr(
+            self.component_manager, "event_receiver", None
+        )
+        if event_receiver is None:
+            return json.dumps({})
+        return json.dumps(event_receiver.subscription_statistics)
+
+    def read_journalRecovery(self) -> str:
+        """Return the recovery report of the command journal"""
+        return json.dumps(self.component_manager.journal_recovery)
+
+    def read_obsStateTimelineTimestamps(self) -> np.ndarray:
+        """Return the time of the last obsState transitions"""
+        return self.component_manager.obs_state_timeline.get_timeline()[0]
+
+    def read_obsStateTimelineStates(self) -> np.ndarray:
+        """Return the obsState of the last obsState transitions"""
+        states = self.component_manager.obs_state_timeline.get_timeline()[1]
+        return states.astype(np.int16)
+
+    def read_obsStateTimelineDurations(self) -> np.ndarray:
+        """Return the time spent in the last obsStates"""
+        return self.component_manager.obs_state_timeline.get_timeline()[2]
+
+    def read_obsStateTimelineStatistics(self) -> str:
+        """Return the obsState dwell and transition statistics"""
+        return json.dumps(
+            self.component_manager.obs_state_timeline.get_statistics()
+        )
+
+    def read_slowCommandWarning(self) -> str:
+        """Return the last slow command warning"""
+        return json.dumps(self.component_manager.slow_command_warning)
+
+    def read_adaptiveCommandTimeouts(self) -> str:
+        """Return the learned completion times and timeouts"""
+        return json.dumps(self.component_manager.adaptive_timeout.statistics)
+
+    def read_configurationDelta(self) -> str:
+        """Return the delta of the last Configure argument"""
+        return json.dumps(
+            self.component_manager.configuration_cache.last_delta
+        )
+
+    def read_preparedConfigurations(self) -> str:
+        """Return the prepared configurations"""
+        return json.dumps(self.component_manager.configuration_cache.prepared)
+
+    def read_encodedPayloadStatistics(self) -> str:
+        """Return the statistics of the last decoded argument"""
+        return json.dumps(self.component_manager.encoded_payload_statistics)
+
+    def read_commandTraces(self) -> str:
+        """Return the last command traces"""
+        return json.dumps(self.component_manager.command_tracer.traces)
+
     @attribute(
         dtype=AdminMode,
         access=AttrWriteType.READ,
@@ -247,6 +618,21 @@ class SdpSubarrayLeafNode(TMCBaseLeafDevice):
         """Set the value of isAdminModeEnabled attribute"""
         self.component_manager.is_admin_mode_enabled = value
 
+    @attribute(
+        dtype="DevString",
+        access=AttrWriteType.READ_WRITE,
+        doc="Get or set the SDP interface version of the commands sent to "
+        + "SDP Subarray",
+    )
+    def sdpInterfaceVersion(self) -> str:
+        """Get the SDP interface version in use."""
+        return self.component_manager.interface_registry.version
+
+    @sdpInterfaceVersion.write
+    def sdpInterfaceVersion(self, value: str) -> None:
+        """Set the value of sdpInterfaceVersion attribute"""
+        self.component_manager.interface_registry.version = value
+
     # --------
     # Commands
     # --------
@@ -307,6 +693,37 @@ class SdpSubarrayLeafNode(TMCBaseLeafDevice):
         result_code, unique_id = handler(argin)
         return [result_code], [unique_id]
 
+    def is_AssignResourcesEncoded_allowed(self) -> bool:
+        """
+        Checks whether AssignResourcesEncoded command is allowed to be run \
+        in current device state. \
+
+        :return: True if AssignResourcesEncoded command is allowed to be run \
+        in current device state.
+
+        :rtype: boolean
+        """
+        return self.component_manager.is_command_allowed("AssignResources")
+
+    @command(
+        dtype_in="DevEncoded",
+        doc_in="The zlib or gzip compressed UTF-8 JSON string, or the "
+        + "uncompressed one with the json encoding format",
+        dtype_out="DevVarLongStringArray",
+        doc_out="information-only string",
+    )
+    @DebugIt()
+    def AssignResourcesEncoded(
+        self, argin: Tuple[str, bytes]
+    ) -> Tuple[List[ResultCode], List[str]]:
+        """
+        This command decodes its argument and invokes the AssignResources()
+        command on Sdp Subarray.
+        """
+        handler = self.get_command_object("AssignResourcesEncoded")
+        result_code, unique_id = handler(argin)
+        return [result_code], [unique_id]
+
     def is_Configure_allowed(self) -> bool:
         """
         Checks whether Configure command is allowed to be run in \
@@ -334,6 +751,25 @@ class SdpSubarrayLeafNode(TMCBaseLeafDevice):
         result_code, unique_id = handler(argin)
         return [result_code], [unique_id]
 
+    @command(
+        dtype_in="str",
+        doc_in="The JSON list of the Configure arguments of the execution "
+        + "block",
+        dtype_out="DevVarLongStringArray",
+        doc_out="information-only string",
+    )
+    @DebugIt()
+    def PrepareConfigurations(
+        self, argin: str
+    ) -> Tuple[List[ResultCode], List[str]]:
+        """
+        This command validates and serialises ahead of time the Configure
+        arguments, which a Configure with only their scan_type then sends.
+        """
+        handler = self.get_command_object("PrepareConfigurations")
+        result_code, message = handler(argin)
+        return [result_code], [message]
+
     def is_Scan_allowed(self) -> bool:
         """
         Checks whether Scan command is allowed to be run in \
@@ -522,6 +958,40 @@ class SdpSubarrayLeafNode(TMCBaseLeafDevice):
         result_code, unique_id = handler()
         return ([result_code], [unique_id])
 
+    @command(
+        dtype_in="DevVarDoubleArray",
+        doc_in="Profiling duration and sampling interval in seconds",
+        dtype_out="DevVarLongStringArray",
+    )
+    @DebugIt()
+    def StartProfiling(self, argin: List[float]):
+        """
+        This command starts sampling the stacks of all the threads of the
+        device server. The collapsed stacks and pstats files are written in
+        ProfilingOutputDirectory at the end of the duration or on
+        StopProfiling.
+        """
+        try:
+            self.profiler.start(*argin)
+        except (TypeError, ValueError, RuntimeError) as exception:
+            return [ResultCode.REJECTED], [str(exception)]
+        return [ResultCode.OK], ["Profiling started"]
+
+    @command(dtype_out="DevVarLongStringArray")
+    @DebugIt()
+    def StopProfiling(self):
+        """
+        This command stops the profiling in progress and returns the paths
+        of the collapsed stacks and pstats files.
+        """
+        try:
+            collapsed_path, pstats_path = self.profiler.stop()
+        except RuntimeError as exception:
+            return [ResultCode.REJECTED], [str(exception)]
+        return [ResultCode.OK], [
+            json.dumps({"collapsed": collapsed_path, "pstats": pstats_path})
+        ]
+
     @command(
         dtype_in=AdminMode,
         doc_in="The adminMode in enum format",
@@ -556,6 +1026,24 @@ class SdpSubarrayLeafNode(TMCBaseLeafDevice):
             adapter_timeout=self.AdapterTimeOut,
             _update_availablity_callback=self.update_availablity_callback,
             command_timeout=self.CommandTimeOut,
+            async_reply_mode=AsyncReplyMode.parse(
+                self.AsyncReplyHandling, self.logger
+            ),
+            command_trace_depth=self.CommandTraceDepth,
+            command_trace_file=self.CommandTraceFile,
+            log_rate_limit_period=self.LogRateLimitPeriod,
+            log_payload_max_length=self.LogPayloadMaxLength,
+            command_journal_file=self.CommandJournalFile,
+            obs_state_timeline_length=self.ObsStateTimelineLength,
+            executor_metrics_file=self.ExecutorMetricsFile,
+            executor_metrics_labels={"device": self.get_name()},
+            command_lanes_enabled=self.CommandLanesEnabled,
+            adaptive_timeout_enabled=self.AdaptiveCommandTimeout,
+            adaptive_timeout_multiple=self.AdaptiveTimeoutMultiple,
+            adaptive_timeout_min=self.AdaptiveTimeoutMin,
+            adaptive_timeout_max=self.AdaptiveTimeoutMax,
+            sdp_interface_version=self.SdpInterfaceVersion,
+            _update_slow_command_callback=self.update_slow_command_callback,
         )
         return cm
 
@@ -571,6 +1059,7 @@ class SdpSubarrayLeafNode(TMCBaseLeafDevice):
             ("On", "on"),
             ("Off", "off"),
             ("AssignResources", "assign_resources"),
+            ("AssignResourcesEncoded", "assign_resources_encoded"),
             ("Configure", "configure"),
             ("Scan", "scan"),
             ("EndScan", "end_scan"),
@@ -593,7 +1082,12 @@ class SdpSubarrayLeafNode(TMCBaseLeafDevice):
             "Abort": self.AbortCommandsCommand(
                 self.component_manager, self.logger
             ),
-            "SetAdminMode": SetAdminMode(self.logger, self.component_manager),
+            "SetAdminMode": commands.SetAdminMode(
+                self.logger, self.component_manager
+            ),
+            "PrepareConfigurations": commands.PrepareConfigurations(
+                self.component_manager, self.logger
+            ),
         }
         for cmd_name, cmd_class in fast_commands.items():
             self.register_command_object(cmd_name, cmd_class)
@@ -604,6 +1098,10 @@ class SdpSubarrayLeafNode(TMCBaseLeafDevice):
 # ----------
 
 
+# Time taken to import the device server modules
+IMPORTS_DURATION: float = time.time() - IMPORT_START_TIME
+
+
 def main(args=None, **kwargs):
     """
     Runs the SdpSubarrayLeafNode Tango device.
@@ -0,0 +1,414 @@
+"""
+Supervisor of the SdpSubarrayLeafNode device server processes.
+
+The SdpSubarrayLeafNode devices are split in shards, each hosted by its own
+SdpSubarrayLeafNodeDS process, so that the devices of a deployment with
+many subarrays run on several cores. A device is assigned to a shard by
+rendezvous hashing of its name, so that the assignment does not depend on
+the order of the devices and only the devices of a removed or added shard
+move when the number of shards changes.
+
+The supervisor restarts the shards whose process exited, with an
+exponential backoff, and reports the events, commands and CPU time per
+second of every shard.
+
+Usage::
+
+    SdpSubarrayLeafNodeSupervisor <instance> --shards 4 \\
+        --devices mid-tmc/subarray-leaf-node-sdp/01,... [--register]
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional
+
+import tango
+
+from ska_tmc_sdpsubarrayleafnode import sdp_subarray_leaf_node
+
+LOGGER: logging.Logger = logging.getLogger(__name__)
+
+SERVER_NAME = "SdpSubarrayLeafNodeDS"
+DEVICE_CLASS = "SdpSubarrayLeafNode"
+
+# Indexes of the load counters shared by a shard process
+EVENTS, COMMANDS, CPU_TIME = range(3)
+
+
+def get_shard(device_name: str, shard_count: int) -> int:
+    """
+    Returns the shard of a device, the shard with the highest hash of the
+    shard index and the device name.
+
+    :param device_name: name of the device
+    :param shard_count: number of shards
+    :return: the shard index
+    """
+    device_name = device_name.lower()
+    return max(
+        range(shard_count),
+        key=lambda shard: zlib.crc32(f"{shard}:{device_name}".encode()),
+    )
+
+
+def get_shard_devices(
+    device_names: List[str], shard_count: int
+) -> List[List[str]]:
+    """
+    Returns the devices of every shard.
+
+    :param device_names: names of the devices
+    :param shard_count: number of shards
+    :return: the sorted device names per shard index
+    """
+    shard_devices: List[List[str]] = [[] for _ in range(shard_count)]
+    for device_name in sorted(device_names):
+        shard_devices[get_shard(device_name, shard_count)].append(device_name)
+    return shard_devices
+
+
+def report_shard_load(load: Any, report_period: float) -> None:
+    """
+    Writes periodically to the shared load counters the number of events
+    received and commands submitted by the devices of the process, and the
+    CPU time of the process.
+
+    :param load: shared array of the EVENTS, COMMANDS and CPU_TIME counters
+    :param report_period: period in seconds of the update
+    """
+    while True:
+        events = commands = 0
+        try:
+            devices = tango.Util.instance().get_device_list_by_class(
+                DEVICE_CLASS
+            )
+        except tango.DevFailed:
+            # The device server is not started yet
+            devices = []
+        for device in devices:
+            component_manager = getattr(device, "component_manager", None)
+            if component_manager is None:
+                continue
+            event_receiver = component_manager.event_receiver
+            if event_receiver is not None:
+                events += event_receiver.event_count
+            executor_metrics = component_manager.executor_metrics.get_metrics()
+            commands += sum(
+                command["submitted"]
+                for command in executor_metrics["commands"].values()
+            )
+        load[EVENTS] = events
+        load[COMMANDS] = commands
+        load[CPU_TIME] = time.process_time()
+        time.sleep(report_period)
+
+
+def run_shard(server_instance: str, load: Any, report_period: float) -> None:
+    """
+    Runs the device server of a shard.
+
+    :param server_instance: instance name of the SdpSubarrayLeafNodeDS
+    :param load: shared load counters of the shard
+    :param report_period: period in seconds of the load counters update
+    """
+    threading.Thread(
+        target=report_shard_load,
+        args=(load, report_period),
+        name="shard_load_report",
+        daemon=True,
+    ).start()
+    sdp_subarray_leaf_node.main(args=[SERVER_NAME, server_instance])
+
+
+class Shard:
+    """A shard of devices, its process and its load counters."""
+
+    def __init__(
+        self,
+        index: int,
+        server_instance: str,
+        device_names: List[str],
+        context: Any,
+    ) -> None:
+        self.index = index
+        self.server_instance = server_instance
+        self.device_names = device_names
+        self.load = context.Array("d", 3)
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self.start_time: float = 0.0
+        self.restarts: int = 0
+        self.consecutive_failures: int = 0
+        self.next_start_time: float = 0.0
+        # Load counters and time of the previous load report
+        self.previous_load: List[float] = [0.0, 0.0, 0.0]
+        self.previous_time: float = time.monotonic()
+
+
+class ShardSupervisor:
+    """
+    The ShardSupervisor starts a device server process per shard, restarts
+    the shards whose process exited and reports the load of every shard.
+
+    A shard which exits is restarted after restart_delay, doubled at every
+    consecutive failure up to max_restart_delay. The failures stop being
+    consecutive once the shard has run for stable_period.
+    """
+
+    def __init__(
+        self,
+        server_instance: str,
+        device_names: List[str],
+        shard_count: Optional[int],
+        load_file: str = "",
+        report_period: float = 10.0,
+        monitor_period: float = 1.0,
+        restart_delay: float = 1.0,
+        max_restart_delay: float = 60.0,
+        stable_period: float = 60.0,
+        logger: logging.Logger = LOGGER,
+        shard_target: Callable = run_shard,
+    ) -> None:
+        """
+        Initialise a new ShardSupervisor instance.
+
+        :param server_instance: instance name of the supervisor, the shard
+            server instances are suffixed with the shard index
+        :param device_names: names of the SdpSubarrayLeafNode devices
+        :param shard_count: number of shards, at most the number of devices,
+            one if None. The shards without device are not started
+        :param load_file: path of the file where the load per shard is
+            written in JSON, not written if empty
+        :param report_period: period in seconds of the load report
+        :param monitor_period: period in seconds of the shard process check
+        :param restart_delay: delay in seconds before the first restart of
+            a shard
+        :param max_restart_delay: maximum delay in seconds before the
+            restart of a shard
+        :param stable_period: running time in seconds after which a shard
+            is no longer considered failing
+        :param logger: a logger for the supervisor
+        :param shard_target: function run by the shard processes, with the
+            server instance, load counters and report period
+        """
+        self._logger = logger
+        self._load_file = load_file
+        self._report_period = report_period
+        self._monitor_period = monitor_period
+        self._restart_delay = restart_delay
+        self._max_restart_delay = max_restart_delay
+        self._stable_period = stable_period
+        self._shard_target = shard_target
+        self._context = multiprocessing.get_context("spawn")
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._load: Dict[str, Any] = {"shards": []}
+        shard_count = max(1, min(shard_count or 1, len(device_names)))
+        self.shards = [
+            Shard(index, f"{server_instance}_{index}", devices, self._context)
+            for index, devices in enumerate(
+                get_shard_devices(device_names, shard_count)
+            )
+            # The rendezvous hashing may leave a shard without device
+            if devices
+        ]
+        if len(self.shards) < shard_count:
+            self._logger.info(
+                "%s of the %s shards have no device and are not started",
+                shard_count - len(self.shards),
+                shard_count,
+            )
+
+    def register_devices(self) -> None:
+        """
+        Registers every device in the Tango database under the device
+        server instance of its shard.
+        """
+        database = tango.Database()
+        for shard in self.shards:
+            server = f"{SERVER_NAME}/{shard.server_instance}"
+            for device_name in shard.device_names:
+                device_info = tango.DbDevInfo()
+                device_info.name = device_name
+                device_info._class = DEVICE_CLASS
+                device_info.server = server
+                database.add_device(device_info)
+            self._logger.info(
+                "Registered the devices %s in %s", shard.device_names, server
+            )
+
+    def run(self) -> None:
+        """Runs the shards until stopped."""
+        next_report_time = time.monotonic() + self._report_period
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            for shard in self.shards:
+                self._check_shard(shard, now)
+            if now >= next_report_time:
+                self.report_load()
+                next_report_time = now + self._report_period
+            self._stop_event.wait(self._monitor_period)
+        self._stop_shards()
+
+    def stop(self) -> None:
+        """Stops the supervisor and its shards."""
+        self._stop_event.set()
+
+    def get_load(self) -> Dict[str, Any]:
+        """
+        Returns the last load report.
+
+        :return: dictionary with, per shard, its server instance, devices,
+            process id, number of restarts, and events, commands and CPU
+            time per second
+        """
+        with self._lock:
+            return self._load
+
+    def report_load(self) -> None:
+        """Computes the load of every shard since the previous report."""
+        now = time.monotonic()
+        shards = []
+        for shard in self.shards:
+            load = list(shard.load)
+            elapsed = max(now - shard.previous_time, 1e-9)
+            # The counters restart from zero with the shard process
+            rates = [
+                (value - previous if value >= previous else value) / elapsed
+                for value, previous in zip(load, shard.previous_load)
+            ]
+            shard.previous_load = load
+            shard.previous_time = now
+            shards.append(
+                {
+                    "shard": shard.index,
+                    "server_instance": shard.server_instance,
+                    "devices": shard.device_names,
+                    "pid": shard.process.pid if shard.process else None,
+                    "alive": bool(shard.process and shard.process.is_alive()),
+                    "restarts": shard.restarts,
+                    "events_per_second": rates[EVENTS],
+                    "commands_per_second": rates[COMMANDS],
+                    "cpu": rates[CPU_TIME],
+                }
+            )
+        with self._lock:
+            self._load = {"time": time.time(), "shards": shards}
+        self._logger.info("Shard load: %s", json.dumps(shards))
+        if self._load_file:
+            try:
+                self._export_load()
+            except OSError as exception:
+                self._logger.error(
+                    "Unable to write the shard load to %s: %s",
+                    self._load_file,
+                    exception,
+                )
+
+    def _export_load(self) -> None:
+        """Writes the load file atomically."""
+        temporary_file = f"{self._load_file}.tmp"
+        with open(temporary_file, "w", encoding="utf-8") as load_file:
+            json.dump(self.get_load(), load_file)
+        os.replace(temporary_file, self._load_file)
+
+    def _check_shard(self, shard: Shard, now: float) -> None:
+        """Starts a shard which is not running, once its delay elapsed."""
+        if shard.process is not None:
+            if shard.process.is_alive():
+                if now - shard.start_time >= self._stable_period:
+                    shard.consecutive_failures = 0
+                return
+            shard.consecutive_failures += 1
+            delay = min(
+                self._restart_delay * 2 ** (shard.consecutive_failures - 1),
+                self._max_restart_delay,
+            )
+            self._logger.error(
+                "Shard %s exited with code %s, restarting in %s seconds",
+                shard.server_instance,
+                shard.process.exitcode,
+                delay,
+            )
+            shard.process = None
+            shard.restarts += 1
+            shard.next_start_time = now + delay
+        if now >= shard.next_start_time:
+            self._start_shard(shard, now)
+
+    def _start_shard(self, shard: Shard, now: float) -> None:
+        """Starts the process of a shard."""
+        shard.process = self._context.Process(
+            target=self._shard_target,
+            args=(shard.server_instance, shard.load, self._report_period),
+            name=f"shard_{shard.index}",
+            daemon=False,
+        )
+        shard.process.start()
+        shard.start_time = now
+        self._logger.info(
+            "Started shard %s with the devices %s, pid %s",
+            shard.server_instance,
+            shard.device_names,
+            shard.process.pid,
+        )
+
+    def _stop_shards(self) -> None:
+        """Terminates the shard processes."""
+        for shard in self.shards:
+            if shard.process is not None and shard.process.is_alive():
+                shard.process.terminate()
+        for shard in self.shards:
+            if shard.process is not None:
+                shard.process.join(10)
+                if shard.process.is_alive():
+                    shard.process.kill()
+                    shard.process.join()
+
+
+def main(args=None) -> int:
+    """
+    Runs the supervisor of the SdpSubarrayLeafNode device server shards.
+
+    :param args: command line arguments, sys.argv if None
+    :return: exit code
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("instance", help="instance name of the supervisor")
+    parser.add_argument("--shards", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--devices",
+        required=True,
+        help="comma separated names of the SdpSubarrayLeafNode devices",
+    )
+    parser.add_argument(
+        "--register",
+        action="store_true",
+        help="register the devices under the server instances of the shards",
+    )
+    parser.add_argument("--load-file", default="")
+    parser.add_argument("--report-period", type=float, default=10.0)
+    arguments = parser.parse_args(args)
+
+    supervisor = ShardSupervisor(
+        arguments.instance,
+        [name for name in arguments.devices.split(",") if name],
+        arguments.shards,
+        load_file=arguments.load_file,
+        report_period=arguments.report_period,
+    )
+    if arguments.register:
+        supervisor.register_devices()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signal_number, lambda *_: supervisor.stop())
+    supervisor.run()
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""
+Soak test of the SDP Subarray Leaf Node.
+
+SdpSubarrayLeafNode is started in this process, in a MultiDeviceTestContext
+together with the helper SDP Subarray used by the integration tests, and
+runs thousands of AssignResources, Configure, Scan, EndScan, End and
+ReleaseAllResources cycles. Regularly a cycle is replaced by an injected
+timeout, recovered with Abort and Restart, or by a failed command, using the
+defect configuration of the helper device (TIMEOUT_DEFECT and
+FAILED_RESULT_DEFECT).
+
+Every few cycles the RSS, the number of threads, the memory traced by
+tracemalloc, the leaf node thread counts and the command latencies are
+sampled. At the end the growth of every metric per 1000 cycles is estimated
+with a least squares fit over the samples after the warm up, and the soak
+fails if any growth exceeds its limit.
+
+Usage::
+
+    python -m tests.benchmark.soak_harness [--cycles 2000]
+"""
+import argparse
+import gc
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ska_tango_base.commands import ResultCode
+from ska_tango_base.control_model import ObsState
+from ska_tmc_common.dev_factory import DevFactory
+from ska_tmc_common.test_helpers.helper_sdp_subarray import HelperSdpSubarray
+from tango.test_context import MultiDeviceTestContext
+
+from ska_tmc_sdpsubarrayleafnode.sdp_subarray_leaf_node import (
+    SdpSubarrayLeafNode,
+)
+from tests.benchmark.startup_benchmark import read_process_status
+from tests.settings import FAILED_RESULT_DEFECT, RESET_DEFECT, TIMEOUT_DEFECT
+
+DATA_PATH = Path(__file__).parent.parent / "data"
+
+SDP_SUBARRAY = "mid-sdp/subarray/01"
+SDP_SUBARRAY_LEAF_NODE = "mid-tmc/subarray-leaf-node-sdp/01"
+
+OBSERVATION_COMMANDS = (
+    "AssignResources",
+    "Configure",
+    "Scan",
+    "EndScan",
+    "End",
+    "ReleaseAllResources",
+)
+
+# Maximum growth of a metric per 1000 cycles; the latency limit is relative
+# to the median latency of the run
+GROWTH_LIMITS = {
+    "rss_mb": 5.0,
+    "threads": 1.0,
+    "traced_mb": 2.0,
+    "latency": 0.25,
+}
+
+
+def load_command_input(command_name: str) -> str:
+    """Returns the JSON input of a command from the test data."""
+    with open(
+        DATA_PATH / f"command_{command_name}.json", encoding="utf-8"
+    ) as input_file:
+        return json.dumps(json.load(input_file))
+
+
+def get_slope(points: List[Tuple[float, float]]) -> float:
+    """Returns the least squares slope of the (x, y) points."""
+    if len(points) < 2:
+        return 0.0
+    mean_x = statistics.fmean(x for x, _ in points)
+    mean_y = statistics.fmean(y for _, y in points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if not variance:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+def find_growth_trends(
+    samples: List[Dict[str, Any]], warmup_fraction: float = 0.2
+) -> Tuple[Dict[str, float], List[str]]:
+    """
+    Estimates the growth of every metric per 1000 cycles and compares it
+    with the limits.
+
+    :param samples: samples with the cycle number and the metrics
+    :param warmup_fraction: fraction of the samples ignored at the start
+    :return: the growth per metric and the description of every growth
+        which exceeds its limit
+    """
+    samples = samples[int(len(samples) * warmup_fraction) :]
+    growths = {}
+    failures = []
+    for metric, limit in GROWTH_LIMITS.items():
+        points = [
+            (sample["cycle"], sample[metric])
+            for sample in samples
+            if sample.get(metric) is not None
+        ]
+        growths[metric] = get_slope(points) * 1000
+        if metric == "latency" and points:
+            limit *= statistics.median(y for _, y in points)
+        if growths[metric] > limit:
+            failures.append(
+                f"{metric} grows by {growths[metric]:.3f} per 1000 cycles "
+                + f"(limit {limit:.3f})"
+            )
+    return growths, failures
+
+
+class SoakRunner:
+    """Runs the command cycles on the leaf node and measures the command
+    latencies."""
+
+    def __init__(
+        self, leaf_node, sdp_subarray, command_timeout: float
+    ) -> None:
+        self.leaf_node = leaf_node
+        self.sdp_subarray = sdp_subarray
+        self.command_timeout = command_timeout
+        self.latencies: List[float] = []
+        self.command_inputs = {
+            command_name: load_command_input(command_name)
+            for command_name in ("AssignResources", "Configure", "Scan")
+        }
+
+    def wait_for_obs_state(self, obs_state, timeout: float = 10.0) -> None:
+        """Waits for the obsState of the SDP Subarray seen by the leaf
+        node."""
+        start_time = time.time()
+        while self.leaf_node.sdpSubarrayObsState != obs_state:
+            if time.time() - start_time > timeout:
+                raise TimeoutError(
+                    f"obsState {self.leaf_node.sdpSubarrayObsState} is not "
+                    + f"{obs_state} after {timeout} s"
+                )
+            time.sleep(0.01)
+
+    def run_command(self, command_name: str) -> List[Any]:
+        """
+        Invokes a command of the leaf node and waits for its result.
+
+        :param command_name: name of the command
+        :return: the result code and message of the command
+        """
+        command: Callable = getattr(self.leaf_node, command_name)
+        start_time = time.time()
+        if command_name in self.command_inputs:
+            _, unique_id = command(self.command_inputs[command_name])
+        else:
+            _, unique_id = command()
+        timeout = self.command_timeout + 10
+        while True:
+            command_id, result = self.leaf_node.longRunningCommandResult
+            if command_id == unique_id[0]:
+                self.latencies.append(time.time() - start_time)
+                return json.loads(result)
+            if time.time() - start_time > timeout:
+                raise TimeoutError(f"No result of {command_name}")
+            time.sleep(0.005)
+
+    def observation_cycle(self) -> None:
+        """Runs a complete observation."""
+        for command_name in OBSERVATION_COMMANDS:
+            result_code, message = self.run_command(command_name)
+            if result_code != ResultCode.OK:
+                raise RuntimeError(f"{command_name} failed: {message}")
+
+    def timeout_cycle(self) -> None:
+        """AssignResources times out in RESOURCING, the subarray is
+        recovered with Abort and Restart."""
+        self.sdp_subarray.SetDefective(TIMEOUT_DEFECT)
+        try:
+            result_code, _ = self.run_command("AssignResources")
+        finally:
+            self.sdp_subarray.SetDefective(RESET_DEFECT)
+        if result_code != ResultCode.FAILED:
+            raise RuntimeError("AssignResources did not time out")
+        self.leaf_node.Abort()
+        self.wait_for_obs_state(ObsState.ABORTED)
+        self.run_command("Restart")
+        self.wait_for_obs_state(ObsState.EMPTY)
+
+    def failed_result_cycle(self) -> None:
+        """AssignResources fails on the SDP Subarray."""
+        self.sdp_subarray.SetDefective(FAILED_RESULT_DEFECT)
+        try:
+            result_code, _ = self.run_command("AssignResources")
+        finally:
+            self.sdp_subarray.SetDefective(RESET_DEFECT)
+        if result_code != ResultCode.FAILED:
+            raise RuntimeError("AssignResources did not fail")
+        self.recover()
+
+    def recover(self) -> None:
+        """Brings the SDP Subarray back to EMPTY."""
+        obs_state = self.leaf_node.sdpSubarrayObsState
+        if obs_state == ObsState.EMPTY:
+            return
+        if obs_state not in (ObsState.ABORTED, ObsState.FAULT):
+            self.leaf_node.Abort()
+            self.wait_for_obs_state(ObsState.ABORTED)
+        self.run_command("Restart")
+        self.wait_for_obs_state(ObsState.EMPTY)
+
+
+def take_sample(
+    cycle: int, runner: SoakRunner, top_allocations: int
+) -> Dict[str, Any]:
+    """Samples the process and leaf node metrics."""
+    gc.collect()
+    traced_memory, _ = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    latency = statistics.median(runner.latencies) if runner.latencies else None
+    runner.latencies.clear()
+    return {
+        "cycle": cycle,
+        "time": time.time(),
+        **read_process_status(),
+        "traced_mb": traced_memory / 1024**2,
+        "latency": latency,
+        "thread_counts": json.loads(runner.leaf_node.resourceInventory)[
+            "thread_counts"
+        ],
+        "top_allocations": [
+            str(statistic)
+            for statistic in snapshot.statistics("lineno")[:top_allocations]
+        ],
+    }
+
+
+def run_soak(
+    cycles: int = 2000,
+    sample_every: int = 50,
+    timeout_every: int = 25,
+    failed_result_every: int = 10,
+    command_timeout: float = 5.0,
+    top_allocations: int = 10,
+    output: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Runs the soak test.
+
+    :param cycles: number of cycles
+    :param sample_every: number of cycles between two samples
+    :param timeout_every: every timeout_every cycle injects a timeout
+    :param failed_result_every: every failed_result_every cycle injects a
+        failed result
+    :param command_timeout: CommandTimeOut of the leaf node in seconds
+    :param top_allocations: number of top allocations per sample
+    :param output: called with every sample
+    :return: the samples, the growth per 1000 cycles and the failures
+    """
+    devices_info = (
+        {"class": HelperSdpSubarray, "devices": [{"name": SDP_SUBARRAY}]},
+        {
+            "class": SdpSubarrayLeafNode,
+            "devices": [
+                {
+                    "name": SDP_SUBARRAY_LEAF_NODE,
+                    "properties": {
+                        "SdpSubarrayFQDN": SDP_SUBARRAY,
+                        "CommandTimeOut": command_timeout,
+                    },
+                }
+            ],
+        },
+    )
+    tracemalloc.start(10)
+    samples = []
+    with MultiDeviceTestContext(devices_info, process=False) as context:
+        DevFactory._test_context = context
+        runner = SoakRunner(
+            context.get_device(SDP_SUBARRAY_LEAF_NODE),
+            context.get_device(SDP_SUBARRAY),
+            command_timeout,
+        )
+        runner.run_command("On")
+        for cycle in range(1, cycles + 1):
+            if cycle % timeout_every == 0:
+                runner.timeout_cycle()
+            elif cycle % failed_result_every == 0:
+                runner.failed_result_cycle()
+            else:
+                runner.observation_cycle()
+            if cycle % sample_every == 0:
+                samples.append(take_sample(cycle, runner, top_allocations))
+                if output is not None:
+                    output(samples[-1])
+    tracemalloc.stop()
+    growths, failures = find_growth_trends(samples)
+    return {"samples": samples, "growths": growths, "failures": failures}
+
+
+def main() -> int:
+    """Runs the soak test and reports the growth trends."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cycles", type=int, default=2000)
+    parser.add_argument("--sample-every", type=int, default=50)
+    parser.add_argument("--timeout-every", type=int, default=25)
+    parser.add_argument("--failed-result-every", type=int, default=10)
+    parser.add_argument("--command-timeout", type=float, default=5.0)
+    parser.add_argument("--report", help="file to write the full report to")
+    args = parser.parse_args()
+
+    report = run_soak(
+        cycles=args.cycles,
+        sample_every=args.sample_every,
+        timeout_every=args.timeout_every,
+        failed_result_every=args.failed_result_every,
+        command_timeout=args.command_timeout,
+        output=lambda sample: print(
+            json.dumps(
+                {
+                    key: value
+                    for key, value in sample.items()
+                    if key != "top_allocations"
+                }
+            ),
+            flush=True,
+        ),
+    )
+    if args.report:
+        Path(args.report).write_text(
+            json.dumps(report, indent=4) + "\n", encoding="utf-8"
+        )
+    print(
+        json.dumps(
+            {"growths": report["growths"], "failures": report["failures"]}
+        )
+    )
+    return 1 if report["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
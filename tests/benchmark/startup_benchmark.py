@@ -0,0 +1,279 @@
+"""
+Startup and memory benchmark of the SDP leaf node device classes.
+
+Every device class is started repeatedly, each time in a fresh Python
+process, in a MultiDeviceTestContext together with the helper device it
+monitors. For every run the import time, the init_device time, the time to
+the first event from the monitored device, the steady state RSS and the
+number of threads of the process are measured. The median of the runs is
+compared with the baseline stored in startup_baseline.json.
+
+Usage::
+
+    python -m tests.benchmark.startup_benchmark [--repeats 5]
+    python -m tests.benchmark.startup_benchmark --update-baseline
+"""
+import argparse
+import importlib
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BASELINE_PATH = Path(__file__).parent / "startup_baseline.json"
+
+BENCHMARK_TARGETS: Dict[str, Dict[str, Any]] = {
+    "SdpSubarrayLeafNode-mid": {
+        "module": "ska_tmc_sdpsubarrayleafnode.sdp_subarray_leaf_node",
+        "class": "SdpSubarrayLeafNode",
+        "device": "mid-tmc/subarray-leaf-node-sdp/01",
+        "properties": {"SdpSubarrayFQDN": "mid-sdp/subarray/01"},
+        "helper_module": "ska_tmc_common.test_helpers.helper_sdp_subarray",
+        "helper_class": "HelperSdpSubarray",
+        "helper_device": "mid-sdp/subarray/01",
+        "first_event_attribute": "obsState",
+    },
+    "SdpSubarrayLeafNode-low": {
+        "module": "ska_tmc_sdpsubarrayleafnode.sdp_subarray_leaf_node",
+        "class": "SdpSubarrayLeafNode",
+        "device": "low-tmc/subarray-leaf-node-sdp/01",
+        "properties": {"SdpSubarrayFQDN": "low-sdp/subarray/01"},
+        "helper_module": "ska_tmc_common.test_helpers.helper_sdp_subarray",
+        "helper_class": "HelperSdpSubarray",
+        "helper_device": "low-sdp/subarray/01",
+        "first_event_attribute": "obsState",
+    },
+    "MidTmcLeafNodeSdp": {
+        "module": "ska_tmc_sdpmasterleafnode.sdp_master_leaf_node_mid",
+        "class": "MidTmcLeafNodeSdp",
+        "device": "mid-tmc/leaf-node-sdp/0",
+        "properties": {"SdpMasterFQDN": "mid-sdp/control/0"},
+        "helper_module": "ska_tmc_common.test_helpers.helper_base_device",
+        "helper_class": "HelperBaseDevice",
+        "helper_device": "mid-sdp/control/0",
+        "first_event_attribute": None,
+    },
+    "LowTmcLeafNodeSdp": {
+        "module": "ska_tmc_sdpmasterleafnode.sdp_master_leaf_node_low",
+        "class": "LowTmcLeafNodeSdp",
+        "device": "low-tmc/leaf-node-sdp/0",
+        "properties": {"SdpMasterFQDN": "low-sdp/control/0"},
+        "helper_module": "ska_tmc_common.test_helpers.helper_base_device",
+        "helper_class": "HelperBaseDevice",
+        "helper_device": "low-sdp/control/0",
+        "first_event_attribute": None,
+    },
+}
+
+METRICS = ("import_time", "init_time", "first_event_time", "rss_mb", "threads")
+
+# A metric regresses when it exceeds baseline * (1 + tolerance) + slack
+ABSOLUTE_SLACK = {
+    "import_time": 0.5,
+    "init_time": 0.5,
+    "first_event_time": 1.0,
+    "rss_mb": 10.0,
+    "threads": 4,
+}
+
+
+def read_process_status() -> Dict[str, float]:
+    """Returns the RSS in MB and the number of threads of this process."""
+    status = {}
+    with open("/proc/self/status", encoding="utf-8") as status_file:
+        for line in status_file:
+            key, _, value = line.partition(":")
+            status[key] = value.split()
+    return {
+        "rss_mb": int(status["VmRSS"][0]) / 1024,
+        "threads": int(status["Threads"][0]),
+    }
+
+
+def get_first_event_time(
+    proxy, target: Dict[str, Any], timeout: float
+) -> Optional[float]:
+    """Waits for the first event from the monitored device and returns the
+    time to it, measured by the event receiver of the device under test."""
+    start_time = time.time()
+    while time.time() - start_time < timeout:
+        attribute = target["first_event_attribute"]
+        if attribute is None:
+            first_event_time = json.loads(proxy.startupTiming)["first_event"]
+        else:
+            first_event_time = json.loads(proxy.eventSubscriptionStatistics)[
+                attribute
+            ]["time_to_first_event"]
+        if first_event_time is not None:
+            return first_event_time
+        time.sleep(0.1)
+    return None
+
+
+def measure_startup(
+    target_name: str, settle_time: float = 2.0, timeout: float = 30.0
+) -> Dict[str, Optional[float]]:
+    """
+    Starts the device class of the target once in this process and measures
+    its startup. It must be called in a fresh process, so that the import
+    time includes all the dependencies.
+
+    :param target_name: name of the benchmark target
+    :param settle_time: time in seconds to wait for the steady state
+    :param timeout: time in seconds to wait for the first event
+    :return: dictionary with the measured metrics
+    """
+    target = BENCHMARK_TARGETS[target_name]
+    import_start_time = time.perf_counter()
+    module = importlib.import_module(target["module"])
+    import_time = time.perf_counter() - import_start_time
+
+    # pylint: disable=import-outside-toplevel
+    from ska_tmc_common.dev_factory import DevFactory
+    from tango.test_context import MultiDeviceTestContext
+
+    helper_class = getattr(
+        importlib.import_module(target["helper_module"]),
+        target["helper_class"],
+    )
+    devices_info = (
+        {
+            "class": helper_class,
+            "devices": [{"name": target["helper_device"]}],
+        },
+        {
+            "class": getattr(module, target["class"]),
+            "devices": [
+                {
+                    "name": target["device"],
+                    "properties": target["properties"],
+                }
+            ],
+        },
+    )
+    with MultiDeviceTestContext(devices_info, process=False) as context:
+        DevFactory._test_context = context
+        proxy = context.get_device(target["device"])
+        first_event_time = get_first_event_time(proxy, target, timeout)
+        time.sleep(settle_time)
+        startup_timing = json.loads(proxy.startupTiming)
+        process_status = read_process_status()
+    return {
+        "import_time": import_time,
+        "init_time": startup_timing["init"],
+        "first_event_time": first_event_time,
+        **process_status,
+    }
+
+
+def run_benchmark(target_name: str, repeats: int = 5) -> Dict[str, Any]:
+    """
+    Measures the startup of the target in repeats fresh processes.
+
+    :param target_name: name of the benchmark target
+    :param repeats: number of runs
+    :return: median of every metric over the runs
+    """
+    runs: List[Dict[str, Optional[float]]] = []
+    for _ in range(repeats):
+        completed_process = subprocess.run(
+            [sys.executable, "-m", __spec__.name, "--worker", target_name],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        runs.append(json.loads(completed_process.stdout.splitlines()[-1]))
+    result = {}
+    for metric in METRICS:
+        values = [run[metric] for run in runs if run[metric] is not None]
+        result[metric] = statistics.median(values) if values else None
+    return result
+
+
+def load_baseline() -> Dict[str, Dict[str, float]]:
+    """Returns the stored baseline, empty if none has been recorded."""
+    if not BASELINE_PATH.exists():
+        return {}
+    return json.loads(BASELINE_PATH.read_text(encoding="utf-8"))
+
+
+def compare_with_baseline(
+    result: Dict[str, Optional[float]],
+    baseline: Dict[str, float],
+    tolerance: float = 0.2,
+) -> List[str]:
+    """
+    Compares the benchmark result with the baseline of a target.
+
+    :param result: median metrics of the target
+    :param baseline: baseline metrics of the target
+    :param tolerance: allowed relative increase
+    :return: the description of every regressed metric
+    """
+    regressions = []
+    for metric in METRICS:
+        if baseline.get(metric) is None:
+            continue
+        if result[metric] is None:
+            regressions.append(f"{metric}: not measured")
+            continue
+        limit = baseline[metric] * (1 + tolerance) + ABSOLUTE_SLACK[metric]
+        if result[metric] > limit:
+            regressions.append(
+                f"{metric}: {result[metric]:.2f} exceeds {limit:.2f} "
+                f"(baseline {baseline[metric]:.2f})"
+            )
+    return regressions
+
+
+def main() -> int:
+    """Runs the benchmark of all the targets."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument(
+        "--targets", nargs="*", default=list(BENCHMARK_TARGETS)
+    )
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure_startup(args.worker)))
+        return 0
+
+    baseline = load_baseline()
+    results = {}
+    failed = False
+    for target_name in args.targets:
+        results[target_name] = run_benchmark(target_name, args.repeats)
+        regressions = compare_with_baseline(
+            results[target_name],
+            baseline.get(target_name, {}),
+            args.tolerance,
+        )
+        failed = failed or bool(regressions)
+        print(
+            json.dumps(
+                {
+                    "target": target_name,
+                    "result": results[target_name],
+                    "baseline": baseline.get(target_name),
+                    "regressions": regressions,
+                }
+            )
+        )
+    if args.update_baseline:
+        baseline.update(results)
+        BASELINE_PATH.write_text(
+            json.dumps(baseline, indent=4) + "\n", encoding="utf-8"
+        )
+        return 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
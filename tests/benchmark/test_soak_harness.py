@@ -0,0 +1,29 @@
+import pytest
+
+from tests.benchmark.soak_harness import find_growth_trends, run_soak
+
+
+@pytest.mark.soak
+def test_soak_without_growth():
+    report = run_soak(cycles=500, sample_every=25)
+    assert not report["failures"], report["growths"]
+
+
+def test_find_growth_trends_reports_leaks():
+    samples = [
+        {
+            "cycle": cycle,
+            "rss_mb": 200.0 + cycle * 0.01,
+            "threads": 20 + (cycle >= 1000),
+            "traced_mb": 30.0,
+            "latency": 0.1,
+        }
+        for cycle in range(100, 2100, 100)
+    ]
+    growths, failures = find_growth_trends(samples)
+    assert growths["rss_mb"] == pytest.approx(10.0)
+    assert growths["traced_mb"] == pytest.approx(0.0)
+    assert [failure.split()[0] for failure in failures] == [
+        "rss_mb",
+        "threads",
+    ]
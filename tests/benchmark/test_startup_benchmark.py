@@ -0,0 +1,35 @@
+import pytest
+
+from tests.benchmark.startup_benchmark import (
+    BENCHMARK_TARGETS,
+    compare_with_baseline,
+    load_baseline,
+    run_benchmark,
+)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("target_name", list(BENCHMARK_TARGETS))
+def test_startup_against_baseline(target_name):
+    baseline = load_baseline().get(target_name)
+    if baseline is None:
+        pytest.skip(
+            f"No startup baseline recorded for {target_name}, run "
+            + "make python-startup-benchmark BENCHMARK_ARGS=--update-baseline"
+        )
+    result = run_benchmark(target_name, repeats=3)
+    assert not compare_with_baseline(result, baseline)
+
+
+def test_compare_with_baseline_reports_regressions():
+    baseline = {"import_time": 2.0, "rss_mb": 100.0, "threads": 20}
+    result = {
+        "import_time": 2.5,
+        "init_time": 1.0,
+        "first_event_time": None,
+        "rss_mb": 150.0,
+        "threads": 21,
+    }
+    regressions = compare_with_baseline(result, baseline)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("rss_mb")
@@ -0,0 +1,25 @@
+import subprocess
+import sys
+
+import pytest
+
+from tests.settings import SDP_MASTER_DEVICE_MID, create_cm
+
+
+@pytest.mark.sdpmln
+def test_device_import_does_not_load_command_modules():
+    script = (
+        "import sys\n"
+        "import ska_tmc_sdpmasterleafnode.sdp_master_leaf_node\n"
+        "prefix = 'ska_tmc_sdpmasterleafnode.commands.'\n"
+        "loaded = [name for name in sys.modules if name.startswith(prefix)]\n"
+        "assert not loaded, loaded\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True)
+
+
+@pytest.mark.sdpmln
+def test_command_objects_are_created_on_first_use():
+    cm = create_cm("SdpMLNComponentManager", SDP_MASTER_DEVICE_MID)
+    standby_command = cm.get_command_object("Standby")
+    assert cm.get_command_object("Standby") is standby_command
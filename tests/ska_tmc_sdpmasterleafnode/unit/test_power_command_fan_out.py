@@ -0,0 +1,127 @@
+import json
+
+import mock
+import pytest
+from ska_tango_base.commands import ResultCode
+from ska_tmc_common.adapters import AdapterType
+from ska_tmc_common.test_helpers.helper_adapter_factory import (
+    HelperAdapterFactory,
+)
+
+from ska_tmc_sdpmasterleafnode.commands import On, Standby
+from tests.settings import (
+    SDP_MASTER_DEVICE_MID,
+    SDP_SUBARRAY_DEVICE_MID,
+    create_cm,
+    logger,
+)
+
+SDP_SUBARRAY_DEVICE_MID_2 = "mid-sdp/subarray/02"
+
+
+def create_on_command(cm, failing_device=None, command_class=On):
+    adapter_factory = HelperAdapterFactory()
+    proxies = {}
+    for dev_name in [SDP_MASTER_DEVICE_MID] + cm.sdp_subarray_dev_names:
+        proxy = mock.Mock()
+        if dev_name == failing_device:
+            proxy.On.side_effect = Exception("On failed")
+            proxy.command_inout.side_effect = Exception("On failed")
+        adapter_factory.get_or_create_adapter(
+            dev_name, AdapterType.BASE, proxy=proxy
+        )
+        proxies[dev_name] = proxy
+    on_command = command_class(cm, logger)
+    on_command.adapter_factory = adapter_factory
+    return on_command, proxies
+
+
+@pytest.mark.sdpmln
+def test_on_command_without_fan_out():
+    cm = create_cm("SdpMLNComponentManager", SDP_MASTER_DEVICE_MID)
+    on_command, proxies = create_on_command(cm)
+
+    result_code, message = on_command.do_with_fan_out("On")
+
+    assert result_code == ResultCode.OK
+    assert message == "Command Completed"
+    proxies[SDP_MASTER_DEVICE_MID].On.assert_called_once()
+
+
+@pytest.mark.sdpmln
+def test_on_command_fan_out_to_sdp_subarrays():
+    cm = create_cm("SdpMLNComponentManager", SDP_MASTER_DEVICE_MID)
+    cm.sdp_subarray_dev_names = [
+        SDP_SUBARRAY_DEVICE_MID,
+        SDP_SUBARRAY_DEVICE_MID_2,
+    ]
+    on_command, proxies = create_on_command(cm)
+
+    result_code, message = on_command.do_with_fan_out("On")
+
+    assert result_code == ResultCode.OK
+    proxies[SDP_MASTER_DEVICE_MID].On.assert_called_once()
+    for dev_name in cm.sdp_subarray_dev_names:
+        proxies[dev_name].command_inout.assert_called_once_with("On")
+    report = json.loads(message)
+    assert report["command"] == "On"
+    assert set(report["targets"]) == set(proxies)
+    assert all(
+        target["result_code"] == ResultCode.OK
+        and target["duration"] <= report["duration"]
+        for target in report["targets"].values()
+    )
+
+
+@pytest.mark.sdpmln
+def test_on_command_fan_out_reports_failed_target():
+    cm = create_cm("SdpMLNComponentManager", SDP_MASTER_DEVICE_MID)
+    cm.sdp_subarray_dev_names = [
+        SDP_SUBARRAY_DEVICE_MID,
+        SDP_SUBARRAY_DEVICE_MID_2,
+    ]
+    on_command, _ = create_on_command(
+        cm, failing_device=SDP_SUBARRAY_DEVICE_MID_2
+    )
+
+    result_code, message = on_command.do_with_fan_out("On")
+
+    assert result_code == ResultCode.FAILED
+    targets = json.loads(message)["targets"]
+    assert targets[SDP_SUBARRAY_DEVICE_MID_2]["result_code"] == (
+        ResultCode.FAILED
+    )
+    assert "On failed" in targets[SDP_SUBARRAY_DEVICE_MID_2]["message"]
+    assert targets[SDP_MASTER_DEVICE_MID]["result_code"] == ResultCode.OK
+
+
+@pytest.mark.sdpmln
+def test_standby_command_fan_out_skips_sdp_subarrays():
+    cm = create_cm("SdpMLNComponentManager", SDP_MASTER_DEVICE_MID)
+    cm.sdp_subarray_dev_names = [
+        SDP_SUBARRAY_DEVICE_MID,
+        SDP_SUBARRAY_DEVICE_MID_2,
+    ]
+    standby_command, proxies = create_on_command(cm, command_class=Standby)
+
+    result_code, message = standby_command.do_with_fan_out("Standby")
+
+    assert result_code == ResultCode.OK
+    proxies[SDP_MASTER_DEVICE_MID].Standby.assert_called_once()
+    for dev_name in cm.sdp_subarray_dev_names:
+        proxies[dev_name].command_inout.assert_not_called()
+    report = json.loads(message)
+    assert set(report["targets"]) == {SDP_MASTER_DEVICE_MID}
+    assert set(report["skipped"]) == set(cm.sdp_subarray_dev_names)
+
+
+@pytest.mark.sdpmln
+def test_fan_out_executor_is_reused():
+    cm = create_cm("SdpMLNComponentManager", SDP_MASTER_DEVICE_MID)
+    cm.sdp_subarray_dev_names = [SDP_SUBARRAY_DEVICE_MID]
+    on_command, _ = create_on_command(cm)
+
+    on_command.do_with_fan_out("On")
+    executor = cm.get_fan_out_executor()
+    on_command.do_with_fan_out("On")
+    assert cm.get_fan_out_executor() is executor
@@ -0,0 +1,14 @@
+import pytest
+
+from tests.settings import SDP_MASTER_DEVICE_MID, create_cm
+
+
+@pytest.mark.sdpmln
+def test_resource_inventory():
+    cm = create_cm("SdpMLNComponentManager", SDP_MASTER_DEVICE_MID)
+    inventory = cm.get_resource_inventory()
+    assert "MainThread" in [thread["name"] for thread in inventory["threads"]]
+    assert sum(inventory["thread_counts"].values()) == len(
+        inventory["threads"]
+    )
+    assert inventory["subscriptions"]["sdp_subarrays"] == 0
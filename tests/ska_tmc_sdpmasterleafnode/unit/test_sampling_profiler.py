@@ -0,0 +1,20 @@
+import time
+
+import pytest
+
+from ska_tmc_sdpmasterleafnode.manager import SamplingProfiler
+from tests.settings import logger
+
+
+@pytest.mark.sdpmln
+def test_sampling_profiler_completes_after_duration(tmp_path):
+    profiler = SamplingProfiler(str(tmp_path), "mln", logger)
+    profiler.start(0.2, 0.01)
+    time.sleep(1)
+    assert not profiler.is_running
+    collapsed_path, pstats_path = profiler.last_output
+    assert collapsed_path.endswith(".collapsed")
+    assert pstats_path.endswith(".pstats")
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        [collapsed_path.rsplit("/", 1)[1], pstats_path.rsplit("/", 1)[1]]
+    )
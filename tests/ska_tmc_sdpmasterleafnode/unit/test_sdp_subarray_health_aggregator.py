@@ -0,0 +1,165 @@
+import threading
+
+import mock
+import pytest
+from ska_control_model import HealthState, ObsState
+from ska_tmc_common.enum import LivelinessProbeType
+
+from ska_tmc_sdpmasterleafnode.manager import (
+    SdpMLNComponentManager,
+    SdpSubarrayHealthAggregator,
+)
+from tests.settings import (
+    SDP_MASTER_DEVICE_MID,
+    SDP_SUBARRAY_DEVICE_MID,
+    logger,
+)
+
+SDP_SUBARRAY_DEVICE_MID_2 = "mid-sdp/subarray/02"
+
+
+@pytest.mark.sdpmln
+def test_aggregate_health_is_worst_subarray_health():
+    update_callback = mock.Mock()
+    aggregator = SdpSubarrayHealthAggregator(
+        [SDP_SUBARRAY_DEVICE_MID, SDP_SUBARRAY_DEVICE_MID_2],
+        logger,
+        update_callback=update_callback,
+    )
+    assert aggregator.aggregate_health_state == HealthState.UNKNOWN
+    assert aggregator.health_state_counts[HealthState.UNKNOWN] == 2
+
+    aggregator.update_health_state(SDP_SUBARRAY_DEVICE_MID, HealthState.OK)
+    assert aggregator.aggregate_health_state == HealthState.UNKNOWN
+
+    aggregator.update_health_state(
+        SDP_SUBARRAY_DEVICE_MID_2, HealthState.DEGRADED
+    )
+    assert aggregator.aggregate_health_state == HealthState.DEGRADED
+    assert aggregator.health_state_counts[HealthState.OK] == 1
+    assert aggregator.health_state_counts[HealthState.DEGRADED] == 1
+    assert aggregator.health_state_counts[HealthState.UNKNOWN] == 0
+
+    aggregator.update_health_state(SDP_SUBARRAY_DEVICE_MID, HealthState.FAILED)
+    assert aggregator.aggregate_health_state == HealthState.FAILED
+
+    aggregator.update_health_state(SDP_SUBARRAY_DEVICE_MID, HealthState.OK)
+    aggregator.update_health_state(SDP_SUBARRAY_DEVICE_MID_2, HealthState.OK)
+    assert aggregator.aggregate_health_state == HealthState.OK
+    assert aggregator.health_state_counts[HealthState.OK] == 2
+    update_callback.assert_called_with(
+        HealthState.OK,
+        aggregator.health_state_counts,
+        aggregator.obs_state_counts,
+    )
+
+
+@pytest.mark.sdpmln
+def test_obs_state_counts_are_updated_incrementally():
+    update_callback = mock.Mock()
+    aggregator = SdpSubarrayHealthAggregator(
+        [SDP_SUBARRAY_DEVICE_MID, SDP_SUBARRAY_DEVICE_MID_2],
+        logger,
+        update_callback=update_callback,
+    )
+    aggregator.update_obs_state(SDP_SUBARRAY_DEVICE_MID, ObsState.EMPTY)
+    aggregator.update_obs_state(SDP_SUBARRAY_DEVICE_MID_2, ObsState.EMPTY)
+    aggregator.update_obs_state(SDP_SUBARRAY_DEVICE_MID, ObsState.IDLE)
+    aggregator.update_obs_state(SDP_SUBARRAY_DEVICE_MID, ObsState.IDLE)
+
+    assert aggregator.obs_state_counts[ObsState.EMPTY] == 1
+    assert aggregator.obs_state_counts[ObsState.IDLE] == 1
+    assert sum(aggregator.obs_state_counts) == 2
+    assert update_callback.call_count == 3
+
+
+@pytest.mark.sdpmln
+def test_error_events_are_ignored():
+    aggregator = SdpSubarrayHealthAggregator([SDP_SUBARRAY_DEVICE_MID], logger)
+    aggregator._handle_event(
+        SDP_SUBARRAY_DEVICE_MID, "healthState", mock.Mock(err=True)
+    )
+    assert aggregator.aggregate_health_state == HealthState.UNKNOWN
+
+    event = mock.Mock(err=False)
+    event.attr_value.value = HealthState.OK
+    aggregator._handle_event(SDP_SUBARRAY_DEVICE_MID, "healthState", event)
+    assert aggregator.aggregate_health_state == HealthState.OK
+
+
+@pytest.mark.sdpmln
+def test_aggregation_does_not_enable_the_fan_out():
+    with mock.patch.object(SdpSubarrayHealthAggregator, "start") as start:
+        cm = SdpMLNComponentManager(
+            sdp_master_device_name=SDP_MASTER_DEVICE_MID,
+            logger=logger,
+            _event_receiver=False,
+            _liveliness_probe=LivelinessProbeType.NONE,
+            sdp_aggregate_health_dev_names=[SDP_SUBARRAY_DEVICE_MID],
+        )
+    start.assert_called_once()
+    assert cm.sdp_subarray_dev_names == []
+    aggregator = cm.sdp_subarray_health_aggregator
+    assert aggregator.health_state_counts[HealthState.UNKNOWN] == 1
+
+
+@pytest.mark.sdpmln
+def test_subscriptions_are_per_subarray_attribute():
+    aggregator = SdpSubarrayHealthAggregator(
+        [SDP_SUBARRAY_DEVICE_MID, SDP_SUBARRAY_DEVICE_MID_2], logger
+    )
+    proxies = {
+        SDP_SUBARRAY_DEVICE_MID: mock.Mock(),
+        SDP_SUBARRAY_DEVICE_MID_2: mock.Mock(),
+    }
+    proxies[SDP_SUBARRAY_DEVICE_MID_2].subscribe_event.side_effect = [
+        Exception("Device not exported"),
+        1,
+        2,
+    ]
+    aggregator._dev_factory = mock.Mock()
+    aggregator._dev_factory.get_device.side_effect = proxies.get
+
+    aggregator.subscribe_pending_attributes()
+    assert aggregator.subscription_count == 3
+    assert len(aggregator.pending_attributes) == 1
+    pending_dev_name = aggregator.pending_attributes[0][0]
+    assert pending_dev_name == SDP_SUBARRAY_DEVICE_MID_2
+
+    aggregator.subscribe_pending_attributes()
+    assert aggregator.pending_attributes == []
+
+    event = mock.Mock(err=False)
+    event.attr_value.value = HealthState.OK
+    callback = proxies[SDP_SUBARRAY_DEVICE_MID].subscribe_event.call_args_list
+    health_callback = [
+        call[0][2] for call in callback if call[0][0] == "healthState"
+    ][0]
+    health_callback(event)
+    assert aggregator.health_state_counts[HealthState.OK] == 1
+
+    aggregator.stop()
+    assert aggregator.subscription_count == 0
+    proxies[SDP_SUBARRAY_DEVICE_MID].unsubscribe_event.assert_called()
+
+
+@pytest.mark.sdpmln
+def test_update_callback_is_called_without_the_lock():
+    # The aggregate is read from another thread while the callback runs
+    aggregate_health_states = []
+
+    def update_callback(*args):
+        thread = threading.Thread(
+            target=lambda: aggregate_health_states.append(
+                aggregator.aggregate_health_state
+            )
+        )
+        thread.start()
+        thread.join(timeout=1)
+
+    aggregator = SdpSubarrayHealthAggregator(
+        [SDP_SUBARRAY_DEVICE_MID], logger, update_callback=update_callback
+    )
+    aggregator.update_health_state(SDP_SUBARRAY_DEVICE_MID, HealthState.OK)
+
+    assert aggregate_health_states == [HealthState.OK]
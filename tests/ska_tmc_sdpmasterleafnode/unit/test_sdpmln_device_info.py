@@ -0,0 +1,34 @@
+import pytest
+from ska_control_model import HealthState
+from tango import DevState
+
+from tests.settings import SDP_MASTER_DEVICE_MID, create_cm
+
+
+@pytest.mark.sdpmln
+def test_device_info_is_updated_in_place():
+    cm = create_cm("SdpMLNComponentManager", SDP_MASTER_DEVICE_MID)
+    device_info = cm.get_device()
+    assert cm.get_device() is device_info
+
+    cm.update_exception_for_unresponsiveness(device_info, "not reachable")
+    assert cm.get_device().unresponsive
+
+    cm.update_responsiveness_info()
+    assert not cm.get_device().unresponsive
+
+
+@pytest.mark.sdpmln
+def test_state_transitions_are_recorded():
+    cm = create_cm("SdpMLNComponentManager", SDP_MASTER_DEVICE_MID)
+    cm.update_device_state(DevState.OFF)
+    cm.update_device_state(DevState.ON)
+    cm.update_device_state(DevState.ON)
+    cm.update_device_health_state(HealthState.OK)
+
+    transitions = cm.get_state_transitions()
+    assert transitions["state"]["value"] == "ON"
+    assert transitions["state"]["previous_value"] == "OFF"
+    assert transitions["healthState"]["value"] == "OK"
+    assert transitions["healthState"]["previous_value"] is None
+    assert cm.get_device().state == DevState.ON
@@ -0,0 +1,95 @@
+import random
+import time
+import types
+
+import mock
+import pytest
+from ska_tango_base.commands import ResultCode
+from ska_tango_base.executor import TaskStatus
+
+from ska_tmc_sdpsubarrayleafnode.manager import AdaptiveTimeout, QuantileSketch
+from tests.settings import SDP_SUBARRAY_DEVICE_MID, create_cm
+
+
+@pytest.mark.sdpsln
+def test_quantile_sketch_relative_accuracy():
+    values = [random.uniform(0.1, 20.0) for _ in range(10000)]
+    sketch = QuantileSketch(0.01)
+    for value in values:
+        sketch.add(value)
+    exact_p99 = sorted(values)[int(0.99 * (len(values) - 1))]
+    assert sketch.get_quantile(0.99) == pytest.approx(exact_p99, rel=0.02)
+    restored_sketch = QuantileSketch.from_dict(sketch.to_dict())
+    assert restored_sketch.count == 10000
+    assert restored_sketch.get_quantile(0.99) == sketch.get_quantile(0.99)
+
+
+@pytest.mark.sdpsln
+def test_adaptive_timeout_bounds():
+    adaptive_timeout = AdaptiveTimeout(
+        50.0, enabled=True, multiple=3.0, min_timeout=5.0, max_timeout=40.0
+    )
+    for _ in range(19):
+        adaptive_timeout.observe("Scan", 0.1)
+        adaptive_timeout.observe("AssignResources", 20.0)
+    assert adaptive_timeout.get_timeout("Scan") == 50.0
+    adaptive_timeout.observe("Scan", 0.1)
+    adaptive_timeout.observe("AssignResources", 20.0)
+    assert adaptive_timeout.get_timeout("Scan") == 5.0
+    assert adaptive_timeout.get_timeout("AssignResources") == 40.0
+    for _ in range(20):
+        adaptive_timeout.observe("Configure", 4.0)
+    assert adaptive_timeout.get_timeout("Configure") == pytest.approx(
+        12.0, rel=0.02
+    )
+    adaptive_timeout.enabled = False
+    assert adaptive_timeout.get_timeout("Configure") == 50.0
+
+
+@pytest.mark.sdpsln
+def test_slow_command_is_reported_before_timeout():
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    cm.adaptive_timeout.enabled = True
+    cm._update_slow_command_callback = mock.Mock()
+    for _ in range(cm.adaptive_timeout.min_samples):
+        cm.adaptive_timeout.observe("Configure", 0.05)
+    configure_command = cm.get_command_object("Configure")
+    invocation = configure_command.invoke(
+        types.MethodType(
+            lambda command, *args, **kwargs: (command, cm.command_timeout),
+            configure_command,
+        )
+    )
+
+    command, timeout = invocation("argin", task_callback=mock.Mock())
+    assert timeout == 5.0
+    time.sleep(0.2)
+    cm._update_slow_command_callback.assert_called_once()
+    assert cm.slow_command_warning["command"] == "Configure"
+    command.update_task_status(
+        result=(ResultCode.OK, "Command Completed"),
+        status=TaskStatus.COMPLETED,
+    )
+    assert cm.adaptive_timeout.statistics["commands"]["Configure"][
+        "count"
+    ] == (cm.adaptive_timeout.min_samples + 1)
+
+
+@pytest.mark.sdpsln
+def test_learned_timeout_changes_timekeeper_deadline():
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    cm.adaptive_timeout.enabled = True
+    configure_command = cm.get_command_object("Configure")
+    timekeeper = configure_command.timekeeper
+    timekeeper.start_timer(configure_command.timeout_id, mock.Mock())
+    timekeeper.stop_timer()
+    assert timekeeper.timeout == cm.adaptive_timeout.default_timeout
+
+    # The timeout learned after the command object was created applies
+    # when its timer starts
+    for _ in range(cm.adaptive_timeout.min_samples):
+        cm.adaptive_timeout.observe("Configure", 0.5)
+    timekeeper.start_timer(configure_command.timeout_id, mock.Mock())
+    timekeeper.stop_timer()
+    assert timekeeper.timeout == cm.adaptive_timeout.get_timeout("Configure")
+    assert timekeeper.timeout == 5.0
@@ -0,0 +1,68 @@
+import time
+
+import mock
+import pytest
+
+from ska_tmc_sdpsubarrayleafnode.manager import (
+    AsyncReplyDispatcher,
+    AsyncReplyMode,
+)
+from tests.settings import logger
+
+
+def wait_for_processed_replies(dispatcher, count, timeout=5):
+    start_time = time.time()
+    while dispatcher.statistics["replies_processed"] < count:
+        time.sleep(0.05)
+        if time.time() - start_time >= timeout:
+            return False
+    return True
+
+
+@pytest.mark.sdpsln
+def test_async_reply_dispatcher_processes_replies_in_batches():
+    processed_events = []
+    dispatcher = AsyncReplyDispatcher(
+        processed_events.append, logger, mode=AsyncReplyMode.PUSH
+    )
+    events = [mock.Mock(err=False, cmd_name="Configure") for _ in range(5)]
+    for event in events:
+        dispatcher.submit(event)
+    dispatcher.start()
+    try:
+        assert wait_for_processed_replies(dispatcher, len(events))
+    finally:
+        dispatcher.stop()
+    assert processed_events == events
+    statistics = dispatcher.statistics
+    assert statistics["mode"] == "PUSH"
+    assert statistics["batches_processed"] >= 1
+    assert statistics["max_batch_size"] == len(events)
+    assert statistics["max_latency"] >= statistics["mean_latency"] >= 0
+
+
+@pytest.mark.sdpsln
+def test_async_reply_dispatcher_survives_handler_exception():
+    handler = mock.Mock(side_effect=[Exception("handler failed"), None])
+    dispatcher = AsyncReplyDispatcher(handler, logger)
+    dispatcher.start()
+    try:
+        dispatcher.submit(mock.Mock(err=True))
+        dispatcher.submit(mock.Mock(err=False))
+        assert wait_for_processed_replies(dispatcher, 2)
+    finally:
+        dispatcher.stop()
+    assert handler.call_count == 2
+
+
+@pytest.mark.sdpsln
+def test_async_reply_dispatcher_not_used_inline():
+    with pytest.raises(ValueError):
+        AsyncReplyDispatcher(mock.Mock(), logger, mode=AsyncReplyMode.INLINE)
+
+
+@pytest.mark.sdpsln
+def test_async_reply_mode_falls_back_to_inline():
+    assert AsyncReplyMode.parse("PULL", logger) == AsyncReplyMode.PULL
+    assert AsyncReplyMode.parse("push ", logger) == AsyncReplyMode.PUSH
+    assert AsyncReplyMode.parse("PUHS", logger) == AsyncReplyMode.INLINE
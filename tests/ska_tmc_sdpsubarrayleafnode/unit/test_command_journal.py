@@ -0,0 +1,162 @@
+import functools
+import json
+
+import mock
+import pytest
+from ska_tango_base.commands import ResultCode
+from ska_tango_base.control_model import ObsState
+from ska_tmc_common.enum import LivelinessProbeType
+
+from ska_tmc_sdpsubarrayleafnode.manager import (
+    CommandJournal,
+    SdpSLNComponentManager,
+)
+from ska_tmc_sdpsubarrayleafnode.manager.command_journal import (
+    INTERRUPTED_MESSAGE,
+)
+from tests.settings import SDP_SUBARRAY_DEVICE_MID, logger
+
+
+def create_journaled_cm(journal_file, update_lrcr_callback=None):
+    return SdpSLNComponentManager(
+        _update_admin_mode_callback=mock.Mock(),
+        _update_availablity_callback=mock.Mock(),
+        _update_lrcr_callback=update_lrcr_callback or mock.Mock(),
+        _update_sdp_subarray_obs_state_callback=mock.Mock(),
+        _sdp_subarray_admin_mode_enabled=True,
+        sdp_subarray_dev_name=SDP_SUBARRAY_DEVICE_MID,
+        logger=logger,
+        _liveliness_probe=LivelinessProbeType.NONE,
+        _event_receiver=False,
+        command_journal_file=str(journal_file),
+    )
+
+
+@pytest.mark.sdpsln
+def test_journal_recovers_last_state(tmp_path):
+    journal_file = tmp_path / "journal"
+    journal = CommandJournal(str(journal_file), logger, snapshot_interval=8)
+    journal.recover()
+    for index in range(100):
+        journal.record_command_submitted(
+            "Configure", f"id-{index}", {"configure_id": f"configure-{index}"}
+        )
+        journal.record_obs_state(ObsState.READY)
+        journal.record_lrc_result((f"id-{index}", "[0, 'ok']"))
+        journal.record_command_completed(f"id-{index}", "COMPLETED")
+    journal.record_command_submitted("Scan", "id-scan", {})
+    journal.close()
+
+    journal = CommandJournal(str(journal_file), logger, snapshot_interval=8)
+    recovery = journal.recover()
+    journal.close()
+
+    assert recovery["records_replayed"] < 8
+    assert recovery["interrupted_commands"] == [
+        {"command_id": "id-scan", "command": "Scan"}
+    ]
+    state = recovery["state"]
+    assert state["obs_state"] == ObsState.READY
+    assert state["lrc_result"] == ["id-99", "[0, 'ok']"]
+    assert state["command_ids"] == {"configure_id": "configure-99"}
+    assert state["command_in_progress"] == ""
+    assert state["in_flight"] == {}
+
+
+@pytest.mark.sdpsln
+def test_journal_discards_torn_record(tmp_path):
+    journal_file = tmp_path / "journal"
+    journal = CommandJournal(str(journal_file), logger)
+    journal.recover()
+    journal.record_obs_state(ObsState.IDLE)
+    journal.close()
+    with open(journal_file, "ab") as torn_file:
+        torn_file.write(b'\x40\x00\x00\x00\x00\x00\x00\x00{"kind"')
+
+    journal = CommandJournal(str(journal_file), logger)
+    assert journal.recover()["state"]["obs_state"] == ObsState.IDLE
+    journal.record_obs_state(ObsState.READY)
+    journal.close()
+
+    journal = CommandJournal(str(journal_file), logger)
+    assert journal.recover()["state"]["obs_state"] == ObsState.READY
+    journal.close()
+
+
+@pytest.mark.sdpsln
+def test_journal_is_compacted(tmp_path):
+    journal_file = tmp_path / "journal"
+    journal = CommandJournal(
+        str(journal_file), logger, snapshot_interval=10, max_journal_size=2048
+    )
+    journal.recover()
+    for _ in range(1000):
+        journal.record_obs_state(ObsState.SCANNING)
+    journal.close()
+    assert journal_file.stat().st_size < 4096
+
+
+@pytest.mark.sdpsln
+def test_disabled_journal_writes_nothing(tmp_path):
+    journal = CommandJournal("", logger)
+    assert journal.recover()["records_replayed"] == 0
+    journal.record_obs_state(ObsState.IDLE)
+    assert not journal.enabled
+    assert journal.state["obs_state"] is None
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.sdpsln
+@pytest.mark.parametrize("truncated_index", [False, True])
+def test_journal_disabled_on_recovery_error(tmp_path, truncated_index):
+    if truncated_index:
+        journal_file = tmp_path / "journal"
+        (tmp_path / "journal.idx").write_bytes(b"")
+    else:
+        journal_file = tmp_path / "missing" / "journal"
+    journal = CommandJournal(str(journal_file), logger)
+    recovery = journal.recover()
+    assert recovery["error"]
+    assert recovery["records_replayed"] == 0
+    assert not journal.enabled
+    journal.record_obs_state(ObsState.IDLE)
+    assert journal.recover()["error"] == recovery["error"]
+    journal.close()
+
+
+@pytest.mark.sdpsln
+def test_journal_recovery_error_does_not_fail_init(tmp_path):
+    cm = create_journaled_cm(tmp_path / "missing" / "journal")
+    assert "FileNotFoundError" in cm.journal_recovery["error"]
+    assert not cm.command_journal.enabled
+    cm.stop()
+
+
+@pytest.mark.sdpsln
+def test_in_flight_command_fails_after_restart(tmp_path):
+    journal_file = tmp_path / "journal"
+    cm = create_journaled_cm(journal_file)
+    cm.update_device_obs_state(ObsState.IDLE)
+    cm.configure_id = "configure-1"
+    cm.command_journal.record_command_submitted(
+        cm.get_command_name(cm.get_command_object("Configure").configure),
+        cm.get_command_id(functools.partial(mock.Mock(), "1-Configure")),
+        {"configure_id": cm.configure_id},
+    )
+    cm.stop()
+
+    update_lrcr_callback = mock.Mock()
+    cm = create_journaled_cm(journal_file, update_lrcr_callback)
+    assert cm.get_obs_state() == ObsState.IDLE
+    assert cm.configure_id == "configure-1"
+    assert cm.command_in_progress == ""
+    assert cm.journal_recovery["interrupted_commands"] == [
+        {"command_id": "1-Configure", "command": "Configure"}
+    ]
+    assert cm.journal_recovery["recovery_time"] >= 0
+
+    cm.publish_recovered_state()
+    update_lrcr_callback.assert_called_with(
+        ("1-Configure", json.dumps([ResultCode.FAILED, INTERRUPTED_MESSAGE]))
+    )
+    cm.stop()
@@ -0,0 +1,58 @@
+import threading
+
+import mock
+import pytest
+from ska_tango_base.executor import TaskStatus
+
+from ska_tmc_sdpsubarrayleafnode.manager import CommandLanes
+from ska_tmc_sdpsubarrayleafnode.manager.command_lanes import (
+    HOUSEKEEPING_LANE,
+    OBSERVATION_LANE,
+    PREEMPTIVE_LANE,
+)
+from tests.settings import SDP_SUBARRAY_DEVICE_MID, create_cm
+
+
+@pytest.mark.sdpsln
+def test_command_lanes():
+    command_lanes = CommandLanes(enabled=True)
+    assert command_lanes.get_lane("Configure") == OBSERVATION_LANE
+    assert command_lanes.get_lane("On") == HOUSEKEEPING_LANE
+    assert command_lanes.get_lane("Restart") == PREEMPTIVE_LANE
+    assert command_lanes.lanes["lanes"][HOUSEKEEPING_LANE]["workers"] == 1
+    assert CommandLanes().get_lane("On") == OBSERVATION_LANE
+
+
+@pytest.mark.sdpsln
+def test_housekeeping_command_is_not_blocked():
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    cm.command_lanes = CommandLanes(enabled=True)
+    release_observation = threading.Event()
+    housekeeping_done = threading.Event()
+
+    def observation_task(task_callback=None, **kwargs):
+        release_observation.wait(5)
+
+    def housekeeping_task(task_callback=None, **kwargs):
+        housekeeping_done.set()
+
+    observation_task.__name__ = "Configure"
+    housekeeping_task.__name__ = "On"
+    cm.submit_task(observation_task, task_callback=mock.Mock())
+    task_status, _ = cm.submit_task(
+        housekeeping_task, task_callback=mock.Mock()
+    )
+
+    assert task_status == TaskStatus.QUEUED
+    assert housekeeping_done.wait(2)
+    release_observation.set()
+
+
+@pytest.mark.sdpsln
+def test_component_manager_stop_shuts_down_lanes():
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    cm.command_lanes = CommandLanes(enabled=True)
+    cm.stop()
+
+    with pytest.raises(KeyError):
+        cm.command_lanes.submit(HOUSEKEEPING_LANE, mock.Mock())
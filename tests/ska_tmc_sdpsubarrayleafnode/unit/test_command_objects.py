@@ -0,0 +1,130 @@
+import threading
+import time
+import types
+
+import mock
+import pytest
+from ska_tango_base.commands import ResultCode
+from ska_tango_base.executor import TaskStatus
+
+from ska_tmc_sdpsubarrayleafnode.commands import CommandContext
+from tests.settings import SDP_SUBARRAY_DEVICE_MID, create_cm, logger
+
+
+def run_invocation(command, argin, task_callback):
+    """Command method returning the context of the invocation."""
+    command.task_callback = task_callback
+    return command.context
+
+
+def run_tracked_invocation(command, argin, task_callback):
+    """Command method tracking its completion in a tracker thread."""
+    command.task_callback = task_callback
+    command.start_tracker_thread()
+    return command.context
+
+
+@pytest.mark.sdpsln
+def test_command_objects_are_reused():
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    configure_command = cm.get_command_object("Configure")
+    assert cm.get_command_object("Configure") is configure_command
+    assert cm.get_command_object("Scan") is not configure_command
+
+
+@pytest.mark.sdpsln
+def test_invoke_runs_callable():
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    configure_command = cm.get_command_object("Configure")
+    method = mock.Mock(return_value="result")
+    task_callback = mock.Mock()
+
+    invocation = configure_command.invoke(method)
+    assert invocation("argin", task_callback=task_callback) == "result"
+    method.assert_called_once_with("argin", task_callback=task_callback)
+
+
+@pytest.mark.sdpsln
+def test_invocations_reuse_pooled_context():
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    configure_command = cm.get_command_object("Configure")
+    method = types.MethodType(run_invocation, configure_command)
+    invocation = configure_command.invoke(method)
+    assert configure_command.invoke(method) is invocation
+
+    first_context = invocation("argin", task_callback=mock.Mock())
+    second_context = invocation("argin", task_callback=mock.Mock())
+    assert first_context is second_context
+    assert first_context is not configure_command.context
+    assert first_context.timeout_id.endswith("_Configure")
+
+
+@pytest.mark.sdpsln
+def test_command_context_has_no_instance_dict():
+    context = CommandContext("Scan", lambda: 10.0, logger)
+    assert not hasattr(context, "__dict__")
+    with pytest.raises(AttributeError):
+        context.unknown_attribute = None
+
+
+@pytest.mark.sdpsln
+def test_tracker_thread_reports_on_its_invocation():
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    configure_command = cm.get_command_object("Configure")
+    command_completed = threading.Event()
+
+    def track_and_update_command_status(*args, **kwargs):
+        command_completed.wait(5)
+        configure_command.update_task_status(
+            result=(ResultCode.OK, "Command Completed"),
+            status=TaskStatus.COMPLETED,
+        )
+
+    configure_command.track_and_update_command_status = (
+        track_and_update_command_status
+    )
+    invocation = configure_command.invoke(
+        types.MethodType(run_tracked_invocation, configure_command)
+    )
+    task_callbacks = [mock.Mock(), mock.Mock()]
+
+    contexts = [
+        invocation("argin", task_callback=task_callback)
+        for task_callback in task_callbacks
+    ]
+    # The first context is still bound to its tracker thread
+    assert contexts[0] is not contexts[1]
+
+    command_completed.set()
+    for task_callback in task_callbacks:
+        for _ in range(50):
+            if task_callback.called:
+                break
+            time.sleep(0.1)
+        task_callback.assert_called_once_with(
+            status=TaskStatus.COMPLETED,
+            result=(ResultCode.OK, "Command Completed"),
+        )
+
+
+@pytest.mark.sdpsln
+def test_rejected_invocation_is_not_in_progress():
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    configure_command = cm.get_command_object("Configure")
+    task_callback = mock.Mock()
+    cm.submit_task(
+        configure_command.invoke(configure_command.configure),
+        kwargs={"argin": "{}"},
+        is_cmd_allowed=lambda: False,
+        task_callback=task_callback,
+    )
+    for _ in range(50):
+        if (
+            mock.call(status=TaskStatus.REJECTED, result=mock.ANY)
+            in task_callback.call_args_list
+        ):
+            break
+        time.sleep(0.1)
+    assert cm.command_in_progress == ""
+    assert "Configure" not in cm.command_tracer.active_commands
+    assert cm.command_tracer.traces[-1]["status"] == "REJECTED"
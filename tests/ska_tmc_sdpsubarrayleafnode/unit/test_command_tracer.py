@@ -0,0 +1,82 @@
+import json
+
+import mock
+import pytest
+from ska_tango_base.commands import ResultCode
+from ska_tango_base.executor import TaskStatus
+
+from ska_tmc_sdpsubarrayleafnode.manager import CommandTracer
+from tests.settings import SDP_SUBARRAY_DEVICE_MID, create_cm, logger
+
+
+@pytest.mark.sdpsln
+def test_command_trace_phases(tmp_path):
+    trace_file = tmp_path / "command_traces.json"
+    tracer = CommandTracer(2, str(trace_file), logger)
+    tracer.start("Configure")
+    tracer.mark("Configure", "dequeued")
+    tracer.mark("Scan", "dequeued")
+    tracer.mark_all("obs_state_event", obs_state="CONFIGURING")
+    tracer.end("Configure", "COMPLETED")
+
+    (trace,) = tracer.traces
+    assert trace["command"] == "Configure"
+    assert trace["status"] == "COMPLETED"
+    assert [event["phase"] for event in trace["events"]] == [
+        "submitted",
+        "dequeued",
+        "obs_state_event",
+        "completed",
+    ]
+    assert trace["events"][2]["args"] == {"obs_state": "CONFIGURING"}
+    assert tracer.active_commands == []
+
+    trace_events = json.loads(trace_file.read_text())["traceEvents"]
+    assert trace_events[0]["name"] == "Configure"
+    assert trace_events[0]["ph"] == "X"
+    assert {event["name"] for event in trace_events} >= {
+        "submitted",
+        "dequeued",
+        "completed",
+    }
+
+
+@pytest.mark.sdpsln
+def test_command_traces_are_bounded():
+    tracer = CommandTracer(2, logger=logger)
+    for command_name in ["AssignResources", "Configure", "Scan"]:
+        tracer.start(command_name)
+        tracer.end(command_name, "COMPLETED")
+    assert [trace["command"] for trace in tracer.traces] == [
+        "Configure",
+        "Scan",
+    ]
+
+
+@pytest.mark.sdpsln
+def test_resubmitted_command_abandons_active_trace():
+    tracer = CommandTracer(logger=logger)
+    tracer.start("Configure")
+    tracer.start("Configure")
+    assert [trace["status"] for trace in tracer.traces] == ["ABANDONED"]
+    assert tracer.active_commands == ["Configure"]
+
+
+@pytest.mark.sdpsln
+def test_command_invocation_is_traced():
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    configure_command = cm.get_command_object("Configure")
+    invocation = configure_command.invoke(mock.Mock())
+    invocation("argin", task_callback=mock.Mock())
+    configure_command.update_task_status(
+        result=(ResultCode.FAILED, "Timeout has occurred, command failed"),
+        status=TaskStatus.COMPLETED,
+    )
+
+    (trace,) = cm.command_tracer.traces
+    assert trace["status"] == "TIMED_OUT"
+    assert [event["phase"] for event in trace["events"]] == [
+        "submitted",
+        "dequeued",
+        "timed_out",
+    ]
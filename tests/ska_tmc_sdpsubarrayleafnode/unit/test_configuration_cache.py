@@ -0,0 +1,54 @@
+import pytest
+
+from ska_tmc_sdpsubarrayleafnode.manager import ConfigurationCache
+from ska_tmc_sdpsubarrayleafnode.manager.configuration_cache import (
+    canonicalize,
+    get_changed_keys,
+)
+
+CONFIGURATION = {
+    "interface": "https://schema.skao.int/ska-sdp-configure/0.4",
+    "scan_type": "science_A",
+    "new_scan_types": [{"scan_type_id": "science_A", "beams": {}}],
+}
+
+
+@pytest.mark.sdpsln
+def test_canonicalize():
+    reordered = dict(reversed(list(CONFIGURATION.items())))
+    assert canonicalize(reordered) == canonicalize(CONFIGURATION)
+
+
+@pytest.mark.sdpsln
+def test_get_changed_keys():
+    previous = {"scan_type": "science_A", "a": {"b": 1, "c": 2}, "d": [1]}
+    current = {"scan_type": "science_B", "a": {"b": 1, "c": 3}, "e": None}
+    assert get_changed_keys(previous, current) == [
+        "a.c",
+        "d",
+        "e",
+        "scan_type",
+    ]
+
+
+@pytest.mark.sdpsln
+def test_configuration_cache():
+    configuration_cache = ConfigurationCache()
+    delta = configuration_cache.get_delta(CONFIGURATION)
+    assert not delta["unchanged"]
+    assert delta["changed_keys"] is None
+
+    configuration_cache.stage(CONFIGURATION, delta["hash"])
+    assert configuration_cache.applied_hash == ""
+    configuration_cache.commit()
+    assert configuration_cache.applied_hash == delta["hash"]
+    assert configuration_cache.get_delta(dict(CONFIGURATION))["unchanged"]
+
+    delta = configuration_cache.get_delta(
+        dict(CONFIGURATION, scan_type="science_B")
+    )
+    assert not delta["unchanged"]
+    assert delta["changed_keys"] == ["scan_type"]
+
+    configuration_cache.clear()
+    assert not configuration_cache.get_delta(CONFIGURATION)["unchanged"]
@@ -153,3 +153,32 @@ def test_telescope_configure_command_fail_check_allowed_with_device_unresponsive
     cm._device = DeviceInfo(devices, _unresponsive=True)
     with pytest.raises(DeviceUnresponsive):
         cm.is_command_allowed_callable("Configure")()
+
+
+@pytest.mark.sdpsln
+@pytest.mark.parametrize(
+    "devices", [SDP_SUBARRAY_DEVICE_MID, SDP_SUBARRAY_DEVICE_LOW]
+)
+def test_configure_command_delta(tango_context, devices):
+    logger.info("%s", tango_context)
+    cm = create_cm("SdpSLNComponentManager", devices)
+    sdp_subarray_mock = mock.Mock(dev_name=devices)
+    configure_command = Configure(cm, logger)
+    configure_command.sdp_subarray_adapter = sdp_subarray_mock
+    configure_input_str = get_configure_input_str()
+
+    assert configure_command.do(configure_input_str)[0] == ResultCode.OK
+    cm.configuration_cache.commit()
+    cm.update_device_obs_state(ObsState.READY)
+    assert wait_for_cm_obstate_attribute_value(cm, ObsState.READY)
+
+    # The same configuration is not sent again
+    assert configure_command.do(configure_input_str)[0] == ResultCode.OK
+    assert sdp_subarray_mock.Configure.call_count == 1
+    assert cm.configuration_cache.last_delta["unchanged"]
+
+    # Only the scan_type is sent if it is the only change
+    configure_input_str = configure_input_str.replace("science_A", "cal_B")
+    assert configure_command.do(configure_input_str)[0] == ResultCode.OK
+    assert sdp_subarray_mock.Configure.call_count == 2
+    assert cm.configuration_cache.last_delta["changed_keys"] == ["scan_type"]
@@ -0,0 +1,56 @@
+import gzip
+import json
+import zlib
+
+import mock
+import pytest
+from ska_tango_base.executor import TaskStatus
+
+from ska_tmc_sdpsubarrayleafnode.manager.encoded_payload import (
+    decode_payload,
+)
+from tests.settings import SDP_SUBARRAY_DEVICE_MID, create_cm
+
+ARGUMENT = json.dumps({"execution_block": {"eb_id": "eb-test"}})
+
+
+@pytest.mark.sdpsln
+@pytest.mark.parametrize(
+    "encoding, data",
+    [
+        ("zlib", zlib.compress(ARGUMENT.encode("utf-8"))),
+        ("gzip", gzip.compress(ARGUMENT.encode("utf-8"))),
+        ("json", ARGUMENT.encode("utf-8")),
+    ],
+)
+def test_decode_payload(encoding, data):
+    argin, statistics = decode_payload(encoding, data)
+    assert argin == ARGUMENT
+    assert statistics["encoded_size"] == len(data)
+    assert statistics["decoded_size"] == len(ARGUMENT)
+    assert statistics["decode_time"] >= 0
+
+
+@pytest.mark.sdpsln
+@pytest.mark.parametrize(
+    "encoding, data",
+    [
+        ("lz4", b""),
+        ("zlib", b"not compressed"),
+        ("zlib", zlib.compress(ARGUMENT.encode("utf-8"))[:-4]),
+        ("gzip", gzip.compress(b"\xff\xfe")),
+    ],
+)
+def test_decode_invalid_payload(encoding, data):
+    with pytest.raises(ValueError):
+        decode_payload(encoding, data)
+
+
+@pytest.mark.sdpsln
+def test_assign_resources_encoded_invalid_argument():
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    task_status, _ = cm.assign_resources_encoded(
+        ("zlib", b"not compressed"), task_callback=mock.Mock()
+    )
+    assert task_status == TaskStatus.REJECTED
+    assert cm.encoded_payload_statistics == {}
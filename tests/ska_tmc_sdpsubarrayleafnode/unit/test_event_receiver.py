@@ -0,0 +1,127 @@
+import time
+
+import mock
+import pytest
+import tango
+
+from ska_tmc_sdpsubarrayleafnode.manager import SdpSLNEventReceiver
+from tests.settings import SDP_SUBARRAY_DEVICE_MID, create_cm, logger
+
+
+@pytest.mark.sdpsln
+def test_event_receiver_retries_failed_attribute_only():
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    event_receiver = SdpSLNEventReceiver(
+        cm,
+        logger,
+        attribute_list=["obsState", "state", "healthState", "adminMode"],
+    )
+    failed_attributes = []
+
+    def subscribe_event(attribute, event_type, callback, **kwargs):
+        if attribute == "adminMode" and not failed_attributes:
+            failed_attributes.append(attribute)
+            raise tango.DevFailed()
+        return len(attribute)
+
+    sdp_subarray_proxy = mock.Mock()
+    sdp_subarray_proxy.subscribe_event.side_effect = subscribe_event
+    event_receiver._dev_factory = mock.Mock()
+    event_receiver._dev_factory.get_device.return_value = sdp_subarray_proxy
+
+    event_receiver.subscribe_events(cm.get_device())
+    assert event_receiver.pending_attributes == ["adminMode"]
+
+    event_receiver.subscribe_events(cm.get_device())
+    assert event_receiver.pending_attributes == []
+    statistics = event_receiver.subscription_statistics
+    assert statistics["adminMode"]["attempts"] == 2
+    assert statistics["obsState"]["attempts"] == 1
+    assert all(
+        attribute_statistics["subscribed"]
+        and attribute_statistics["time_to_subscribed"] is not None
+        for attribute_statistics in statistics.values()
+    )
+
+
+@pytest.mark.sdpsln
+def test_event_receiver_tracks_time_to_first_event():
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    event_receiver = SdpSLNEventReceiver(
+        cm, logger, attribute_list=["obsState"]
+    )
+    event_handler = mock.Mock()
+    event_receiver.event_handling_methods = {"obsState": event_handler}
+    sdp_subarray_proxy = mock.Mock()
+    event_receiver.subscribe_attribute(sdp_subarray_proxy, "obsState")
+    callback = sdp_subarray_proxy.subscribe_event.call_args[0][2]
+    event = mock.Mock()
+
+    callback(event)
+
+    event_handler.assert_called_once_with(event)
+    statistics = event_receiver.subscription_statistics["obsState"]
+    assert statistics["time_to_first_event"] is not None
+
+
+@pytest.mark.sdpsln
+def test_event_receiver_drops_only_obsolete_subscriptions():
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    event_receiver = SdpSLNEventReceiver(
+        cm,
+        logger,
+        attribute_list=["obsState", "state", "healthState", "adminMode"],
+    )
+    sdp_subarray_proxy = mock.Mock()
+    sdp_subarray_proxy.subscribe_event.side_effect = range(1, 100)
+    event_receiver._dev_factory = mock.Mock()
+    event_receiver._dev_factory.get_device.return_value = sdp_subarray_proxy
+    event_receiver.subscribe_events(cm.get_device())
+    assert sdp_subarray_proxy.subscribe_event.call_count == 4
+
+    event_receiver.update_subscriptions(
+        cm.get_device(), ["obsState", "state", "healthState"]
+    )
+
+    sdp_subarray_proxy.unsubscribe_event.assert_called_once()
+    assert sdp_subarray_proxy.subscribe_event.call_count == 4
+    assert "adminMode" not in event_receiver.subscription_statistics
+
+    event_receiver.update_subscriptions(
+        cm.get_device(),
+        ["obsState", "state", "healthState"],
+        resubscribe_all=True,
+    )
+
+    assert sdp_subarray_proxy.unsubscribe_event.call_count == 4
+    assert sdp_subarray_proxy.subscribe_event.call_count == 7
+
+
+@pytest.mark.sdpsln
+def test_event_receiver_retries_failed_resubscriptions():
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    event_receiver = SdpSLNEventReceiver(
+        cm,
+        logger,
+        attribute_list=["obsState", "state"],
+        event_subscription_check_period=0.1,
+    )
+    sdp_subarray_proxy = mock.Mock()
+    event_receiver._dev_factory = mock.Mock()
+    event_receiver._dev_factory.get_device.return_value = sdp_subarray_proxy
+    # The first resubscription of obsState fails
+    sdp_subarray_proxy.subscribe_event.side_effect = [
+        Exception("Device not exported"),
+        1,
+    ]
+
+    event_receiver.update_subscriptions(cm.get_device(), ["obsState"])
+
+    for _ in range(50):
+        if not event_receiver.pending_attributes:
+            break
+        time.sleep(0.1)
+    assert event_receiver.pending_attributes == []
+    statistics = event_receiver.subscription_statistics["obsState"]
+    assert statistics["attempts"] == 2
+    assert statistics["subscribed"]
@@ -0,0 +1,63 @@
+import mock
+import pytest
+from ska_tango_base.executor import TaskStatus
+
+from ska_tmc_sdpsubarrayleafnode.manager import ExecutorMetrics
+from tests.settings import logger
+
+
+@pytest.mark.sdpsln
+def test_task_lifecycle_metrics():
+    metrics = ExecutorMetrics(logger=logger)
+    task_callback = mock.Mock()
+    task_id, func, tracked_task_callback = metrics.track(
+        "Configure", lambda task_callback: "done", task_callback
+    )
+    metrics.submitted(task_id, TaskStatus.QUEUED)
+    assert metrics.get_metrics()["queued"] == 1
+
+    assert func(task_callback=tracked_task_callback) == "done"
+    tracked_task_callback(status=TaskStatus.COMPLETED)
+    task_callback.assert_called_once_with(status=TaskStatus.COMPLETED)
+
+    executor_metrics = metrics.get_metrics()
+    assert executor_metrics["queued"] == 0
+    assert executor_metrics["running"] == 0
+    assert executor_metrics["busy_ratio"] > 0
+    configure = executor_metrics["commands"]["Configure"]
+    assert configure["submitted"] == 1
+    assert configure["started"] == 1
+    assert configure["queue_wait_buckets"][-1] == 1
+
+
+@pytest.mark.sdpsln
+def test_rejected_tasks_are_counted():
+    metrics = ExecutorMetrics(logger=logger)
+    task_id, _, _ = metrics.track("Scan", mock.Mock(), None)
+    metrics.submitted(task_id, TaskStatus.REJECTED)
+    _, _, tracked_task_callback = metrics.track("Scan", mock.Mock(), None)
+    tracked_task_callback(status=TaskStatus.REJECTED)
+
+    executor_metrics = metrics.get_metrics()
+    assert executor_metrics["queued"] == 0
+    assert executor_metrics["commands"]["Scan"]["rejected"] == 2
+    assert executor_metrics["commands"]["Scan"]["started"] == 0
+
+
+@pytest.mark.sdpsln
+def test_prometheus_metrics_file(tmp_path):
+    metrics_file = tmp_path / "metrics.prom"
+    metrics = ExecutorMetrics(
+        str(metrics_file), {"device": "mid-tmc/subarray-leaf-node-sdp/01"}
+    )
+    _, func, _ = metrics.track("End", lambda: None, None)
+    func()
+    metrics.export()
+
+    text = metrics_file.read_text()
+    assert "# TYPE tmc_leaf_node_task_queue_wait_seconds histogram" in text
+    assert (
+        'tmc_leaf_node_tasks_submitted_total{device="mid-tmc/subarray-leaf-'
+        + 'node-sdp/01",command="End"} 1'
+    ) in text
+    assert 'le="+Inf"} 1' in text
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from ska_tmc_sdpsubarrayleafnode.manager import InterfaceRegistry
+from tests.settings import SDP_SUBARRAY_DEVICE_MID, create_cm
+
+SCAN_INTERFACE = "https://schema.skao.int/ska-sdp-scan/0.4"
+
+
+@pytest.mark.sdpsln
+def test_render_payload():
+    interface_registry = InterfaceRegistry()
+    payload = interface_registry.render(
+        "Scan", {"scan_id": 1, "interface": "ska-sdp-scan/0.1"}
+    )
+    assert payload == json.dumps({"interface": SCAN_INTERFACE, "scan_id": 1})
+    assert interface_registry.render("Scan", {}) == json.dumps(
+        {"interface": SCAN_INTERFACE}
+    )
+
+
+@pytest.mark.sdpsln
+def test_switch_interface_version():
+    interface_registry = InterfaceRegistry()
+    interface_registry.version = "0.3"
+    assert interface_registry.get_interface("Configure").endswith(
+        "ska-sdp-configure/0.3"
+    )
+    with pytest.raises(ValueError):
+        interface_registry.version = "9.9"
+    assert interface_registry.version == "0.3"
+
+    interface_registry.register(
+        "1.0", {"Scan": "https://schema.skao.int/ska-sdp-scan/1.0"}
+    )
+    interface_registry.version = "1.0"
+    assert json.loads(interface_registry.render("Scan", {"scan_id": 2})) == {
+        "interface": "https://schema.skao.int/ska-sdp-scan/1.0",
+        "scan_id": 2,
+    }
+    assert "1.0" in interface_registry.interfaces["versions"]
+
+
+@pytest.mark.sdpsln
+def test_component_manager_interface_version():
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    assert cm.interface_registry.version == "0.4"
+
+
+@pytest.mark.sdpsln
+def test_argument_interface():
+    interface_registry = InterfaceRegistry()
+    configure_interface = "https://schema.skao.int/ska-sdp-configure/0.3"
+    assert (
+        interface_registry.get_argument_interface(
+            "Configure", {"interface": configure_interface}
+        )
+        == configure_interface
+    )
+    assert interface_registry.get_argument_interface("Configure", {}).endswith(
+        "ska-sdp-configure/0.4"
+    )
+    assert interface_registry.is_registered("Configure", configure_interface)
+    for interface in ("", 4):
+        with pytest.raises(ValueError):
+            interface_registry.get_argument_interface(
+                "Configure", {"interface": interface}
+            )
+
+    newer_interface = "https://schema.skao.int/ska-sdp-configure/1.2"
+    assert (
+        interface_registry.get_argument_interface(
+            "Configure", {"interface": newer_interface}
+        )
+        == newer_interface
+    )
+    assert not interface_registry.is_registered("Configure", newer_interface)
+    payload = interface_registry.render(
+        "Configure", {"scan_type": "science_A"}, newer_interface
+    )
+    assert payload == json.dumps(
+        {"interface": newer_interface, "scan_type": "science_A"}
+    )
+
+    payload = interface_registry.render(
+        "Configure", {"scan_type": "science_A"}, configure_interface
+    )
+    assert json.loads(payload)["interface"] == configure_interface
@@ -0,0 +1,40 @@
+import subprocess
+import sys
+
+import pytest
+
+from ska_tmc_sdpsubarrayleafnode.commands import Configure
+
+
+@pytest.mark.sdpsln
+def test_command_modules_are_imported_on_first_use():
+    script = (
+        "import sys\n"
+        "import ska_tmc_sdpsubarrayleafnode.commands as commands\n"
+        "module = 'ska_tmc_sdpsubarrayleafnode.commands.configure_command'\n"
+        "assert module not in sys.modules\n"
+        "commands.Configure\n"
+        "assert module in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True)
+
+
+@pytest.mark.sdpsln
+def test_command_class_is_exported():
+    from ska_tmc_sdpsubarrayleafnode.commands.configure_command import (
+        Configure as ConfigureCommand,
+    )
+
+    assert Configure is ConfigureCommand
+
+
+@pytest.mark.sdpsln
+def test_device_import_does_not_load_command_modules():
+    script = (
+        "import sys\n"
+        "import ska_tmc_sdpsubarrayleafnode.sdp_subarray_leaf_node\n"
+        "prefix = 'ska_tmc_sdpsubarrayleafnode.commands.'\n"
+        "loaded = [name for name in sys.modules if name.startswith(prefix)]\n"
+        "assert not loaded, loaded\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True)
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from ska_tango_base.control_model import ObsState
+
+from ska_tmc_sdpsubarrayleafnode.manager import ObsStateTimeline
+from tests.settings import SDP_SUBARRAY_DEVICE_MID, create_cm
+
+
+@pytest.mark.sdpsln
+def test_timeline_ring_buffers():
+    timeline = ObsStateTimeline(3)
+    for timestamp, obs_state in enumerate(
+        [
+            ObsState.IDLE,
+            ObsState.CONFIGURING,
+            ObsState.CONFIGURING,
+            ObsState.READY,
+            ObsState.SCANNING,
+        ]
+    ):
+        timeline.record(obs_state, float(timestamp))
+
+    timestamps, states, durations = timeline.get_timeline()
+    assert timestamps.dtype == np.float64
+    assert states.dtype == np.int8
+    assert durations.dtype == np.float32
+    assert timestamps.tolist() == [1.0, 3.0, 4.0]
+    assert states.tolist() == [
+        ObsState.CONFIGURING,
+        ObsState.READY,
+        ObsState.SCANNING,
+    ]
+    assert durations[:2].tolist() == [2.0, 1.0]
+    assert np.isnan(durations[2])
+
+
+@pytest.mark.sdpsln
+def test_timeline_statistics():
+    timeline = ObsStateTimeline()
+    timestamp = 0.0
+    for configure_time, scan_time in [(2.0, 10.0), (4.0, 20.0)]:
+        for obs_state, duration in [
+            (ObsState.IDLE, 1.0),
+            (ObsState.CONFIGURING, configure_time),
+            (ObsState.READY, 1.0),
+            (ObsState.SCANNING, scan_time),
+            (ObsState.READY, 1.0),
+        ]:
+            timeline.record(obs_state, timestamp)
+            timestamp += duration
+
+    statistics = timeline.get_statistics()
+    configure = statistics["sequences"]["IDLE->CONFIGURING->READY"]
+    assert configure["count"] == 2
+    assert configure["mean"] == pytest.approx(3.0)
+    assert configure["max"] == pytest.approx(4.0)
+    scanning = statistics["dwell"]["SCANNING"]
+    assert scanning["count"] == 2
+    assert scanning["mean"] == pytest.approx(15.0)
+    assert statistics["sequences"]["EMPTY->RESOURCING->IDLE"] == {"count": 0}
+
+
+@pytest.mark.sdpsln
+def test_obs_state_events_are_recorded():
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    cm.update_device_obs_state(ObsState.IDLE)
+    cm.update_device_obs_state(ObsState.CONFIGURING)
+    _, states, _ = cm.obs_state_timeline.get_timeline()
+    assert states.tolist() == [ObsState.IDLE, ObsState.CONFIGURING]
@@ -0,0 +1,139 @@
+import json
+
+import mock
+import pytest
+from ska_tango_base.commands import ResultCode
+from ska_tango_base.control_model import ObsState
+
+from ska_tmc_sdpsubarrayleafnode.commands import (
+    Configure,
+    PrepareConfigurations,
+)
+from tests.settings import SDP_SUBARRAY_DEVICE_MID, create_cm, logger
+
+INTERFACE = "https://schema.skao.int/ska-sdp-configure/0.4"
+
+
+def get_configurations(*scan_types):
+    return [
+        {"interface": INTERFACE, "scan_type": scan_type}
+        for scan_type in scan_types
+    ]
+
+
+@pytest.mark.sdpsln
+def test_prepare_configurations():
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    prepare_configurations = PrepareConfigurations(cm, logger)
+    result_code, _ = prepare_configurations.do(
+        json.dumps(get_configurations("science_A", "calibration_B"))
+    )
+    assert result_code == ResultCode.OK
+    assert list(cm.configuration_cache.prepared) == [
+        "science_A",
+        "calibration_B",
+    ]
+    prepared_configuration = cm.configuration_cache.get_prepared("science_A")
+    assert json.loads(prepared_configuration.payload) == {
+        "interface": INTERFACE,
+        "scan_type": "science_A",
+    }
+
+    assert prepare_configurations.do("[]")[0] == ResultCode.OK
+    assert cm.configuration_cache.prepared == {}
+
+
+@pytest.mark.sdpsln
+@pytest.mark.parametrize(
+    "argin",
+    [
+        "{",
+        json.dumps(get_configurations("science_A")[0]),
+        json.dumps([{"scan_type": "science_A"}]),
+        json.dumps(get_configurations("science_A", "science_A")),
+        json.dumps([{"interface": 4, "scan_type": "A"}]),
+    ],
+)
+def test_prepare_configurations_invalid(argin):
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    prepare_configurations = PrepareConfigurations(cm, logger)
+    assert prepare_configurations.do(argin)[0] == ResultCode.FAILED
+    assert cm.configuration_cache.prepared == {}
+
+
+@pytest.mark.sdpsln
+def test_configure_prepared_configuration(tango_context):
+    logger.info("%s", tango_context)
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    PrepareConfigurations(cm, logger).do(
+        json.dumps(get_configurations("science_A"))
+    )
+    sdp_subarray_mock = mock.Mock(dev_name=SDP_SUBARRAY_DEVICE_MID)
+    configure_command = Configure(cm, logger)
+    configure_command.sdp_subarray_adapter = sdp_subarray_mock
+    cm.update_device_obs_state(ObsState.IDLE)
+
+    result_code, _ = configure_command.do(
+        json.dumps({"scan_type": "science_A"})
+    )
+    assert result_code == ResultCode.OK
+    sdp_subarray_mock.Configure.assert_called_once()
+    payload = sdp_subarray_mock.Configure.call_args[0][0]
+    assert json.loads(payload)["interface"] == INTERFACE
+
+    result_code, _ = configure_command.do(json.dumps({"scan_type": "unknown"}))
+    assert result_code == ResultCode.FAILED
+
+
+@pytest.mark.sdpsln
+def test_prepared_configurations_cleared_on_empty(tango_context):
+    logger.info("%s", tango_context)
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    PrepareConfigurations(cm, logger).do(
+        json.dumps(get_configurations("science_A"))
+    )
+    cm.update_device_obs_state(ObsState.IDLE)
+    assert list(cm.configuration_cache.prepared) == ["science_A"]
+
+    cm.update_device_obs_state(ObsState.EMPTY)
+
+    assert cm.configuration_cache.prepared == {}
+    assert cm.configuration_cache.get_prepared("science_A") is None
+
+
+@pytest.mark.sdpsln
+def test_configure_keeps_caller_interface(tango_context):
+    logger.info("%s", tango_context)
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    sdp_subarray_mock = mock.Mock(dev_name=SDP_SUBARRAY_DEVICE_MID)
+    configure_command = Configure(cm, logger)
+    configure_command.sdp_subarray_adapter = sdp_subarray_mock
+    cm.update_device_obs_state(ObsState.IDLE)
+    interface = INTERFACE.replace("0.4", "0.3")
+
+    result_code, _ = configure_command.do(
+        json.dumps({"interface": interface, "scan_type": "science_A"})
+    )
+    assert result_code == ResultCode.OK
+    payload = sdp_subarray_mock.Configure.call_args[0][0]
+    assert json.loads(payload)["interface"] == interface
+
+    PrepareConfigurations(cm, logger).do(
+        json.dumps([{"interface": interface, "scan_type": "calibration_B"}])
+    )
+    result_code, _ = configure_command.do(
+        json.dumps({"scan_type": "calibration_B"})
+    )
+    assert result_code == ResultCode.OK
+    payload = sdp_subarray_mock.Configure.call_args[0][0]
+    assert json.loads(payload)["interface"] == interface
+
+    # An interface which is not registered is passed through
+    result_code, _ = configure_command.do(
+        json.dumps({"interface": "unknown", "scan_type": "science_A"})
+    )
+    assert result_code == ResultCode.OK
+    assert sdp_subarray_mock.Configure.call_count == 3
+    payload = sdp_subarray_mock.Configure.call_args[0][0]
+    assert list(json.loads(payload)) == ["interface", "scan_type"]
+    assert json.loads(payload)["interface"] == "unknown"
@@ -0,0 +1,49 @@
+import logging
+
+import pytest
+
+from ska_tmc_sdpsubarrayleafnode.rate_limited_logging import (
+    RateLimitedLogger,
+    TruncatedPayload,
+)
+
+
+@pytest.mark.sdpsln
+def test_rate_limited_logger_suppresses_and_summarises(caplog):
+    logger = logging.getLogger("test_rate_limited_logger")
+    hot_path_logger = RateLimitedLogger(logger, period=0.2)
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        for obs_state in range(5):
+            hot_path_logger.info("obs_state", "obsState %s", obs_state)
+        hot_path_logger.info("other", "Other call site")
+        hot_path_logger.period = 0
+        hot_path_logger.info("obs_state", "obsState %s", 5)
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert messages[0] == "obsState 0"
+    assert messages[1] == "Other call site"
+    assert messages[2].startswith(
+        "obsState 5 (4 similar messages suppressed in the last"
+    )
+    assert hot_path_logger.statistics["obs_state"] == {
+        "emitted": 2,
+        "suppressed": 4,
+    }
+
+
+@pytest.mark.sdpsln
+def test_rate_limited_logger_skips_disabled_levels():
+    logger = logging.getLogger("test_rate_limited_logger_disabled")
+    logger.setLevel(logging.INFO)
+    hot_path_logger = RateLimitedLogger(logger)
+    hot_path_logger.debug("scan_argument", "Scan argument %s", {})
+    assert hot_path_logger.statistics == {}
+
+
+@pytest.mark.sdpsln
+def test_payload_truncation():
+    payload = {"scan_id": 1, "interface": "x" * 100}
+    assert str(TruncatedPayload(payload, 200)) == str(payload)
+    truncated = str(TruncatedPayload(payload, 20))
+    assert truncated.startswith(str(payload)[:20] + "...")
+    assert truncated.endswith(f"({len(str(payload))} characters)")
@@ -0,0 +1,41 @@
+import pytest
+from ska_tango_base.control_model import ObsState
+from ska_tmc_common.dev_factory import DevFactory
+
+from tests.settings import (
+    SDP_SUBARRAY_DEVICE_LOW,
+    SDP_SUBARRAY_DEVICE_MID,
+    create_cm,
+    logger,
+    wait_for_cm_obstate_attribute_value,
+)
+
+
+@pytest.mark.sdpsln
+def test_switch_sdp_subarray_at_runtime(tango_context):
+    logger.info("%s", tango_context)
+    DevFactory().get_device(SDP_SUBARRAY_DEVICE_LOW).SetDirectObsState(
+        ObsState.IDLE
+    )
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    cm.update_device_obs_state(ObsState.EMPTY)
+
+    cm.update_sdp_subarray_dev_name(SDP_SUBARRAY_DEVICE_LOW)
+
+    assert cm.get_device().dev_name == SDP_SUBARRAY_DEVICE_LOW
+    assert wait_for_cm_obstate_attribute_value(cm, ObsState.IDLE)
+    assert sorted(cm.event_receiver.attribute_tobe_subscribed) == sorted(
+        ["obsState", "state", "healthState", "adminMode"]
+    )
+
+
+@pytest.mark.sdpsln
+def test_disable_admin_mode_at_runtime(tango_context):
+    logger.info("%s", tango_context)
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+
+    cm.is_admin_mode_enabled = False
+
+    assert "adminMode" not in cm.event_receiver.attribute_tobe_subscribed
+    cm.is_admin_mode_enabled = True
+    assert "adminMode" in cm.event_receiver.attribute_tobe_subscribed
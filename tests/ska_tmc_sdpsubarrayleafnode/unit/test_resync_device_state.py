@@ -0,0 +1,40 @@
+import pytest
+from ska_tango_base.control_model import ObsState
+from ska_tmc_common.dev_factory import DevFactory
+
+from tests.settings import (
+    SDP_SUBARRAY_DEVICE_LOW,
+    SDP_SUBARRAY_DEVICE_MID,
+    create_cm,
+    logger,
+)
+
+
+@pytest.mark.sdpsln
+@pytest.mark.parametrize(
+    "devices", [SDP_SUBARRAY_DEVICE_MID, SDP_SUBARRAY_DEVICE_LOW]
+)
+def test_resync_on_liveliness_recovery(tango_context, devices):
+    logger.info("%s", tango_context)
+    cm = create_cm("SdpSLNComponentManager", devices)
+    DevFactory().get_device(devices).SetDirectObsState(ObsState.IDLE)
+    cm.update_exception_for_unresponsiveness(cm.get_device(), "timeout")
+    cm.update_device_obs_state(ObsState.EMPTY)
+
+    cm.update_responsiveness_info(devices)
+
+    assert cm.get_obs_state() == ObsState.IDLE
+    assert cm.last_resync_time is not None
+
+
+@pytest.mark.sdpsln
+def test_apply_state_snapshot(tango_context):
+    logger.info("%s", tango_context)
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    cm.update_device_obs_state(ObsState.EMPTY)
+
+    cm.apply_state_snapshot({"obsState": ObsState.READY})
+
+    assert cm.get_obs_state() == ObsState.READY
+    assert cm.is_command_allowed_callable("Scan")()
+    assert not cm.is_command_allowed_callable("AssignResources")()
@@ -0,0 +1,55 @@
+import pstats
+import threading
+import time
+
+import pytest
+
+from ska_tmc_sdpsubarrayleafnode.manager import SamplingProfiler
+from tests.settings import logger
+
+
+def busy_loop(stop_event):
+    while not stop_event.is_set():
+        sum(range(1000))
+
+
+@pytest.mark.sdpsln
+def test_sampling_profiler_output(tmp_path):
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=busy_loop, args=(stop_event,), name="busy_thread"
+    )
+    thread.start()
+    profiler = SamplingProfiler(str(tmp_path), "sln", logger)
+    profiler.start(10, 0.005)
+    assert profiler.is_running
+    time.sleep(0.5)
+    collapsed_path, pstats_path = profiler.stop()
+    stop_event.set()
+    thread.join()
+
+    assert not profiler.is_running
+    with open(collapsed_path, encoding="utf-8") as collapsed_file:
+        lines = collapsed_file.read().splitlines()
+    assert any(
+        line.startswith("busy_thread;") and "busy_loop" in line
+        for line in lines
+    )
+    assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in lines)
+    stats = pstats.Stats(pstats_path).stats
+    assert any(function[2] == "busy_loop" for function in stats)
+
+
+@pytest.mark.sdpsln
+def test_sampling_profiler_rejects_invalid_requests(tmp_path):
+    profiler = SamplingProfiler(str(tmp_path), logger=logger)
+    with pytest.raises(ValueError):
+        profiler.start(0)
+    with pytest.raises(ValueError):
+        profiler.start(1, 0)
+    with pytest.raises(RuntimeError):
+        profiler.stop()
+    profiler.start(10, 0.01)
+    with pytest.raises(RuntimeError):
+        profiler.start(10, 0.01)
+    profiler.stop()
@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+from ska_tmc_sdpsubarrayleafnode.shard_supervisor import (
+    COMMANDS,
+    ShardSupervisor,
+    get_shard,
+    get_shard_devices,
+)
+
+DEVICE_NAMES = [
+    f"mid-tmc/subarray-leaf-node-sdp/{index:02d}" for index in range(1, 17)
+]
+
+
+def exit_shard(server_instance, load, report_period):
+    load[COMMANDS] = 5
+    raise SystemExit(1)
+
+
+@pytest.mark.sdpsln
+def test_shard_assignment_is_stable():
+    shard_devices = get_shard_devices(DEVICE_NAMES, 4)
+    assert sorted(sum(shard_devices, [])) == DEVICE_NAMES
+    assert get_shard_devices(list(reversed(DEVICE_NAMES)), 4) == shard_devices
+    assert all(shard_devices)
+
+    # Only the devices of the added shard move
+    for device_name in DEVICE_NAMES:
+        shard = get_shard(device_name, 5)
+        assert shard in (get_shard(device_name, 4), 4)
+
+
+@pytest.mark.sdpsln
+@pytest.mark.parametrize("shard_count", [None, 0, 2, 8])
+def test_shards_have_devices(shard_count):
+    supervisor = ShardSupervisor("test", DEVICE_NAMES[:2], shard_count)
+
+    assert 1 <= len(supervisor.shards) <= 2
+    assert all(shard.device_names for shard in supervisor.shards)
+    assert (
+        sorted(sum((shard.device_names for shard in supervisor.shards), []))
+        == DEVICE_NAMES[:2]
+    )
+    if not shard_count:
+        assert supervisor.shards[0].server_instance == "test_0"
+
+
+@pytest.mark.sdpsln
+def test_failed_shard_is_restarted():
+    supervisor = ShardSupervisor(
+        "test",
+        DEVICE_NAMES[:2],
+        1,
+        report_period=0.5,
+        monitor_period=0.05,
+        restart_delay=0.1,
+        max_restart_delay=0.2,
+        shard_target=exit_shard,
+    )
+    supervisor_thread = threading.Thread(target=supervisor.run)
+    supervisor_thread.start()
+    try:
+        deadline = time.time() + 30
+        while supervisor.shards[0].restarts < 2 and time.time() < deadline:
+            time.sleep(0.1)
+    finally:
+        supervisor.stop()
+        supervisor_thread.join()
+
+    assert supervisor.shards[0].restarts >= 2
+    supervisor.report_load()
+    load = supervisor.get_load()["shards"][0]
+    assert load["server_instance"] == "test_0"
+    assert load["devices"] == DEVICE_NAMES[:2]
+    assert load["commands_per_second"] > 0
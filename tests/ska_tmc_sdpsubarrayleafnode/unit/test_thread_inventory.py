@@ -0,0 +1,58 @@
+import threading
+import time
+
+import pytest
+
+from ska_tmc_sdpsubarrayleafnode.manager.thread_inventory import (
+    ThreadInventory,
+)
+from tests.settings import SDP_SUBARRAY_DEVICE_MID, create_cm
+
+
+def track_and_update_command(stop_event):
+    while not stop_event.is_set():
+        sum(range(1000))
+
+
+@pytest.mark.sdpsln
+def test_thread_inventory_reports_activity():
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=track_and_update_command, args=(stop_event,)
+    )
+    thread.start()
+    thread_inventory = ThreadInventory()
+    thread_inventory.get_inventory()
+    time.sleep(0.2)
+    inventory = thread_inventory.get_inventory()
+    stop_event.set()
+    thread.join()
+
+    (tracker,) = [
+        thread_info
+        for thread_info in inventory["threads"]
+        if thread_info["target"] == "track_and_update_command"
+    ]
+    assert tracker["purpose"] == "command tracker"
+    assert tracker["cpu_time"] > 0
+    assert tracker["last_active"] is not None
+    assert inventory["thread_counts"]["command tracker"] >= 1
+
+
+@pytest.mark.sdpsln
+def test_timer_purpose():
+    timer = threading.Timer(10, lambda: None)
+    assert ThreadInventory.get_purpose(timer, "") == "timer"
+    assert (
+        ThreadInventory.get_purpose(threading.Thread(name="worker"), "")
+        == "unknown"
+    )
+
+
+@pytest.mark.sdpsln
+def test_component_manager_resource_inventory():
+    cm = create_cm("SdpSLNComponentManager", SDP_SUBARRAY_DEVICE_MID)
+    inventory = cm.get_resource_inventory()
+    assert inventory["threads"]
+    assert isinstance(inventory["proxies"], int)
+    assert set(inventory["subscriptions"]) == {"sdp_subarray"}